@@ -1,5 +1,16 @@
+import importlib
 import streamlit as st
-from modules import db, home, reports, about
+
+# Navigation label -> page module. A page is imported the first time it is
+# shown, so a fresh replica only loads what its first page needs (plotly
+# alone adds ~0.2s).
+PAGES = {
+    "Overview": "modules.home",
+    "Executive Dashboard": "modules.dashboard",
+    "Reports & Analysis": "modules.reports",
+    "Query Performance": "modules.performance",
+    "Database Design": "modules.about",
+}
 
 # Page Config
 st.set_page_config(
@@ -9,10 +20,15 @@ st.set_page_config(
     initial_sidebar_state="expanded",
 )
 
-# Call db init on startup to ensure in-memory DB is populated
-if 'db_initialized' not in st.session_state:
-    db.init_db()
-    st.session_state['db_initialized'] = True
+# Apply pending schema migrations once per process, not once per session. If
+# they fail the exception is shown and, since st.cache_resource doesn't cache
+# exceptions, the next rerun tries again.
+@st.cache_resource
+def init_database():
+    from modules import db
+    return db.init_db()
+
+init_database()
 
 # Custom CSS
 st.markdown("""
@@ -32,15 +48,10 @@ st.markdown("""
 
 # Sidebar Navigation
 st.sidebar.title("NordicX Manager ❄️")
-page = st.sidebar.radio("Navigation", ["Overview", "Reports & Analysis", "Database Design"])
+page = st.sidebar.radio("Navigation", list(PAGES), key="page")
 
 st.sidebar.markdown("---")
 st.sidebar.info("Using In-Memory SQLite Database")
 
 # Routing
-if page == "Overview":
-    home.app()
-elif page == "Reports & Analysis":
-    reports.app()
-elif page == "Database Design":
-    about.app()
+importlib.import_module(PAGES[page]).app()
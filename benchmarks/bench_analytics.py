@@ -0,0 +1,126 @@
+"""Aggregate reports on SQLite vs. the columnar analytics engines, same generated dataset.
+
+"sqlite" is what the app runs by default (the trigger-maintained summary
+tables), "sqlite-scan" the same reports as plain GROUP BYs over the base
+tables, and "arrow"/"duckdb" the snapshot engines in modules/analytics.py
+(duckdb only if it is installed). Engine results are checked against SQLite.
+
+    python -m benchmarks.bench_analytics                # 1M order items
+    python -m benchmarks.bench_analytics --items 20000000 --repeat 3
+"""
+import argparse
+import importlib.util
+import os
+import statistics
+import time
+
+import pandas as pd
+
+from benchmarks.bench_reports import ensure_database
+from modules import analytics, datagen, db, queries
+
+REPORTS = {
+    "Query 7: Total Sales by Category": (queries.SALES_BY_CATEGORY, ("2025-01-01", "2025-12-31")),
+    "Query 10.1: High-Value Customers": (queries.HIGH_VALUE_CUSTOMERS, None),
+    "Query 10.1: Average Order Value": (queries.AVERAGE_ORDER_VALUE, None),
+    "Query 10.2: Top Selling Products": (queries.TOP_SELLING_PRODUCTS, None),
+    "Query 10.3: Customer Segmentation": (queries.CUSTOMER_SEGMENTATION, None),
+}
+
+# The same reports computed from Order/OrderItem, as they were before the summaries
+SCAN_SQL = {
+    "Query 7: Total Sales by Category": """
+        SELECT p.Category, SUM(oi.Quantity * oi.Price) AS TotalSales
+        FROM `Order` o JOIN OrderItem oi ON o.OrderID = oi.OrderID
+        JOIN Product p ON oi.ProductID = p.ProductID
+        WHERE o.OrderDate BETWEEN ? AND ? GROUP BY p.Category ORDER BY TotalSales DESC""",
+    "Query 10.1: High-Value Customers": """
+        SELECT c.CustomerID, c.Name, SUM(o.TotalAmount) AS TotalSpent
+        FROM Customer c JOIN `Order` o ON c.CustomerID = o.CustomerID
+        GROUP BY c.CustomerID
+        HAVING TotalSpent > (SELECT AVG(TotalAmount) FROM `Order`)
+        ORDER BY TotalSpent DESC""",
+    "Query 10.1: Average Order Value": "SELECT AVG(TotalAmount) AS Avg FROM `Order`",
+    "Query 10.2: Top Selling Products": """
+        SELECT p.ProductID, p.Name, SUM(oi.Quantity) AS TotalUnitsSold
+        FROM OrderItem oi JOIN Product p ON oi.ProductID = p.ProductID
+        GROUP BY p.ProductID ORDER BY TotalUnitsSold DESC LIMIT 3""",
+    "Query 10.3: Customer Segmentation": """
+        SELECT c.CustomerID, COUNT(o.OrderID) AS TotalOrders, COALESCE(SUM(o.TotalAmount), 0) AS AllTimeValue,
+               MIN(o.OrderDate) AS FirstPurchase, MAX(o.OrderDate) AS LastPurchase
+        FROM Customer c LEFT JOIN `Order` o ON c.CustomerID = o.CustomerID
+        GROUP BY c.CustomerID ORDER BY AllTimeValue DESC""",
+}
+
+
+def engines():
+    available = ["sqlite", "sqlite-scan", "arrow"]
+    if importlib.util.find_spec("duckdb"):
+        available.append("duckdb")
+    return available
+
+
+def run(engine, name):
+    sql, params = REPORTS[name]
+    if engine == "sqlite":
+        return db.run_query(sql, params, cache=False)
+    if engine == "sqlite-scan":
+        return db.run_query(SCAN_SQL[name], params, cache=False)
+    return analytics.run_query(sql, params, engine)
+
+
+def same_result(expected, actual):
+    key = expected.columns[0]
+    try:
+        # AverageOrderValue is rounded to cents, float summation order can move it by one
+        pd.testing.assert_frame_equal(expected.sort_values(key, ignore_index=True),
+                                      actual.sort_values(key, ignore_index=True),
+                                      check_dtype=False, check_exact=False, atol=0.011)
+    except AssertionError:
+        return False
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=datagen.SCALES["medium"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default=os.path.join("benchmarks", "data"))
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    db.DB_FILE = ensure_database(args.data_dir, args.items, args.seed)
+    db.reset_pool()
+    analytics.reset()
+
+    start = time.perf_counter()
+    snap = analytics.snapshot()
+    print(f"{args.items:,} order items, median of {args.repeat}")
+    print(f"  arrow snapshot built in {time.perf_counter() - start:.2f}s")
+    if "duckdb" in engines():
+        start = time.perf_counter()
+        snap.duckdb().close()
+        print(f"  duckdb tables built in  {time.perf_counter() - start:.2f}s")
+
+    names = engines()
+    print(f"\n  {'report':<36}" + "".join(f"{engine:>14}" for engine in names))
+    for name in REPORTS:
+        expected = run("sqlite", name)
+        cells = []
+        for engine in names:
+            timings = []
+            for _ in range(args.repeat):
+                start = time.perf_counter()
+                df = run(engine, name)
+                timings.append(time.perf_counter() - start)
+            ok = engine == "sqlite-scan" or same_result(expected, df)
+            cells.append(f"{statistics.median(timings) * 1000:11.1f} ms" + (" " if ok else "!"))
+        print(f"  {name:<36}" + "".join(cells))
+    print("\n  ! = result differs from SQLite")
+    db.reset_pool()
+    analytics.reset()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Executive dashboard: one combined KPI query vs. the existing report queries one by one.
+
+    python -m benchmarks.bench_dashboard                # 1M order items
+    python -m benchmarks.bench_dashboard --items 5000000 --repeat 10
+"""
+import argparse
+import os
+import statistics
+import time
+
+from benchmarks.bench_reports import ensure_database
+from modules import datagen, db, queries
+
+PERIOD = ("2025-01-01", "2025-12-31")
+LOW_STOCK = 50
+
+# What a user flipping through the reports runs to see the same numbers
+SEPARATE = [
+    (queries.SALES_BY_CATEGORY, PERIOD),
+    (queries.TOP_SELLING_PRODUCTS, None),
+    (queries.HIGH_VALUE_CUSTOMERS, None),
+    (queries.AVERAGE_ORDER_VALUE, None),
+    (queries.CUSTOMER_SEGMENTATION, None),
+    (queries.LOW_STOCK_PRODUCTS, (LOW_STOCK,)),
+]
+COMBINED = [(queries.DASHBOARD_KPIS, PERIOD + (3, 10, LOW_STOCK))]
+
+
+def median_time(specs, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for sql, params in specs:
+            db.run_query(sql, params, cache=False)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=datagen.SCALES["medium"])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default=os.path.join("benchmarks", "data"))
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    db.DB_FILE = ensure_database(args.data_dir, args.items, args.seed)
+    db.reset_pool()
+    median_time(SEPARATE + COMBINED, 1)  # warm the page cache
+
+    separate = median_time(SEPARATE, args.repeat)
+    combined = median_time(COMBINED, args.repeat)
+    print(f"{args.items:,} order items, median of {args.repeat}")
+    print(f"  {len(SEPARATE)} report queries one by one {separate * 1000:10.2f} ms")
+    print(f"  combined dashboard query      {combined * 1000:10.2f} ms  ({separate / combined:.1f}x)")
+    db.reset_pool()
+
+
+if __name__ == "__main__":
+    main()
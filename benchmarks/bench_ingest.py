@@ -0,0 +1,59 @@
+"""Line items/sec of the bulk ingestion API on a generated database.
+
+    python -m benchmarks.bench_ingest --items 300000 --batch-size 10000
+"""
+import argparse
+import os
+import random
+import sqlite3
+import tempfile
+
+from modules import datagen, db, ingest, summaries
+
+TARGET = 100_000  # line items/sec
+
+
+def synthetic_orders(count_items, customers, products, seed=7):
+    rng = random.Random(seed)
+    produced = 0
+    while produced < count_items:
+        n = min(rng.randint(1, 5), count_items - produced)
+        produced += n
+        yield {
+            "CustomerID": rng.randint(*customers),
+            "OrderDate": f"2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}",
+            "items": [{"ProductID": rng.randint(*products), "Quantity": rng.randint(1, 4),
+                       "Price": round(rng.uniform(5, 500), 2)} for _ in range(n)],
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=300_000, help="line items to ingest")
+    parser.add_argument("--base-items", type=int, default=100_000, help="size of the starting database")
+    parser.add_argument("--batch-size", type=int, default=ingest.BATCH_SIZE)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_FILE = os.path.join(tmp, "ingest.db")
+        datagen.generate(db.DB_FILE, args.base_items, progress=None)
+        conn = sqlite3.connect(db.DB_FILE)
+        with conn:
+            conn.execute("UPDATE Product SET StockLevel = 1000000000")
+        customers = conn.execute("SELECT MIN(CustomerID), MAX(CustomerID) FROM Customer").fetchone()
+        products = conn.execute("SELECT MIN(ProductID), MAX(ProductID) FROM Product").fetchone()
+
+        orders = list(synthetic_orders(args.items, customers, products))
+        stats = ingest.ingest_orders(orders, batch_size=args.batch_size)
+        problems = summaries.check_consistency(conn)
+        conn.close()
+
+    rate = stats["items"] / stats["seconds"]
+    print(f"{stats['orders']:,} orders / {stats['items']:,} items in {stats['batches']} batches "
+          f"of {args.batch_size} orders: {stats['seconds']:.2f}s")
+    print(f"  {rate:,.0f} items/sec (target {TARGET:,}) {'OK' if rate >= TARGET else 'BELOW TARGET'}")
+    print(f"  summaries consistent: {not problems}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+"""Inventory: reorder suggestions over many SKUs, batch restock, velocity updates.
+
+Part 1 adds --skus products to a fresh database and times the reorder
+suggestions query with idx_product_reorder vs. a full scan of Product, then
+restocking --restock products row by row (one commit each) vs. in one
+executemany transaction vs. inventory.restock(). Part 2 copies a generated
+order database and times a full velocity update vs. an incremental one after
+ingesting a batch of new order lines.
+
+    python -m benchmarks.bench_inventory                 # 1M SKUs, 1M order items
+    python -m benchmarks.bench_inventory --skus 100000 --restock 5000
+"""
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+
+from benchmarks.bench_ingest import synthetic_orders
+from benchmarks.bench_reports import ensure_database
+from modules import datagen, db, ingest, inventory, queries
+
+ADD_SKUS = """
+WITH RECURSIVE n(i) AS (SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < ?)
+INSERT INTO Product (SupplierID, Name, Price, StockLevel, Category, ReorderPoint)
+SELECT (SELECT MIN(SupplierID) FROM Supplier) + i % (SELECT COUNT(*) FROM Supplier),
+       'SKU ' || i, 9.99, i * 7919 % 5000, 'Bulk', i * 104729 % 60
+FROM n
+"""
+
+
+def median_time(fn, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def restock_row_by_row(conn, quantities):
+    for product, units in quantities.items():
+        conn.execute("UPDATE Product SET StockLevel = StockLevel + ? WHERE ProductID = ?", (units, product))
+        conn.commit()
+
+
+def restock_executemany(conn, quantities):
+    with conn:
+        conn.executemany("UPDATE Product SET StockLevel = StockLevel + ? WHERE ProductID = ?",
+                         [(units, product) for product, units in quantities.items()])
+
+
+def bench_skus(tmp, skus, restock, repeat):
+    db.DB_FILE = os.path.join(tmp, "skus.db")
+    db.reset_pool()
+    db.init_db()
+    conn = db.get_connection()
+    with conn:
+        conn.execute(ADD_SKUS, (skus,))
+    below = conn.execute("SELECT COUNT(*) FROM Product WHERE StockLevel - ReorderPoint < 0").fetchone()[0]
+    total = conn.execute("SELECT COUNT(*) FROM Product").fetchone()[0]
+    print(f"{total:,} products, {below:,} below their reorder point")
+
+    scan = queries.REORDER_SUGGESTIONS.replace("FROM Product p", "FROM Product p NOT INDEXED")
+    indexed = median_time(lambda: db.run_query(queries.REORDER_SUGGESTIONS, cache=False), repeat)
+    scanned = median_time(lambda: db.run_query(scan, cache=False), repeat)
+    print(f"  reorder suggestions   index {indexed * 1000:8.1f} ms   full scan {scanned * 1000:8.1f} ms"
+          f"   ({scanned / indexed:.0f}x)")
+
+    ids = [row[0] for row in conn.execute("SELECT ProductID FROM Product ORDER BY ProductID DESC LIMIT ?",
+                                          (restock,))]
+    quantities = {product: 10 for product in ids}
+    for label, fn in [("row by row", lambda: restock_row_by_row(conn, quantities)),
+                      ("executemany", lambda: restock_executemany(conn, quantities)),
+                      ("inventory.restock", lambda: inventory.restock(quantities, conn=conn))]:
+        seconds = median_time(fn, repeat)
+        print(f"  restock {len(ids):,} {label:<18} {seconds * 1000:8.1f} ms  ({len(ids) / seconds:,.0f} products/sec)")
+    conn.close()
+
+
+def bench_velocity(tmp, source, new_lines):
+    path = os.path.join(tmp, "orders.db")
+    shutil.copy(source, path)
+    db.DB_FILE = path
+    db.reset_pool()
+    db.init_db()
+    conn = db.get_connection()
+    with conn:
+        conn.execute("UPDATE Product SET StockLevel = 1000000000")
+    items = conn.execute("SELECT COUNT(*) FROM OrderItem").fetchone()[0]
+    full = inventory.update(conn=conn, full=True)
+    customers = conn.execute("SELECT MIN(CustomerID), MAX(CustomerID) FROM Customer").fetchone()
+    products = conn.execute("SELECT MIN(ProductID), MAX(ProductID) FROM Product").fetchone()
+    ingest.ingest_orders(synthetic_orders(new_lines, customers, products), conn=conn)
+    incremental = inventory.update(conn=conn)
+    print(f"{items:,} order items")
+    print(f"  velocity update   full {full['seconds'] * 1000:8.1f} ms   incremental after {new_lines:,} "
+          f"new lines {incremental['seconds'] * 1000:8.1f} ms ({incremental['products']} products)")
+    conn.close()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--skus", type=int, default=1_000_000)
+    parser.add_argument("--restock", type=int, default=10_000, help="products per restock")
+    parser.add_argument("--items", type=int, default=datagen.SCALES["medium"])
+    parser.add_argument("--new-lines", type=int, default=5_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default=os.path.join("benchmarks", "data"))
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    source = ensure_database(args.data_dir, args.items, args.seed)
+    with tempfile.TemporaryDirectory() as tmp:
+        bench_skus(tmp, args.skus, args.restock, args.repeat)
+        bench_velocity(tmp, source, args.new_lines)
+    db.reset_pool()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Report latency with and without a concurrent bulk writer, per read mode.
+
+Reader threads run every report query in a loop (cache off). After an idle
+phase, a separate process starts bulk-ingesting orders, and the two phases
+are compared for each db.READ_MODE. The generated database is copied first,
+so the cached one in --data-dir stays untouched.
+
+    python -m benchmarks.bench_mixed --items 1000000
+    python -m benchmarks.bench_mixed --journal DELETE   # rollback journal, as before WAL
+"""
+import argparse
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import statistics
+import tempfile
+import threading
+import time
+
+from benchmarks.bench_ingest import synthetic_orders
+from benchmarks.bench_reports import ensure_database
+from modules import datagen, db, ingest, registry
+
+
+def writer(path, journal, stop, counter):
+    """Ingests batches of synthetic orders until `stop` is set."""
+    db.DB_FILE = path
+    db.PRAGMAS["journal_mode"] = journal
+    conn = db.get_connection()
+    customers = conn.execute("SELECT MIN(CustomerID), MAX(CustomerID) FROM Customer").fetchone()
+    products = conn.execute("SELECT MIN(ProductID), MAX(ProductID) FROM Product").fetchone()
+    seed = 0
+    while not stop.is_set():
+        seed += 1
+        stats = ingest.ingest_orders(synthetic_orders(5_000, customers, products, seed=seed),
+                                     batch_size=500, conn=conn)
+        with counter.get_lock():
+            counter.value += stats["items"]
+    conn.close()
+
+
+def reader(stop, timings, errors):
+    while not stop.is_set():
+        for sql, params in registry.samples().values():
+            start = time.perf_counter()
+            try:
+                db.run_query(sql, params, cache=False)
+            except Exception:
+                errors.append(1)
+                continue
+            timings.append(time.perf_counter() - start)
+            if stop.is_set():
+                return
+
+
+def phase(seconds, readers):
+    stop, timings, errors = threading.Event(), [], []
+    threads = [threading.Thread(target=reader, args=(stop, timings, errors)) for _ in range(readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return timings, len(errors)
+
+
+def percentiles(timings):
+    if len(timings) < 2:
+        return "no completed queries"
+    cuts = statistics.quantiles(timings, n=100)
+    return (f"p50 {cuts[49] * 1000:7.1f} ms  p95 {cuts[94] * 1000:7.1f} ms  "
+            f"p99 {cuts[98] * 1000:7.1f} ms  ({len(timings)} queries)")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, default=datagen.SCALES["medium"])
+    parser.add_argument("--seconds", type=float, default=10, help="length of each phase")
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--modes", nargs="+", choices=db.READ_MODES, default=list(db.READ_MODES))
+    parser.add_argument("--journal", choices=["WAL", "DELETE"], default="WAL")
+    parser.add_argument("--refresh", type=float, default=5, help="snapshot refresh interval (s)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default=os.path.join("benchmarks", "data"))
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    source = ensure_database(args.data_dir, args.items, args.seed)
+    db.PRAGMAS["journal_mode"] = args.journal
+    db.SNAPSHOT_REFRESH_SECONDS = args.refresh
+    print(f"{args.items:,} order items, {args.readers} reader threads, "
+          f"{args.journal} journal, {args.seconds:.0f}s per phase")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for mode in args.modes:
+            path = os.path.join(tmp, f"mixed_{mode}.db")
+            shutil.copy(source, path)
+            db.DB_FILE, db.READ_MODE = path, mode
+            db.init_db()
+            conn = sqlite3.connect(path)
+            conn.execute(f"PRAGMA journal_mode = {args.journal}")
+            with conn:
+                conn.execute("UPDATE Product SET StockLevel = 1000000000")
+            conn.close()
+
+            db.reset_pool()
+            idle, idle_errors = phase(args.seconds, args.readers)
+
+            stop, counter = multiprocessing.Event(), multiprocessing.Value("q", 0)
+            process = multiprocessing.Process(target=writer, args=(path, args.journal, stop, counter))
+            process.start()
+            busy, busy_errors = phase(args.seconds, args.readers)
+            stop.set()
+            process.join()
+            db.reset_pool()
+
+            print(f"\n  {mode}")
+            print(f"    idle     {percentiles(idle)}" + (f", {idle_errors} errors" if idle_errors else ""))
+            print(f"    writing  {percentiles(busy)}" + (f", {busy_errors} errors" if busy_errors else ""))
+            print(f"    writer   {counter.value / args.seconds:,.0f} items/sec")
+
+
+if __name__ == "__main__":
+    main()
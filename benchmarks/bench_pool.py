@@ -0,0 +1,83 @@
+"""Queries/sec of db.run_query (pooled) vs. the old open/close-per-query pattern.
+
+Run from the project root:
+    python -m benchmarks.bench_pool --sessions 8 --queries 500
+"""
+import argparse
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+from modules import db
+
+QUERIES = [
+    ("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';", None),
+    ("SELECT p.ProductID, p.Name, p.StockLevel FROM Product p WHERE p.StockLevel < ?", (50,)),
+    ("""SELECT c.CustomerID, c.Name, SUM(o.TotalAmount) AS TotalSpent
+        FROM Customer c JOIN `Order` o ON c.CustomerID = o.CustomerID
+        GROUP BY c.CustomerID, c.Name""", None),
+]
+
+
+def open_close_query(query, params=None):
+    conn = sqlite3.connect(db.DB_FILE)
+    try:
+        return pd.read_sql_query(query, conn, params=params)
+    finally:
+        conn.close()
+
+
+def pooled_query(query, params=None):
+    # The result cache would turn nearly every repeat into a hit
+    return db.run_query(query, params, cache=False)
+
+
+def run_sessions(fn, sessions, per_session):
+    barrier = threading.Barrier(sessions + 1)
+
+    def session():
+        barrier.wait()
+        for i in range(per_session):
+            query, params = QUERIES[i % len(QUERIES)]
+            fn(query, params)
+
+    threads = [threading.Thread(target=session) for _ in range(sessions)]
+    for t in threads:
+        t.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - start
+    return sessions * per_session / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--queries", type=int, default=500, help="queries per session")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db.DB_FILE = os.path.join(tmp, "bench.db")
+        db.reset_pool()
+        db.init_db()
+
+        results = {
+            "open/close": run_sessions(open_close_query, args.sessions, args.queries),
+            "pooled": run_sessions(pooled_query, args.sessions, args.queries),
+        }
+        db.reset_pool()
+
+    print(f"{args.sessions} sessions x {args.queries} queries")
+    for name, qps in results.items():
+        print(f"  {name:<12} {qps:10.1f} queries/sec")
+    print(f"  speedup      {results['pooled'] / results['open/close']:10.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+"""Times every report query and the Overview table browser at several data scales.
+
+Databases are generated once per (items, seed) into --data-dir and reused.
+Results go to <out>.json and <out>.csv so runs can be diffed between versions.
+
+    python -m benchmarks.bench_reports --scale small medium
+    python -m benchmarks.bench_reports --items 200000 --repeat 5
+"""
+import argparse
+import csv
+import json
+import os
+import platform
+import statistics
+import time
+from datetime import datetime, timezone
+
+from modules import datagen, db, registry
+
+BROWSER_TABLES = ["Customer", "Product", "Order", "OrderItem", "Schedule"]
+
+
+def time_call(fn, repeat):
+    timings, rows = [], 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = len(fn())
+        timings.append(time.perf_counter() - start)
+    return timings, rows
+
+
+def browse(table):
+    """What the Overview page does per click: first page plus the row count."""
+    db.query_cache.clear()
+    df, _ = db.fetch_page(table)
+    db.count_rows(table)
+    return df
+
+
+def cases():
+    """(name, callable) pairs: every report query, then the table browser."""
+    for name, (sql, params) in registry.samples().items():
+        yield name, lambda sql=sql, params=params: db.run_query(sql, params, cache=False)
+    for table in BROWSER_TABLES:
+        yield f"Overview: {table}", lambda table=table: browse(table)
+
+
+def ensure_database(data_dir, items, seed):
+    path = os.path.join(data_dir, f"nordicx_{items}_{seed}.db")
+    if not os.path.exists(path):
+        print(f"Generating {items:,} order items -> {path}")
+        datagen.generate(path, items, seed=seed)
+    return path
+
+
+def run(scales, repeat, data_dir, seed):
+    results = []
+    for label, items in scales:
+        db.DB_FILE = ensure_database(data_dir, items, seed)
+        db.reset_pool()
+        print(f"\n{label} ({items:,} order items)")
+        for name, fn in cases():
+            timings, rows = time_call(fn, repeat)
+            result = {
+                "scale": label,
+                "items": items,
+                "case": name,
+                "rows": rows,
+                "repeat": repeat,
+                "min_s": min(timings),
+                "median_s": statistics.median(timings),
+                "max_s": max(timings),
+            }
+            results.append(result)
+            print(f"  {name:<40} {result['median_s'] * 1000:10.2f} ms  {rows:>10,} rows")
+    db.reset_pool()
+    return results
+
+
+def write_report(results, out):
+    os.makedirs(os.path.dirname(out) or ".", exist_ok=True)
+    meta = {
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+    with open(out + ".json", "w", encoding="utf-8") as f:
+        json.dump({"meta": meta, "results": results}, f, indent=2)
+    with open(out + ".csv", "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=list(results[0]))
+        writer.writeheader()
+        writer.writerows(results)
+    print(f"\nWrote {out}.json and {out}.csv")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark report queries at several data scales.")
+    parser.add_argument("--scale", nargs="+", choices=datagen.SCALES, default=["small"])
+    parser.add_argument("--items", nargs="+", type=int, help="explicit item counts (instead of --scale)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--data-dir", default=os.path.join("benchmarks", "data"))
+    parser.add_argument("--out", default=os.path.join("benchmarks", "results", "reports"))
+    args = parser.parse_args(argv)
+
+    if args.items:
+        scales = [(f"{items:,}", items) for items in args.items]
+    else:
+        scales = [(name, datagen.SCALES[name]) for name in args.scale]
+    os.makedirs(args.data_dir, exist_ok=True)
+    write_report(run(scales, args.repeat, args.data_dir, args.seed), args.out)
+
+
+if __name__ == "__main__":
+    main()
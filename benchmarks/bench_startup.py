@@ -0,0 +1,86 @@
+"""Cold-start time of the Streamlit app, per landing page.
+
+Every sample is a fresh Python process that imports streamlit and then runs
+app.py once through Streamlit's AppTest, which executes the script the way a
+new browser session does, with the given page selected. Reported per page:
+
+    import   importing streamlit itself (the same for every page)
+    render   the first script run: page imports, init_db, the page's queries
+    rerun    a second run in the same process (what later interactions cost)
+    loaded   heavy libraries imported by the end of the first run
+
+The app runs from the project root against a copy of the database in a
+temporary directory (NORDICX_DB), or a freshly created one without --db.
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --repeat 5 --db nordicx.db
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+APP = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir, "app.py"))
+PAGES = ["Overview", "Executive Dashboard", "Reports & Analysis", "Query Performance", "Database Design"]
+HEAVY = ["pandas", "pyarrow", "plotly.express"]
+
+CHILD = """
+import json, sys, time
+started = time.perf_counter()
+import streamlit
+from streamlit.testing.v1 import AppTest
+imported = time.perf_counter()
+at = AppTest.from_file(sys.argv[1], default_timeout=300)
+at.session_state["page"] = sys.argv[2]
+at.run()
+done = time.perf_counter()
+at.run()
+rerun = time.perf_counter() - done
+print(json.dumps({
+    "import": imported - started,
+    "render": done - imported,
+    "rerun": rerun,
+    "errors": [str(e.value) for e in at.exception],
+    "loaded": [m for m in sys.argv[3:] if m in sys.modules],
+}))
+"""
+
+
+def sample(page, path):
+    """One cold start in a new process; returns the child's timings."""
+    out = subprocess.run([sys.executable, "-c", CHILD, APP, page] + HEAVY, cwd=os.path.dirname(APP),
+                         env=dict(os.environ, NORDICX_DB=path), capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=3, help="cold starts per page")
+    parser.add_argument("--db", help="database to copy (default: a fresh one)")
+    parser.add_argument("--pages", nargs="+", choices=PAGES, default=PAGES)
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "nordicx.db")
+        if args.db:
+            shutil.copy(args.db, path)
+        else:
+            first = sample(PAGES[0], path)
+            print(f"first start, new database: render {first['render'] * 1000:.0f} ms")
+
+        print(f"{'page':<22} {'import ms':>10} {'render ms':>10} {'rerun ms':>10}  loaded")
+        for page in args.pages:
+            runs = [sample(page, path) for _ in range(args.repeat)]
+            errors = sorted({e for run in runs for e in run["errors"]})
+            print(f"{page:<22} {statistics.median(r['import'] for r in runs) * 1000:10.0f} "
+                  f"{statistics.median(r['render'] for r in runs) * 1000:10.0f} "
+                  f"{statistics.median(r['rerun'] for r in runs) * 1000:10.0f}  "
+                  f"{', '.join(runs[-1]['loaded']) or '-'}" + (f"  ERRORS: {errors}" if errors else ""))
+
+
+if __name__ == "__main__":
+    main()
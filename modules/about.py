@@ -1,5 +1,22 @@
+import io
 import streamlit as st
 
+# Streamlit shrinks wider images to this width again on every run (~1s for
+# the full-size diagram), so it is done once per process instead
+MAX_IMAGE_WIDTH = 2 * 730
+
+@st.cache_resource
+def er_diagram(path="er.png", max_width=MAX_IMAGE_WIDTH):
+    """The ER diagram as PNG bytes, at most max_width pixels wide."""
+    from PIL import Image
+
+    image = Image.open(path)
+    if image.width > max_width:
+        image = image.resize((max_width, round(image.height * max_width / image.width)), Image.BILINEAR)
+    out = io.BytesIO()
+    image.save(out, format="PNG")
+    return out.getvalue()
+
 def app():
     st.title("📐 Database Design & Architecture")
     
@@ -18,7 +35,7 @@ def app():
     col1, col2, col3= st.columns([1,2,1])
 
     with col2:
-        st.image("er.png", caption="Entity-Relationship Diagram", width='content')
+        st.image(er_diagram(), caption="Entity-Relationship Diagram", width='content')
 
     st.markdown("---")
 
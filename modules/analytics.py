@@ -0,0 +1,240 @@
+"""Columnar engines for the heavy aggregate reports.
+
+SQLite executes the GROUP BY reports (Query 7, 10.1, 10.2, 10.3) row by row.
+With `db.ANALYTICS_ENGINE` (or NORDICX_ANALYTICS_ENGINE) set to "arrow" or
+"duckdb", db.run_query sends those reports here instead. All other reads stay
+on SQLite.
+
+Both engines work on an in-memory columnar snapshot of Order, OrderItem,
+Product and Customer. "arrow" aggregates the snapshot with pyarrow compute and
+"duckdb" copies it into an in-process DuckDB database (optional dependency)
+and runs SQL on it. The snapshot is rebuilt when the data has changed and it
+is older than `db.ANALYTICS_REFRESH_SECONDS`, so results can lag writes by up
+to that long. Results from a lagging snapshot are not put in the query cache.
+"""
+import threading
+import time
+from datetime import date
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+
+from modules import db, queries
+
+ENGINES = ("sqlite", "arrow", "duckdb")
+
+# snapshot table -> (SQL it is loaded with, column types)
+SNAPSHOT_TABLES = {
+    "orders": ("SELECT OrderID, CustomerID, OrderDate, TotalAmount FROM `Order`", pa.schema([
+        ("OrderID", pa.int64()), ("CustomerID", pa.int64()),
+        ("OrderDate", pa.string()), ("TotalAmount", pa.float64())])),
+    "items": ("SELECT OrderID, ProductID, Quantity, Price FROM OrderItem", pa.schema([
+        ("OrderID", pa.int64()), ("ProductID", pa.int64()),
+        ("Quantity", pa.int64()), ("Price", pa.float64())])),
+    "products": ("SELECT ProductID, Name, NULLIF(Category, '') AS Category FROM Product", pa.schema([
+        ("ProductID", pa.int64()), ("Name", pa.string()), ("Category", pa.string())])),
+    "customers": ("SELECT CustomerID, Name, Email FROM Customer", pa.schema([
+        ("CustomerID", pa.int64()), ("Name", pa.string()), ("Email", pa.string())])),
+}
+
+_snapshot = None
+_snapshot_lock = threading.Lock()
+
+
+class Snapshot:
+    """Arrow copies of the base tables plus `lines`, the order lines joined
+    with their order date and product category."""
+
+    def __init__(self, tables, version):
+        self.tables = tables
+        self.version = version
+        self.loaded_at = time.monotonic()
+        items = tables["items"]
+        revenue = pc.multiply(pc.cast(items["Quantity"], pa.float64()), items["Price"])
+        self.lines = (items.append_column("Revenue", revenue)
+                      .join(tables["orders"].select(["OrderID", "OrderDate"]), "OrderID")
+                      .join(tables["products"].select(["ProductID", "Category"]), "ProductID",
+                            join_type="left outer"))
+        self._duckdb = None
+        self._duckdb_lock = threading.Lock()
+
+    def duckdb(self):
+        """An in-memory DuckDB database holding the snapshot (created on first use)."""
+        with self._duckdb_lock:
+            if self._duckdb is None:
+                import duckdb
+
+                conn = duckdb.connect()
+                for name, table in dict(self.tables, lines=self.lines).items():
+                    conn.register(f"{name}_arrow", table)
+                    conn.execute(f"CREATE TABLE {name} AS SELECT * FROM {name}_arrow")
+                    conn.unregister(f"{name}_arrow")
+                self._duckdb = conn
+            return self._duckdb.cursor()
+
+
+def _load_table(sql, schema):
+    batches = [pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False)
+               for chunk in db.stream_query(sql)]
+    return pa.Table.from_batches(batches, schema=schema)
+
+
+def snapshot():
+    """Returns the current snapshot, rebuilding it if it is due."""
+    global _snapshot
+    with _snapshot_lock:
+        version = db.data_version()
+        if (_snapshot is None or _snapshot.version != version
+                and time.monotonic() - _snapshot.loaded_at >= db.ANALYTICS_REFRESH_SECONDS):
+            _snapshot = Snapshot({name: _load_table(sql, schema)
+                                  for name, (sql, schema) in SNAPSHOT_TABLES.items()}, version)
+        return _snapshot
+
+
+def reset():
+    """Drops the snapshot, e.g. after db.DB_FILE changes."""
+    global _snapshot
+    with _snapshot_lock:
+        _snapshot = None
+
+
+def _iso(value):
+    return value.isoformat() if isinstance(value, date) else value
+
+
+def _customer_stats(snap):
+    return snap.tables["orders"].group_by("CustomerID").aggregate([
+        ("OrderID", "count"), ("TotalAmount", "sum"), ("OrderDate", "min"), ("OrderDate", "max")])
+
+
+def _average_order(snap):
+    orders = snap.tables["orders"]
+    return pc.sum(orders["TotalAmount"]).as_py() / orders.num_rows if orders.num_rows else None
+
+
+def _arrow_sales_by_category(snap, params):
+    start, end = map(_iso, params)
+    lines = snap.lines
+    in_range = pc.and_(pc.greater_equal(lines["OrderDate"], start), pc.less_equal(lines["OrderDate"], end))
+    totals = lines.filter(in_range).group_by("Category").aggregate([("Revenue", "sum")])
+    df = totals.select(["Category", "Revenue_sum"]).to_pandas()
+    df.columns = ["Category", "TotalSales"]
+    return df.sort_values("TotalSales", ascending=False, ignore_index=True)
+
+
+def _arrow_high_value_customers(snap, params):
+    stats = _customer_stats(snap)
+    stats = stats.filter(pc.greater(stats["TotalAmount_sum"], _average_order(snap) or 0))
+    joined = stats.join(snap.tables["customers"].select(["CustomerID", "Name"]), "CustomerID")
+    df = joined.select(["CustomerID", "Name", "TotalAmount_sum"]).to_pandas()
+    df.columns = ["CustomerID", "Name", "TotalSpent"]
+    return df.sort_values("TotalSpent", ascending=False, ignore_index=True)
+
+
+def _arrow_average_order_value(snap, params):
+    return pd.DataFrame({"Avg": [_average_order(snap)]})
+
+
+def _arrow_top_selling_products(snap, params):
+    units = snap.lines.group_by("ProductID").aggregate([("Quantity", "sum")])
+    units = units.filter(pc.greater(units["Quantity_sum"], 0))
+    top = units.take(pc.select_k_unstable(units, 3, [("Quantity_sum", "descending")]))
+    joined = top.join(snap.tables["products"].select(["ProductID", "Name"]), "ProductID")
+    df = joined.select(["ProductID", "Name", "Quantity_sum"]).to_pandas()
+    df.columns = ["ProductID", "Name", "TotalUnitsSold"]
+    return df.sort_values("TotalUnitsSold", ascending=False, ignore_index=True)
+
+
+def _arrow_customer_segmentation(snap, params):
+    joined = snap.tables["customers"].join(_customer_stats(snap), "CustomerID", join_type="left outer")
+    c = joined.to_pandas()
+    orders = c["OrderID_count"].fillna(0).astype("int64")
+    spent = c["TotalAmount_sum"].fillna(0)
+    df = pd.DataFrame({
+        "CustomerID": c["CustomerID"],
+        "CustomerName": c["Name"],
+        "Email": c["Email"],
+        "TotalOrders": orders,
+        "AllTimeValue": spent,
+        "AverageOrderValue": (spent / orders.where(orders > 0)).fillna(0).round(2),
+        "FirstPurchase": c["OrderDate_min"],
+        "LastPurchase": c["OrderDate_max"],
+    })
+    df["CustomerSegment"] = pd.cut(orders, [-1, 0, 1, 2, float("inf")],
+                                   labels=["No Orders", "New Customer", "Regular Customer", "VIP Customer"]
+                                   ).astype(str)
+    return df.sort_values("AllTimeValue", ascending=False, ignore_index=True)
+
+
+DUCKDB_SQL = {
+    queries.SALES_BY_CATEGORY: """
+        SELECT Category, SUM(Revenue) AS TotalSales
+        FROM lines WHERE OrderDate BETWEEN ? AND ?
+        GROUP BY Category ORDER BY TotalSales DESC""",
+    queries.HIGH_VALUE_CUSTOMERS: """
+        WITH s AS (SELECT CustomerID, SUM(TotalAmount) AS TotalSpent FROM orders GROUP BY CustomerID)
+        SELECT s.CustomerID, c.Name, s.TotalSpent
+        FROM s JOIN customers c ON c.CustomerID = s.CustomerID
+        WHERE s.TotalSpent > (SELECT SUM(TotalAmount) / COUNT(*) FROM orders)
+        ORDER BY s.TotalSpent DESC""",
+    queries.AVERAGE_ORDER_VALUE: "SELECT SUM(TotalAmount) / COUNT(*) AS Avg FROM orders",
+    queries.TOP_SELLING_PRODUCTS: """
+        SELECT p.ProductID, p.Name, s.TotalUnitsSold
+        FROM (SELECT ProductID, SUM(Quantity)::BIGINT AS TotalUnitsSold FROM lines
+              GROUP BY ProductID HAVING SUM(Quantity) > 0
+              ORDER BY TotalUnitsSold DESC LIMIT 3) s
+        JOIN products p ON p.ProductID = s.ProductID
+        ORDER BY s.TotalUnitsSold DESC""",
+    queries.CUSTOMER_SEGMENTATION: """
+        WITH s AS (SELECT CustomerID, COUNT(*) AS OrderCount, SUM(TotalAmount) AS TotalSpent,
+                          MIN(OrderDate) AS FirstOrder, MAX(OrderDate) AS LastOrder
+                   FROM orders GROUP BY CustomerID)
+        SELECT c.CustomerID, c.Name AS CustomerName, c.Email,
+               COALESCE(s.OrderCount, 0) AS TotalOrders,
+               COALESCE(s.TotalSpent, 0) AS AllTimeValue,
+               ROUND(COALESCE(s.TotalSpent / s.OrderCount, 0), 2) AS AverageOrderValue,
+               s.FirstOrder AS FirstPurchase, s.LastOrder AS LastPurchase,
+               CASE
+                   WHEN s.OrderCount >= 3 THEN 'VIP Customer'
+                   WHEN s.OrderCount = 2 THEN 'Regular Customer'
+                   WHEN s.OrderCount = 1 THEN 'New Customer'
+                   ELSE 'No Orders'
+               END AS CustomerSegment
+        FROM customers c LEFT JOIN s ON c.CustomerID = s.CustomerID
+        ORDER BY AllTimeValue DESC""",
+}
+
+ARROW_REPORTS = {
+    queries.SALES_BY_CATEGORY: _arrow_sales_by_category,
+    queries.HIGH_VALUE_CUSTOMERS: _arrow_high_value_customers,
+    queries.AVERAGE_ORDER_VALUE: _arrow_average_order_value,
+    queries.TOP_SELLING_PRODUCTS: _arrow_top_selling_products,
+    queries.CUSTOMER_SEGMENTATION: _arrow_customer_segmentation,
+}
+
+_ROUTED = {db.normalize_sql(sql) for sql in ARROW_REPORTS}
+
+
+def handles(query):
+    """True for the aggregate reports the columnar engines can run."""
+    return db.normalize_sql(query) in _ROUTED
+
+
+def run_query(query, params=None, engine="arrow", snap=None):
+    """Runs one of the routed reports on a columnar engine and returns a DataFrame.
+
+    `snap` is the snapshot to read (default: the current one); db.run_query
+    passes its own so it knows which data version the result reflects.
+    """
+    if engine not in ENGINES[1:]:
+        raise ValueError(f"Unknown analytics engine: {engine}")
+    key = next(sql for sql in ARROW_REPORTS if db.normalize_sql(sql) == db.normalize_sql(query))
+    snap = snap or snapshot()
+    if engine == "arrow":
+        return ARROW_REPORTS[key](snap, params)
+    cursor = snap.duckdb()
+    try:
+        return cursor.execute(DUCKDB_SQL[key], [_iso(p) for p in params or ()]).fetchdf()
+    finally:
+        cursor.close()
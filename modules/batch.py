@@ -0,0 +1,161 @@
+"""Runs report queries without the UI and writes the results to files.
+
+Any registered query (see registry.py) can be run once or swept over several
+parameter values; every combination becomes one CSV or Parquet file. Runs are
+spread over a process pool, each worker reading through read-only
+connections (db.READ_MODE = "wal-ro"). Parameters not given on the command
+line take their sample value. Nothing here imports streamlit or plotly.
+
+    python -m modules.batch --list
+    python -m modules.batch "Query 5: Low Stock Products" --param threshold=10,20,50
+    python -m modules.batch "Query 7: Total Sales by Category" \\
+        --param start=2025-01-01 --param end=2025-12-31 --window month --format Parquet
+    python -m modules.batch --all --db nightly.db --out exports/nightly
+"""
+import argparse
+import itertools
+import os
+import sys
+import time
+from concurrent import futures
+
+import pandas as pd
+
+from modules import db, export, registry
+
+# --window: pandas frequency of the window starts
+WINDOWS = {"month": "MS", "quarter": "QS", "year": "YS"}
+
+
+def windows(start, end, window):
+    """Splits [start, end] into consecutive (start, end) date pairs."""
+    start, end = pd.Timestamp(start), pd.Timestamp(end)
+    starts = [start] + [s for s in pd.date_range(start, end, freq=WINDOWS[window]) if s > start]
+    ends = [s - pd.Timedelta(days=1) for s in starts[1:]] + [end]
+    return [(s.date().isoformat(), e.date().isoformat()) for s, e in zip(starts, ends)]
+
+
+def sweep(name, values, window=None):
+    """Every argument tuple for one query: the product of the swept values.
+
+    `values` maps parameter -> list of values; parameters the query doesn't
+    declare are ignored, missing ones get their sample value. With `window`,
+    the start..end range is split into windows instead of being crossed.
+    """
+    _, declared = registry.QUERIES[name]
+    params = [param for param, _, _ in declared]
+    choices = [values.get(param, [sample]) for param, _, sample in declared]
+    combos = list(itertools.product(*choices))
+    if window and {"start", "end"} <= set(params):
+        i, j = params.index("start"), params.index("end")
+        split = []
+        for args in combos:
+            for start, end in windows(args[i], args[j], window):
+                args = list(args)
+                args[i], args[j] = start, end
+                split.append(tuple(args))
+        combos = split
+    return combos
+
+
+def plan(names, values, fmt, out, window=None):
+    """Binds every run up front, so bad parameters fail before anything runs.
+
+    Returns [(name, SQL, params, output path)].
+    """
+    jobs = []
+    for name in names:
+        _, declared = registry.QUERIES[name]
+        for args in sweep(name, values, window):
+            sql, params = registry.bind(name, *args)
+            label = " ".join([name] + [f"{p} {v}" for (p, _, _), v in zip(declared, params or ())
+                                       if p in values or window and p in ("start", "end")])
+            jobs.append((name, sql, params, export.export_path(label, fmt, out)))
+    return jobs
+
+
+def _init_worker(path):
+    db.DB_FILE = path
+    db.READ_MODE = "wal-ro"
+    db.reset_pool()
+
+
+def run_job(job, fmt):
+    """Writes one result file. Returns (path, rows, seconds)."""
+    name, sql, params, path = job
+    started = time.perf_counter()
+    path, rows = export.export_query(name, sql, params, fmt, path)
+    return path, rows, time.perf_counter() - started
+
+
+def run(jobs, fmt, path, workers):
+    """Runs the jobs on `workers` processes, yielding (job, result or exception)."""
+    with futures.ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(path,)) as pool:
+        pending = {pool.submit(run_job, job, fmt): job for job in jobs}
+        for future in futures.as_completed(pending):
+            try:
+                yield pending[future], future.result()
+            except Exception as e:
+                yield pending[future], e
+
+
+def parse_param(text):
+    param, sep, values = text.partition("=")
+    if not sep or not param:
+        raise argparse.ArgumentTypeError(f"expected NAME=VALUE[,VALUE...], got {text!r}")
+    return param, values.split(",")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run report queries and write the results to files.")
+    parser.add_argument("queries", nargs="*", help="registered query names (see --list)")
+    parser.add_argument("--all", action="store_true", help="run every registered query")
+    parser.add_argument("--list", action="store_true", help="list the queries and their parameters")
+    parser.add_argument("--param", type=parse_param, action="append", default=[], metavar="NAME=V1,V2",
+                        help="values to sweep for a parameter; repeatable")
+    parser.add_argument("--window", choices=WINDOWS, help="split the start..end range into windows")
+    parser.add_argument("--format", choices=export.FORMATS, default="CSV")
+    parser.add_argument("--out", default=export.EXPORT_DIR, help="output directory")
+    parser.add_argument("--db", help="database file (default: db.DB_FILE)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, (_, declared) in registry.QUERIES.items():
+            print(name)
+            for param, kind, sample in declared:
+                print(f"    {param} ({kind}, e.g. {sample})")
+        return 0
+
+    names = list(registry.QUERIES) if args.all else args.queries
+    unknown = [name for name in names if name not in registry.QUERIES]
+    if not names or unknown:
+        parser.error(f"unknown query: {unknown[0]}" if unknown else "give query names or --all")
+    values = dict(args.param)
+    declared = {param for name in names for param, _, _ in registry.QUERIES[name][1]}
+    if set(values) - declared:
+        parser.error(f"no selected query takes: {', '.join(sorted(set(values) - declared))}")
+    path = args.db or db.DB_FILE
+    if not os.path.exists(path):
+        parser.error(f"database not found: {path}")
+
+    try:
+        jobs = plan(names, values, args.format, args.out, args.window)
+    except (TypeError, ValueError) as e:
+        parser.error(str(e))
+
+    started, failed = time.perf_counter(), 0
+    for (name, _, params, _), result in run(jobs, args.format, path, args.workers):
+        if isinstance(result, Exception):
+            failed += 1
+            print(f"FAIL {name} {params or ''}: {result}", file=sys.stderr)
+        else:
+            out, rows, seconds = result
+            print(f"{rows:>10,} rows  {seconds:7.2f}s  {out}")
+    print(f"{len(jobs) - failed}/{len(jobs)} reports written in {time.perf_counter() - started:.1f}s "
+          f"({args.workers} workers)")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,61 @@
+"""Server-side reduction of query results before they are plotted.
+
+Plotly sends every row of the DataFrame it is given to the browser, so the
+reports pass their results through these first. Each function returns a
+frame whose size is bounded by its limit, whatever the size of the input.
+"""
+import pandas as pd
+
+MAX_SLICES = 10  # pie slices / series, including "Other"
+MAX_BARS = 50
+MAX_POINTS = 400  # points per time series
+
+# Bucket sizes tried in order, smallest first
+FREQUENCIES = [("D", "Daily"), ("W", "Weekly"), ("MS", "Monthly"), ("QS", "Quarterly"), ("YS", "Yearly")]
+
+
+def top_k(df, label, value, k=MAX_SLICES, other="Other"):
+    """Sums `value` per `label`, keeps the k - 1 largest and folds the rest into `other`."""
+    totals = df.groupby(label, dropna=False, sort=False)[value].sum().sort_values(ascending=False)
+    if len(totals) > k:
+        totals = pd.concat([totals.iloc[:k - 1], pd.Series({other: totals.iloc[k - 1:].sum()})])
+    return totals.rename_axis(label).reset_index(name=value)
+
+
+def limit_series(df, label, value, k=MAX_SLICES, other="Other"):
+    """Relabels rows outside the k - 1 largest `label`s (by total `value`) as `other`."""
+    totals = df.groupby(label, dropna=False)[value].sum()
+    if len(totals) <= k:
+        return df
+    keep = totals.nlargest(k - 1).index
+    return df.assign(**{label: df[label].where(df[label].isin(keep), other)})
+
+
+def downsample_bars(df, value, max_bars=MAX_BARS, ascending=False):
+    """The `max_bars` rows with the largest (or smallest) `value`, plus how many were left out."""
+    if len(df) <= max_bars:
+        return df, 0
+    kept = df.nsmallest(max_bars, value) if ascending else df.nlargest(max_bars, value)
+    return kept, len(df) - max_bars
+
+
+def pick_frequency(start, end, max_points=MAX_POINTS):
+    """The smallest bucket size that keeps [start, end] within max_points buckets."""
+    for freq, name in FREQUENCIES:
+        if len(pd.date_range(start, end, freq=freq)) <= max_points:
+            return freq, name
+    return FREQUENCIES[-1]
+
+
+def bucket_dates(df, date, values, by=None, max_points=MAX_POINTS):
+    """Sums `values` per date bucket (and per `by` series, if given).
+
+    Returns (DataFrame, bucket name such as "Weekly").
+    """
+    df = df.assign(**{date: pd.to_datetime(df[date])})
+    if df.empty:
+        return df[[date] + ([by] if by else []) + list(values)], FREQUENCIES[0][1]
+    freq, name = pick_frequency(df[date].min(), df[date].max(), max_points)
+    keys = [pd.Grouper(key=date, freq=freq)] + ([by] if by else [])
+    bucketed = df.groupby(keys, dropna=False)[list(values)].sum().reset_index()
+    return bucketed, name
@@ -0,0 +1,64 @@
+import streamlit as st
+from modules import charts, registry
+from datetime import date
+
+def load_kpis(start_date, end_date, top_products=5, top_customers=10, low_stock=50):
+    """Runs DASHBOARD_KPIS once and splits its rows into one result per KPI."""
+    df = registry.run("Executive Dashboard", start_date, end_date, top_products, top_customers, low_stock)
+
+    # Value mixes money and counts, so counts come back as floats
+    def section(kpi, label, value, sort=True, dtype=float):
+        rows = df[df['Kpi'] == kpi][['Label', 'Value']].rename(columns={'Label': label, 'Value': value})
+        rows = rows.astype({value: dtype})
+        rows = rows.sort_values(value, ascending=False) if sort else rows
+        return rows.reset_index(drop=True)
+
+    def scalar(kpi):
+        values = df.loc[df['Kpi'] == kpi, 'Value']
+        return 0 if values.empty or values.isna().all() else values.iloc[0]
+
+    return {
+        "sales_by_category": section('Sales by category', 'Category', 'TotalSales'),
+        "top_products": section('Top product', 'Name', 'UnitsSold', dtype=int),
+        "high_value_customers": section('High-value customer', 'Name', 'TotalSpent'),
+        "segments": section('Segment', 'Segment', 'Count', sort=False, dtype=int),
+        "high_value_count": int(scalar('High-value customers')),
+        "average_order_value": float(scalar('Average order value')),
+        "low_stock_count": int(scalar('Low-stock products')),
+    }
+
+def app():
+    import plotly.express as px  # slow to import, so only once the page is shown
+
+    st.title("📈 Executive Dashboard")
+    st.text("The headline numbers from every report, computed together in one query.")
+
+    col1, col2, col3 = st.columns(3)
+    start_date = col1.date_input("Start Date", date(2025, 1, 1))
+    end_date = col2.date_input("End Date", date(2025, 12, 31))
+    low_stock = col3.number_input("Low stock below", 0, 10_000, 50)
+
+    kpis = load_kpis(start_date, end_date, low_stock=low_stock)
+    sales = kpis["sales_by_category"]
+
+    col1, col2, col3, col4 = st.columns(4)
+    col1.metric("Sales in period", f"${sales['TotalSales'].sum():,.2f}")
+    col2.metric("Average order value", f"${kpis['average_order_value']:,.2f}")
+    col3.metric("High-value customers", f"{kpis['high_value_count']:,}")
+    col4.metric("Low-stock products", f"{kpis['low_stock_count']:,}")
+
+    st.divider()
+    col1, col2 = st.columns(2)
+    if not sales.empty:
+        fig = px.bar(charts.top_k(sales, 'Category', 'TotalSales'), x='Category', y='TotalSales',
+                     title="Sales by Category")
+        col1.plotly_chart(fig, use_container_width=True)
+    if not kpis["segments"].empty:
+        fig = px.pie(kpis["segments"], values='Count', names='Segment', title="Customer Segments")
+        col2.plotly_chart(fig, use_container_width=True)
+
+    col1, col2 = st.columns(2)
+    col1.subheader("Top Selling Products")
+    col1.dataframe(kpis["top_products"], use_container_width=True, hide_index=True)
+    col2.subheader("Top High-Value Customers")
+    col2.dataframe(kpis["high_value_customers"], use_container_width=True, hide_index=True)
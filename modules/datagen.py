@@ -0,0 +1,209 @@
+"""Deterministic synthetic data generator for the NordicX schema.
+
+Sizes are driven by the number of order items; the other tables are scaled
+from it. The same (items, seed) pair always produces the same database.
+
+    python -m modules.datagen bench.db --scale small
+    python -m modules.datagen bench.db --items 250000 --seed 7
+"""
+import argparse
+import random
+import sqlite3
+import sys
+import time
+from datetime import date, timedelta
+
+from modules import indexes, migrations, summaries
+
+# Named scale factors, in order items
+SCALES = {
+    "small": 10_000,
+    "medium": 1_000_000,
+    "large": 50_000_000,
+}
+
+CATEGORIES = ["Furniture", "Textiles", "Kitchen", "Tableware", "Lifestyle",
+              "Outdoors", "Office", "Storage", "Lighting", "Garden"]
+POSITIONS = ["Store Manager", "Sales Associate", "Inventory Coordinator",
+             "Customer Support", "Warehouse Staff", "Logistics Manager"]
+SHIFTS = ["Morning Shift", "Afternoon Shift", "Full Day"]
+FIRST_NAMES = ["Anna", "Erik", "Ingrid", "Jonas", "Kari", "Lars", "Maja",
+               "Nils", "Ole", "Sara", "Freja", "Henrik", "Ida", "Liv", "Oskar"]
+LAST_NAMES = ["Berg", "Olsen", "Nilsen", "Karlsson", "Svensson", "Hansen",
+              "Larsen", "Lund", "Holm", "Mortensen", "Nyberg", "Sørensen"]
+CITIES = ["Oslo, Norway", "Bergen, Norway", "Stockholm, Sweden", "Malmö, Sweden",
+          "Copenhagen, Denmark", "Aarhus, Denmark", "Helsinki, Finland"]
+
+START_DATE = date(2023, 1, 1)
+DAYS = 3 * 365
+ITEMS_PER_ORDER = 3  # average; actual orders have 1-5 lines
+
+
+def table_sizes(items):
+    """Target row counts for each table at a given number of order items."""
+    orders = max(1, items // ITEMS_PER_ORDER)
+    products = min(max(50, items // 1000), 200_000)
+    employees = max(10, orders // 10_000)
+    return {
+        "Customer": max(100, orders // 5),
+        "Supplier": max(10, products // 50),
+        "Product": products,
+        "Order": orders,
+        "OrderItem": items,
+        "Employee": employees,
+        "Schedule": employees * 60,
+    }
+
+
+def _next_id(conn, table, column):
+    return conn.execute(f"SELECT COALESCE(MAX({column}), 0) + 1 FROM `{table}`").fetchone()[0]
+
+
+def _insert_batches(conn, sql, rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            conn.executemany(sql, batch)
+            batch.clear()
+    if batch:
+        conn.executemany(sql, batch)
+
+
+def _person(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _phone(rng):
+    return f"+47 {rng.randrange(10_000_000, 99_999_999)}"
+
+
+def generate(path, items, seed=42, batch_size=50_000, progress=print):
+    """Creates (or extends) the database at `path` with synthetic data.
+
+    All rows are written with batched executemany inside a single transaction.
+    Summary triggers are suspended during the load and the summaries rebuilt
+    once at the end; the managed indexes are built afterwards. Both are much
+    faster than maintaining them row by row. Returns the row counts added.
+    """
+    rng = random.Random(seed)
+    sizes = table_sizes(items)
+    conn = sqlite3.connect(path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = OFF")
+    conn.execute("PRAGMA foreign_keys = OFF")
+    migrations.migrate(conn)
+    conn.isolation_level = None
+    started = time.perf_counter()
+
+    def step(name):
+        if progress:
+            progress(f"  {name:<10} {sizes[name]:>12,} rows  ({time.perf_counter() - started:.1f}s)")
+
+    try:
+        conn.execute("BEGIN")
+        summaries.drop_triggers(conn)
+        first = {t: _next_id(conn, t, t + "ID") for t in sizes}
+
+        c0 = first["Customer"]
+        _insert_batches(conn, "INSERT INTO Customer VALUES (?, ?, ?, ?, ?)", (
+            (c0 + i, _person(rng), f"customer{c0 + i}.{seed}@example.com", _phone(rng), rng.choice(CITIES))
+            for i in range(sizes["Customer"])
+        ), batch_size)
+        step("Customer")
+
+        s0 = first["Supplier"]
+        _insert_batches(conn, "INSERT INTO Supplier VALUES (?, ?, ?, ?)", (
+            (s0 + i, f"Supplier {s0 + i}", f"sales@supplier{s0 + i}.example.com", rng.choice(CITIES))
+            for i in range(sizes["Supplier"])
+        ), batch_size)
+        step("Supplier")
+
+        p0 = first["Product"]
+        prices = [round(rng.uniform(5, 500), 2) for _ in range(sizes["Product"])]
+        _insert_batches(conn, "INSERT INTO Product (ProductID, SupplierID, Name, Description, Price,"
+                              " StockLevel, Category) VALUES (?, ?, ?, ?, ?, ?, ?)", (
+            (p0 + i, s0 + rng.randrange(sizes["Supplier"]), f"Product {p0 + i}", None,
+             prices[i], rng.randrange(0, 200), rng.choice(CATEGORIES))
+            for i in range(sizes["Product"])
+        ), batch_size)
+        step("Product")
+
+        o0, oi0 = first["Order"], first["OrderItem"]
+        orders, lines = [], []
+        order_id, item_id = o0, oi0
+        while item_id < oi0 + items:
+            count = min(rng.randint(1, 2 * ITEMS_PER_ORDER - 1), oi0 + items - item_id)
+            total = 0.0
+            for _ in range(count):
+                product = rng.randrange(sizes["Product"])
+                quantity = rng.randint(1, 4)
+                lines.append((item_id, order_id, p0 + product, quantity, prices[product]))
+                total += quantity * prices[product]
+                item_id += 1
+            order_date = START_DATE + timedelta(days=rng.randrange(DAYS))
+            orders.append((order_id, c0 + rng.randrange(sizes["Customer"]), order_date.isoformat(), round(total, 2)))
+            order_id += 1
+            if len(lines) >= batch_size:
+                conn.executemany("INSERT INTO `Order` VALUES (?, ?, ?, ?)", orders)
+                conn.executemany("INSERT INTO OrderItem VALUES (?, ?, ?, ?, ?)", lines)
+                orders.clear()
+                lines.clear()
+        if orders:
+            conn.executemany("INSERT INTO `Order` VALUES (?, ?, ?, ?)", orders)
+            conn.executemany("INSERT INTO OrderItem VALUES (?, ?, ?, ?, ?)", lines)
+        sizes["Order"] = order_id - o0
+        step("Order")
+        step("OrderItem")
+
+        e0 = first["Employee"]
+        _insert_batches(conn, "INSERT INTO Employee VALUES (?, ?, ?, ?, ?)", (
+            (e0 + i, _person(rng), rng.choice(POSITIONS), f"employee{e0 + i}.{seed}@nordicx.com", _phone(rng))
+            for i in range(sizes["Employee"])
+        ), batch_size)
+        step("Employee")
+
+        _insert_batches(conn, "INSERT INTO Schedule (EmployeeID, ScheduleDate, ShiftDetails) VALUES (?, ?, ?)", (
+            (e0 + rng.randrange(sizes["Employee"]),
+             (START_DATE + timedelta(days=rng.randrange(DAYS))).isoformat(), rng.choice(SHIFTS))
+            for _ in range(sizes["Schedule"])
+        ), batch_size)
+        step("Schedule")
+
+        summaries.rebuild(conn)
+        summaries.create_triggers(conn)
+        conn.execute("COMMIT")
+    except Exception:
+        conn.execute("ROLLBACK")
+        raise
+    finally:
+        conn.isolation_level = ""
+
+    try:
+        indexes.sync_indexes(conn)
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    if progress:
+        progress(f"  indexes built ({time.perf_counter() - started:.1f}s)")
+    return sizes
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate a synthetic NordicX database.")
+    parser.add_argument("path", help="database file to create or extend")
+    size = parser.add_mutually_exclusive_group()
+    size.add_argument("--scale", choices=SCALES, default="small")
+    size.add_argument("--items", type=int, help="number of order items (overrides --scale)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    args = parser.parse_args(argv)
+
+    items = args.items or SCALES[args.scale]
+    print(f"Generating {items:,} order items into {args.path} (seed {args.seed})")
+    generate(args.path, items, seed=args.seed, batch_size=args.batch_size)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
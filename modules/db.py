@@ -1,208 +1,655 @@
+import atexit
+import functools
+import itertools
+import os
+import re
 import sqlite3
-import pandas as pd
-import streamlit as st
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent import futures
+from urllib.parse import quote
+from modules import indexes, migrations, querylog
+from modules.pool import ConnectionPool, DEFAULT_PRAGMAS, apply_pragmas
 
-DB_FILE = "nordicx.db" # Using file based DB to persist data across connections
+DB_FILE = os.environ.get("NORDICX_DB", "nordicx.db") # Using file based DB to persist data across connections
+POOL_SIZE = 8
+PRAGMAS = dict(DEFAULT_PRAGMAS)
+CACHE_MAX_BYTES = 64 * 1024 * 1024  # memory budget for cached query results
+STATEMENT_CACHE_SIZE = 256  # prepared statements kept per pooled connection
+# "sqlite", or a columnar engine for the aggregate reports (see analytics.py)
+ANALYTICS_ENGINE = os.environ.get("NORDICX_ANALYTICS_ENGINE", "sqlite")
+ANALYTICS_REFRESH_SECONDS = 60  # minimum age before a stale snapshot is rebuilt
+# Read-only connections for the query executor; journal_mode can't be set on them
+READ_PRAGMAS = {name: value for name, value in PRAGMAS.items() if name != "journal_mode"}
+# Where run_query reads from: "direct" (the shared read/write pool), "wal-ro"
+# (read-only connections to the live WAL database) or "snapshot" (a copy made
+# with the backup API, refreshed in the background when the data changed and
+# it is older than SNAPSHOT_REFRESH_SECONDS)
+READ_MODES = ("direct", "wal-ro", "snapshot")
+READ_MODE = os.environ.get("NORDICX_READ_MODE", "direct")
+SNAPSHOT_REFRESH_SECONDS = 30
+SNAPSHOT_BACKUP_PAGES = 1024  # pages copied between checks for process exit
+ESTIMATE_ROWS_ABOVE = 100_000  # unfiltered browser counts above this are estimated
+
+_pool = None
+_read_pool = None
+_pool_lock = threading.Lock()
+_executor = None
+_executor_lock = threading.Lock()
+_worker = threading.local()
+_version_conn = None
+_version_lock = threading.Lock()
+_snapshot = None
+_snapshot_lock = threading.Lock()
+_snapshot_refresher = None  # the background refresh thread, if one is running
+_snapshot_generations = itertools.count(1)
+_snapshot_stop = threading.Event()  # set at exit: abandon a backup in progress
 
 def get_connection():
-    return sqlite3.connect(DB_FILE)
+    """Opens a standalone connection (used for schema setup and writes)."""
+    conn = sqlite3.connect(DB_FILE)
+    apply_pragmas(conn, PRAGMAS)
+    return conn
 
-def run_query(query, params=None):
-    conn = get_connection()
+@contextmanager
+def write_transaction(conn=None):
+    """Runs the block in one BEGIN IMMEDIATE transaction on `conn`, or on a
+    connection of its own that is closed afterwards.
+
+    The write lock is taken up front, so the block never has to upgrade a
+    read lock. Commits if the block succeeds and rolls back if it raises;
+    `conn`'s isolation level is restored either way.
+    """
+    own = conn is None
+    conn = get_connection() if own else conn
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None
     try:
-        if params:
-            df = pd.read_sql_query(query, conn, params=params)
-        else:
-            df = pd.read_sql_query(query, conn)
-        return df
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
     finally:
-        conn.close()
+        conn.isolation_level = isolation_level
+        if own:
+            conn.close()
 
-def init_db():
-    """Initializes the database with schema and sample data."""
-    conn = get_connection()
-    c = conn.cursor()
-    
-    # Enable foreign key support
-    c.execute("PRAGMA foreign_keys = ON;")
-
-    # Schema Creation
-    schema_sql = """
-    -- Drop tables to ensure fresh start (resets AUTOINCREMENT)
-    DROP TABLE IF EXISTS Schedule;
-    DROP TABLE IF EXISTS Employee;
-    DROP TABLE IF EXISTS OrderItem;
-    DROP TABLE IF EXISTS `Order`;
-    DROP TABLE IF EXISTS Product;
-    DROP TABLE IF EXISTS Supplier;
-    DROP TABLE IF EXISTS Customer;
-
-    -- Tables
-    CREATE TABLE IF NOT EXISTS Customer (
-        CustomerID INTEGER PRIMARY KEY AUTOINCREMENT,
-        Name VARCHAR(100) NOT NULL,
-        Email VARCHAR(50) UNIQUE NOT NULL,
-        Phone VARCHAR(30),
-        Address TEXT
-    );
-
-    CREATE TABLE IF NOT EXISTS Supplier (
-        SupplierID INTEGER PRIMARY KEY AUTOINCREMENT,
-        Name VARCHAR(100) NOT NULL,
-        ContactInfo VARCHAR(150),
-        Address TEXT
-    );
-
-    CREATE TABLE IF NOT EXISTS Product (
-        ProductID INTEGER PRIMARY KEY AUTOINCREMENT,
-        SupplierID INT NOT NULL,
-        Name VARCHAR(100) NOT NULL,
-        Description TEXT,
-        Price DECIMAL(10, 2) NOT NULL CHECK (Price >= 0),
-        StockLevel INT NOT NULL DEFAULT 0 CHECK (StockLevel >= 0),
-        Category VARCHAR(50),
-        FOREIGN KEY (SupplierID) REFERENCES Supplier(SupplierID)
-            ON DELETE RESTRICT ON UPDATE CASCADE
-    );
-
-    CREATE TABLE IF NOT EXISTS `Order` (
-        OrderID INTEGER PRIMARY KEY AUTOINCREMENT,
-        CustomerID INT NOT NULL,
-        OrderDate DATE NOT NULL,
-        TotalAmount DECIMAL(10, 2) NOT NULL CHECK (TotalAmount >= 0),
-        FOREIGN KEY (CustomerID) REFERENCES Customer(CustomerID)
-            ON DELETE RESTRICT ON UPDATE CASCADE
-    );
-
-    CREATE TABLE IF NOT EXISTS OrderItem (
-        OrderItemID INTEGER PRIMARY KEY AUTOINCREMENT,
-        OrderID INT NOT NULL,
-        ProductID INT NOT NULL,
-        Quantity INT NOT NULL CHECK (Quantity > 0),
-        Price DECIMAL(10, 2) NOT NULL CHECK (Price >= 0),
-        FOREIGN KEY (OrderID) REFERENCES `Order`(OrderID)
-            ON DELETE CASCADE ON UPDATE CASCADE,
-        FOREIGN KEY (ProductID) REFERENCES Product(ProductID)
-            ON DELETE RESTRICT ON UPDATE CASCADE
-    );
-
-    CREATE TABLE IF NOT EXISTS Employee (
-        EmployeeID INTEGER PRIMARY KEY AUTOINCREMENT,
-        Name VARCHAR(100) NOT NULL,
-        Position VARCHAR(50),
-        Email VARCHAR(50) UNIQUE NOT NULL,
-        Phone VARCHAR(30)
-    );
-
-    CREATE TABLE IF NOT EXISTS Schedule (
-        ScheduleID INTEGER PRIMARY KEY AUTOINCREMENT,
-        EmployeeID INT NOT NULL,
-        ScheduleDate DATE NOT NULL,
-        ShiftDetails VARCHAR(100),
-        FOREIGN KEY (EmployeeID) REFERENCES Employee(EmployeeID)
-            ON DELETE CASCADE ON UPDATE CASCADE
-    );
-    """
-    
-    # Data Insertion
-    data_sql = """
-    -- Customers
-    INSERT INTO Customer (Name, Email, Phone, Address) VALUES
-    ('Vahid Niamadpour', 'vahid.niamadpour@gmail.com', '+47 123456789', 'Oslo, Norway'),
-    ('Gebremariam Assres', 'gebremariam.assres@yahoo.com', '+47 2134658', 'Oslo, Norway'),
-    ('John Smith', 'john.smith@hotmail.com', '+46 731234567', 'Gothenburg, Sweden'),
-    ('Ole Olesen', 'ole.olesen@mail.dk', '+47 531208755', 'Moss, Norway'),
-    ('Ingrid Olsen', 'ingrid.olsen@outlook.com', '+47 98877665', 'Oslo, Norway'),
-    ('Erik Svensson', 'erik.svensson@gmail.com', '+46 722334455', 'Malmö, Sweden'),
-    ('Kari Nilsen', 'kari.nilsen@online.no', '+47 94455667', 'Bergen, Norway'),
-    ('Anna Karlsson', 'anna.karlsson@icloud.com', '+46 733221100', 'Uppsala, Sweden'),
-    ('Jonas Berg', 'jonas.berg@mail.se', '+46 744556677', 'Västerås, Sweden'),
-    ('Freja Mortensen', 'freja.mortensen@mail.dk', '+45 82233445', 'Odense, Denmark');
-
-    -- Suppliers
-    INSERT INTO Supplier (Name, ContactInfo, Address) VALUES
-    ('Kristiania AB', 'contact@kristiania.no', 'Oslo, Norway'),
-    ('EcoTextiles Nordic', 'sales@ecotextiles.no', 'Trondheim, Norway'),
-    ('GreenLiving Supplies', 'info@greenliving.dk', 'Aalborg, Denmark'),
-    ('PureCeramics Oy', 'support@pureceramics.fi', 'Helsinki, Finland'),
-    ('ScandiHome Essentials', 'orders@scandihome.se', 'Lund, Sweden'),
-    ('NordicCraft Supplies', 'hello@nordiccraft.no', 'Bergen, Norway'),
-    ('FjordHome Products', 'support@fjordhome.no', 'Stavanger, Norway'),
-    ('Arctic Essentials AS', 'contact@arcticessentials.no', 'Tromsø, Norway'),
-    ('OsloDesign Partners', 'info@oslopartners.no', 'Oslo, Norway'),
-    ('VikingEco Materials', 'sales@vikingeco.no', 'Kristiansand, Norway');
-
-    -- Products
-    INSERT INTO Product (SupplierID, Name, Description, Price, StockLevel, Category) VALUES
-    (1, 'Oak Wooden Chair', 'Sustainably sourced oak chair', 149.99, 25, 'Furniture'),
-    (2, 'Organic Cotton Blanket', 'Soft organic cotton throw blanket', 89.99, 40, 'Textiles'),
-    (3, 'Reusable Glass Jars', 'Set of 3 reusable storage jars', 39.99, 50, 'Kitchen'),
-    (4, 'Ceramic Dinner Plate', 'Handcrafted ceramic dinner plate', 24.99, 80, 'Tableware'),
-    (5, 'Natural Scented Candle', 'Soy wax candle with pine scent', 34.99, 70, 'Lifestyle'),
-    (6, 'Handmade Birch Shelf', 'Minimalist birch wall shelf', 129.99, 20, 'Furniture'),
-    (7, 'Fjord Wool Rug', 'Thick wool rug inspired by Norwegian fjords', 199.99, 15, 'Textiles'),
-    (8, 'Arctic Steel Thermos', 'Insulated thermos for cold climates', 49.99, 60, 'Outdoors'),
-    (9, 'Oslo Desk Organizer', 'Modern wooden desk organizer', 59.99, 30, 'Office'),
-    (10, 'VikingEco Storage Crate', 'Recycled wood storage crate', 44.99, 40, 'Storage');
-
-    -- Orders
-    INSERT INTO `Order` (CustomerID, OrderDate, TotalAmount) VALUES
-    (1, '2025-01-10', 189.98),
-    (2, '2025-01-12', 299.99),
-    (3, '2025-01-15', 59.98),
-    (4, '2025-01-18', 149.99),
-    (5, '2025-01-20', 89.99),
-    (6, '2025-01-22', 74.98),
-    (7, '2025-01-25', 39.99),
-    (8, '2025-01-27', 119.98),
-    (9, '2025-01-28', 34.99),
-    (10, '2025-01-30', 44.99);
-
-    -- Order Items
-    INSERT INTO OrderItem (OrderID, ProductID, Quantity, Price) VALUES
-    (1, 3, 2, 89.99), (2, 2, 1, 299.99), (3, 4, 2, 29.99),
-    (4, 1, 1, 149.99), (5, 3, 1, 89.99), (6, 8, 2, 19.99),
-    (7, 5, 1, 39.99), (8, 7, 2, 24.99), (9, 9, 1, 34.99),
-    (10, 10, 1, 44.99), (1, 6, 1, 19.99), (2, 7, 1, 24.99),
-    (3, 5, 1, 39.99), (4, 8, 1, 19.99), (5, 9, 1, 34.99);
-
-    -- Employees
-    INSERT INTO Employee (Name, Position, Email, Phone) VALUES
-    ('Nils Eriksen', 'Store Manager', 'nils.eriksen@nordicx.com', '+47 701111111'),
-    ('Maria Holm', 'Sales Associate', 'maria.holm@nordicx.com', '+47 702222222'),
-    ('Oskar Nilsson', 'Inventory Coordinator', 'oskar.nilsson@nordicx.com', '+46 703333333'),
-    ('Liv Sørensen', 'Customer Support', 'liv.sorensen@nordicx.com', '+45 81112222'),
-    ('Anders Bjorn', 'Warehouse Staff', 'anders.bjorn@nordicx.com', '+47 95554433'),
-    ('Elin Karlstad', 'Sales Associate', 'elin.karlstad@nordicx.com', '+46 704444444'),
-    ('Thomas Lund', 'Logistics Manager', 'thomas.lund@nordicx.com', '+45 83334444'),
-    ('Sara Nyberg', 'Marketing Assistant', 'sara.nyberg@nordicx.com', '+46 705555555'),
-    ('Henrik Olsen', 'Store Assistant', 'henrik.olsen@nordicx.com', '+47 92223344'),
-    ('Ida Pettersson', 'HR Coordinator', 'ida.pettersson@nordicx.com', '+46 706666666');
-
-    -- Schedules
-    INSERT INTO Schedule (EmployeeID, ScheduleDate, ShiftDetails) VALUES
-    (1, '2025-02-01', 'Morning Shift'), (2, '2025-02-01', 'Afternoon Shift'),
-    (3, '2025-02-01', 'Full Day'), (4, '2025-02-02', 'Morning Shift'),
-    (5, '2025-02-02', 'Afternoon Shift'), (6, '2025-02-03', 'Morning Shift'),
-    (7, '2025-02-03', 'Full Day'), (8, '2025-02-04', 'Afternoon Shift'),
-    (9, '2025-02-04', 'Morning Shift'), (10, '2025-02-05', 'Full Day');
-
-    -- View for Customer Purchase History (Query 9 from scenario)
-    CREATE VIEW IF NOT EXISTS CustomerPurchaseHistory AS
-    SELECT c.CustomerID, c.Name AS CustomerName, o.OrderID, o.OrderDate,
-           o.TotalAmount
-    FROM Customer c
-    JOIN `Order` o ON c.CustomerID = o.CustomerID;
+def get_pool():
+    """Returns the process-wide connection pool, creating it on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_FILE, size=POOL_SIZE, pragmas=PRAGMAS,
+                                       cached_statements=STATEMENT_CACHE_SIZE)
+    return _pool
+
+def get_read_pool():
+    """Returns the pool of read-only (mode=ro) connections used by submit_query."""
+    global _read_pool
+    if _read_pool is None:
+        with _pool_lock:
+            if _read_pool is None:
+                uri = f"file:{quote(os.path.abspath(DB_FILE))}?mode=ro"
+                _read_pool = ConnectionPool(uri, size=POOL_SIZE, pragmas=READ_PRAGMAS, uri=True,
+                                            cached_statements=STATEMENT_CACHE_SIZE)
+    return _read_pool
+
+class ReadSnapshot:
+    """A read-only copy of DB_FILE made with the backup API, with its own pool.
+
+    The copy never changes, so it is opened with immutable=1 and readers
+    take no locks at all. Its file name is unique to the process, so replicas
+    sharing DB_FILE never write over each other's snapshots. Once replaced,
+    it is closed and deleted when its last reader is done.
     """
 
+    def __init__(self, generation):
+        self.generation = generation
+        self.readers = 0  # connections checked out, guarded by _snapshot_lock
+        self.retired = False
+        directory, name = os.path.split(os.path.abspath(DB_FILE))
+        fd, self.path = tempfile.mkstemp(prefix=f"{name}.snapshot-{os.getpid()}-{generation}-", dir=directory)
+        os.close(fd)
+        # Taken before the copy: a write landing meanwhile only causes an extra refresh
+        self.version = data_version()
+        source = sqlite3.connect(f"file:{quote(os.path.abspath(DB_FILE))}?mode=ro", uri=True)
+        target = sqlite3.connect(self.path)
+        try:
+            source.backup(target, pages=SNAPSHOT_BACKUP_PAGES, progress=_backup_progress)
+            target.execute("PRAGMA journal_mode = DELETE")
+        except Exception:
+            target.close()  # rolls back the copy and removes its journal
+            os.remove(self.path)
+            raise
+        finally:
+            source.close()
+            target.close()
+        self.created = time.monotonic()
+        uri = f"file:{quote(os.path.abspath(self.path))}?mode=ro&immutable=1"
+        self.pool = ConnectionPool(uri, size=POOL_SIZE, pragmas=READ_PRAGMAS, uri=True,
+                                   cached_statements=STATEMENT_CACHE_SIZE)
+
+    def due(self):
+        return (time.monotonic() - self.created >= SNAPSHOT_REFRESH_SECONDS
+                and data_version() != self.version)
+
+    def retire(self):
+        """Marks the snapshot replaced; True if no reader holds it and it can be closed now.
+
+        Called with _snapshot_lock held.
+        """
+        self.retired = True
+        return not self.readers
+
+    def close(self):
+        self.pool.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass  # still open by a reader on a platform that won't unlink it
+
+def _backup_progress(status, remaining, total):
+    if _snapshot_stop.is_set():
+        raise RuntimeError("process is exiting")
+
+def _refresh_snapshot():
+    global _snapshot, _snapshot_refresher
     try:
-        c.executescript(schema_sql)
-        c.executescript(data_sql)
-        conn.commit()
+        fresh = ReadSnapshot(next(_snapshot_generations))
+        with _snapshot_lock:
+            old, _snapshot = _snapshot, fresh
+            unused = old is not None and old.retire()
+        if unused:
+            old.close()
     except Exception as e:
-        print(f"Error initializing DB: {e}")
+        if not _snapshot_stop.is_set():
+            print(f"Error refreshing read snapshot: {e}")
+    finally:
+        with _snapshot_lock:
+            _snapshot_refresher = None
+
+def _current_snapshot():
+    """get_snapshot() with _snapshot_lock already held."""
+    global _snapshot, _snapshot_refresher
+    if _snapshot is None:
+        _snapshot = ReadSnapshot(next(_snapshot_generations))
+    elif _snapshot_refresher is None and _snapshot.due():
+        _snapshot_refresher = threading.Thread(target=_refresh_snapshot, name="nordicx-snapshot", daemon=True)
+        _snapshot_refresher.start()
+    return _snapshot
+
+def get_snapshot():
+    """Returns the current read snapshot, starting a background refresh if it is due."""
+    with _snapshot_lock:
+        return _current_snapshot()
+
+@contextmanager
+def _snapshot_connection():
+    # Checked out under the lock, so a refresh can't close the snapshot in between
+    with _snapshot_lock:
+        snap = _current_snapshot()
+        snap.readers += 1
+    try:
+        with snap.pool.connection() as conn:
+            yield conn
+    finally:
+        with _snapshot_lock:
+            snap.readers -= 1
+            unused = snap.retired and not snap.readers
+        if unused:
+            snap.close()
+
+@contextmanager
+def reader_connection(interruptible=False):
+    """A connection from wherever READ_MODE sends reads; submit_query always avoids the shared pool."""
+    if READ_MODE not in READ_MODES:
+        raise ValueError(f"Unknown read mode: {READ_MODE}")
+    if READ_MODE == "snapshot":
+        with _snapshot_connection() as conn:
+            yield conn
+        return
+    pool = get_read_pool() if READ_MODE == "wal-ro" or interruptible else get_pool()
+    with pool.connection() as conn:
+        yield conn
+
+def _close_snapshot(force=False):
+    """Waits for a refresh in progress, then retires this process's snapshot.
+
+    Its file is removed now, or by its last reader unless `force`.
+    """
+    global _snapshot
+    with _snapshot_lock:
+        refresher = _snapshot_refresher
+    if refresher is not None:
+        refresher.join()
+    with _snapshot_lock:
+        old, _snapshot = _snapshot, None
+        unused = old is not None and old.retire()
+    if unused or (force and old is not None):
+        old.close()
+
+@atexit.register
+def _remove_snapshots():
+    """Abandons a refresh in progress and removes this process's snapshot files."""
+    _snapshot_stop.set()
+    _close_snapshot(force=True)
+
+def reset_pool():
+    """Closes the pools so the next query reconnects (e.g. after DB_FILE changes)."""
+    global _pool, _read_pool, _version_conn
+    with _pool_lock:
+        for pool in (_pool, _read_pool):
+            if pool is not None:
+                pool.close()
+        _pool = _read_pool = None
+    _close_snapshot()
+    with _version_lock:
+        if _version_conn is not None:
+            _version_conn.close()
+        _version_conn = None
+    query_cache.clear()
+    from modules import lookup
+    lookup.clear()
+    if ANALYTICS_ENGINE != "sqlite":
+        from modules import analytics
+        analytics.reset()
+
+def data_version():
+    """Returns a token that changes whenever any connection commits a write.
+
+    PRAGMA data_version only reports commits made by *other* connections, so
+    it is read from a dedicated connection that never writes.
+    """
+    global _version_conn
+    with _version_lock:
+        if _version_conn is None:
+            _version_conn = sqlite3.connect(DB_FILE, check_same_thread=False)
+        return _version_conn.execute("PRAGMA data_version").fetchone()[0]
+
+_SQL_TOKENS = re.compile(r"'(?:[^']|'')*'|\s+")
+
+@functools.lru_cache(maxsize=1024)
+def normalize_sql(query):
+    """Collapses whitespace outside string literals, so formatting doesn't matter."""
+    return _SQL_TOKENS.sub(lambda m: m.group() if m.group()[0] == "'" else " ", query).strip()
+
+def _cache_key(query, params):
+    if params is None:
+        key_params = ()
+    elif isinstance(params, dict):
+        key_params = tuple(sorted(params.items()))
+    elif isinstance(params, (list, tuple)):
+        key_params = tuple(params)
+    else:
+        key_params = (params,)
+    try:
+        hash(key_params)
+    except TypeError:
+        return None
+    return (normalize_sql(query), key_params)
+
+class QueryCache:
+    """LRU cache of query results, bounded by the DataFrames' memory footprint.
+
+    Every entry belongs to one data version; as soon as the database reports a
+    newer version the whole cache is dropped, so results are never stale.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (DataFrame, size in bytes)
+        self._bytes = 0
+        self._version = None
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _check_version(self, version):
+        if version != self._version:
+            self._entries.clear()
+            self._bytes = 0
+            self._version = version
+
+    def get(self, key, version):
+        with self._lock:
+            self._check_version(version)
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, version, df):
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            # A write landed while the query ran; its result may already be stale
+            if version != self._version:
+                return
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            self._entries[key] = (df, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, evicted) = self._entries.popitem(last=False)
+                self._bytes -= evicted
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self._version = None
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "bytes": self._bytes,
+                    "max_bytes": self.max_bytes, "hits": self.hits, "misses": self.misses}
+
+query_cache = QueryCache(CACHE_MAX_BYTES)
+
+def _read_sql(query, params):
+    import pandas as pd  # imported on first query, so startup and init_db don't pay for it
+
+    # Queries started by submit_query run on a read-only pool and can be interrupted
+    handle = getattr(_worker, "handle", None)
+    with reader_connection(interruptible=handle is not None) as conn:
+        if handle is not None:
+            handle._attach(conn)
+        try:
+            if params:
+                return pd.read_sql_query(query, conn, params=params)
+            return pd.read_sql_query(query, conn)
+        finally:
+            if handle is not None:
+                handle._attach(None)
+
+def _execute(query, params):
+    """Returns (DataFrame, data version of the analytics snapshot it came from or None)."""
+    if ANALYTICS_ENGINE != "sqlite":
+        from modules import analytics
+        if analytics.handles(query):
+            snap = analytics.snapshot()
+            return analytics.run_query(query, params, ANALYTICS_ENGINE, snap), snap.version
+    return _read_sql(query, params), None
+
+def run_query(query, params=None, cache=True):
+    """Runs a read query and returns a DataFrame.
+
+    Results are cached per (normalized SQL, params) until the data changes.
+    Pass cache=False for one-off queries that should always hit the database.
+    The aggregate reports go to the columnar engine when ANALYTICS_ENGINE is
+    set. Every call is timed and recorded in querylog.
+    """
+    started = time.perf_counter()
+    key = _cache_key(query, params) if cache else None
+    if key is None:
+        df, _ = _execute(query, params)
+        status = "off"
+    else:
+        # Cached results belong to the snapshot they were read from
+        version = get_snapshot().generation if READ_MODE == "snapshot" else data_version()
+        df = query_cache.get(key, version)
+        status = "hit"
+        if df is None:
+            df, source = _execute(query, params)
+            # A lagging analytics snapshot would otherwise stay cached until the next write
+            if source is None or source == data_version():
+                query_cache.put(key, version, df)
+            status = "miss"
+        df = df.copy()
+    querylog.record(normalize_sql(query), params, time.perf_counter() - started, len(df), status)
+    return df
+
+class QueryCancelled(Exception):
+    """Raised by QueryHandle.result() for a query that was cancelled."""
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = futures.ThreadPoolExecutor(max_workers=POOL_SIZE,
+                                                       thread_name_prefix="nordicx-query")
+    return _executor
+
+class QueryHandle:
+    """A run_query call running in the background; created by submit_query.
+
+    cancel() drops the query if it hasn't started yet and interrupts it
+    (sqlite3 Connection.interrupt) if it has, so its connection goes back
+    to the pool right away.
+    """
+
+    def __init__(self, query, params=None, cache=True):
+        self.query = query
+        self.params = params
+        self._cache = cache
+        self._conn = None
+        self._cancelled = False
+        self._lock = threading.Lock()
+        self._future = _get_executor().submit(self._run)
+
+    def _run(self):
+        if self._cancelled:
+            raise QueryCancelled("Query cancelled before it started")
+        _worker.handle = self
+        try:
+            return run_query(self.query, self.params, cache=self._cache)
+        except Exception as e:
+            if self._cancelled:
+                raise QueryCancelled("Query cancelled") from e
+            raise
+        finally:
+            _worker.handle = None
+
+    def _attach(self, conn):
+        with self._lock:
+            if conn is not None and self._cancelled:
+                raise QueryCancelled("Query cancelled before it started")
+            self._conn = conn
+
+    def cancel(self):
+        with self._lock:
+            self._cancelled = True
+            if self._conn is not None:
+                self._conn.interrupt()
+        self._future.cancel()
+
+    @property
+    def cancelled(self):
+        return self._cancelled
+
+    def done(self):
+        return self._future.done()
+
+    def wait(self, timeout=None):
+        """Waits up to `timeout` seconds; returns True once the query has finished."""
+        futures.wait([self._future], timeout)
+        return self._future.done()
+
+    def result(self, timeout=None):
+        try:
+            return self._future.result(timeout)
+        except futures.CancelledError:
+            raise QueryCancelled("Query cancelled before it started") from None
+
+def submit_query(query, params=None, cache=True):
+    """Starts run_query on the executor and returns a QueryHandle.
+
+    Submitted queries share the query cache but read through read-only
+    connections, so independent queries for a page can run in parallel.
+    """
+    return QueryHandle(query, params, cache)
+
+def cancel_queries(handles):
+    """Cancels every handle that hasn't finished yet."""
+    for handle in handles:
+        if not handle.done():
+            handle.cancel()
+
+def stream_query(query, params=None, chunksize=50_000):
+    """Yields the result of a read query as DataFrames of at most `chunksize` rows.
+
+    Rows are fetched from the cursor chunk by chunk, so memory stays bounded by
+    the chunk size. The pooled connection is held until the generator is
+    exhausted or closed.
+    """
+    import pandas as pd
+
+    with reader_connection() as conn:
+        yield from pd.read_sql_query(query, conn, params=params or None, chunksize=chunksize)
+
+def stream_record_batches(query, params=None, chunksize=50_000):
+    """Like stream_query, but yields pyarrow RecordBatches with one fixed schema."""
+    import pyarrow as pa
+
+    schema = None
+    for chunk in stream_query(query, params, chunksize):
+        if schema is None:
+            schema = pa.Schema.from_pandas(chunk, preserve_index=False)
+            # An all-NULL column in the first chunk says nothing about its type
+            schema = pa.schema([f.with_type(pa.string()) if pa.types.is_null(f.type) else f
+                                for f in schema])
+        yield pa.RecordBatch.from_pandas(chunk, schema=schema, preserve_index=False)
+
+# Filter operators the table browser accepts, mapped to SQL
+FILTER_OPS = {
+    "contains": "LIKE '%' || ? || '%'",
+    "=": "= ?",
+    "<": "< ?",
+    "<=": "<= ?",
+    ">": "> ?",
+    ">=": ">= ?",
+}
+
+def table_names():
+    tables = run_query("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';")
+    return tables['name'].tolist()
+
+def table_columns(table):
+    """Column names of a table; raises ValueError for unknown tables."""
+    if table not in table_names():
+        raise ValueError(f"Unknown table: {table}")
+    return run_query(f"PRAGMA table_info(`{table}`)")['name'].tolist()
+
+def primary_key(table):
+    """Primary key columns of a table, in key order; raises ValueError for unknown tables.
+
+    Tables without a declared primary key are keyed by ["rowid"].
+    """
+    if table not in table_names():
+        raise ValueError(f"Unknown table: {table}")
+    info = run_query(f"PRAGMA table_info(`{table}`)")
+    pk = info[info['pk'] > 0].sort_values('pk')['name'].tolist()
+    return pk or ["rowid"]
+
+def _where(table, filters):
+    columns = table_columns(table)
+    clauses, params = [], []
+    for column, op, value in filters or ():
+        if column not in columns:
+            raise ValueError(f"Unknown column: {table}.{column}")
+        if op not in FILTER_OPS:
+            raise ValueError(f"Unsupported filter operator: {op}")
+        clauses.append(f"`{column}` {FILTER_OPS[op]}")
+        params.append(value)
+    return clauses, params
+
+def _estimate_rows(table):
+    """Row count of a whole table from two index seeks, or from sqlite_stat1
+    for WITHOUT ROWID tables; None if neither is available."""
+    sql = run_query("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))['sql'][0]
+    if "WITHOUT ROWID" not in sql.upper():
+        # Exact unless rows were deleted; never an undercount
+        # Separate subqueries: MAX(rowid) - MIN(rowid) in one SELECT scans the table
+        return int(run_query(f"SELECT COALESCE((SELECT MAX(rowid) FROM `{table}`)"
+                             f" - (SELECT MIN(rowid) FROM `{table}`) + 1, 0) AS n")['n'][0])
+    if run_query("SELECT name FROM sqlite_master WHERE name = 'sqlite_stat1'").empty:
+        return None  # not ANALYZEd
+    stat = run_query("SELECT stat FROM sqlite_stat1 WHERE tbl = ? LIMIT 1", (table,))['stat']
+    return int(stat[0].split()[0]) if len(stat) else None
+
+def count_rows(table, filters=None):
+    """Row count for the browser as (count, exact).
+
+    Filtered counts are exact. A whole table counted more than
+    ESTIMATE_ROWS_ABOVE rows by _estimate_rows() reports that estimate
+    instead of scanning it, which would be repeated after every commit.
+    """
+    clauses, params = _where(table, filters)
+    if not clauses:
+        estimate = _estimate_rows(table)
+        if estimate is not None and estimate > ESTIMATE_ROWS_ABOVE:
+            return estimate, False
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    return int(run_query(f"SELECT COUNT(*) AS n FROM `{table}`{where}", tuple(params))['n'][0]), True
+
+def fetch_page(table, columns=None, after=None, page_size=50, filters=None):
+    """Fetches one page of a table using keyset pagination on its primary key.
+
+    `after` is the key tuple of the last row of the previous page (None for
+    the first page). Composite keys are compared as a row value, so every
+    page is an index range scan no matter how deep the user pages.
+    Returns (DataFrame, key tuple to pass as `after` for the next page or None).
+    """
+    all_columns = table_columns(table)
+    pk = primary_key(table)
+    columns = list(columns or all_columns)
+    unknown = set(columns) - set(all_columns)
+    if unknown:
+        raise ValueError(f"Unknown column(s) in {table}: {', '.join(sorted(unknown))}")
+    keys = ["rowid" if c == "rowid" else f"`{c}`" for c in pk]
+    # Key columns that aren't shown are selected under an alias and dropped again
+    hidden = {c: f"_key{i}" for i, c in enumerate(pk) if c not in columns}
+    select = ", ".join([f"{key} AS {hidden[c]}" for c, key in zip(pk, keys) if c in hidden]
+                       + [f"`{c}`" for c in columns])
+
+    clauses, params = _where(table, filters)
+    if after is not None:
+        if len(after) != len(pk):
+            raise ValueError(f"{table} is keyed by {len(pk)} column(s), got a cursor of {len(after)}")
+        clauses.append(f"({', '.join(keys)}) > ({', '.join('?' * len(keys))})")
+        params.extend(after)
+    where = f" WHERE {' AND '.join(clauses)}" if clauses else ""
+    query = f"SELECT {select} FROM `{table}`{where} ORDER BY {', '.join(keys)} LIMIT ?"
+    # One extra row tells us whether there is a next page
+    df = run_query(query, tuple(params) + (page_size + 1,))
+
+    next_after = None
+    if len(df) > page_size:
+        df = df.iloc[:page_size]
+        # tolist() turns NumPy scalars into Python values and leaves text as is
+        next_after = tuple(df[hidden.get(c, c)].iloc[-1:].tolist()[0] for c in pk)
+    if hidden:
+        df = df.drop(columns=list(hidden.values()))
+    return df, next_after
+
+def init_db():
+    """Brings the database schema and sample data up to date.
+
+    Only missing migrations are applied, so this is cheap to call repeatedly
+    and never drops existing data. The managed index set is synced afterwards.
+    A failing migration is rolled back and its exception propagates, so
+    callers (and st.cache_resource in app.py) never mistake it for success.
+    """
+    conn = get_connection()
+    try:
+        applied = migrations.migrate(conn)
+        indexes.sync_indexes(conn)
     finally:
         conn.close()
+    return applied
 
 if __name__ == "__main__":
     init_db()
@@ -0,0 +1,84 @@
+"""Streams report results to CSV or Parquet files chunk by chunk."""
+import os
+import re
+import time
+
+from modules import db
+
+EXPORT_DIR = "exports"
+# Files prepared in the UI; anything here older than SESSION_EXPORT_MAX_AGE
+# seconds is deleted the next time someone prepares an export
+SESSION_EXPORT_DIR = os.path.join(EXPORT_DIR, "sessions")
+SESSION_EXPORT_MAX_AGE = 60 * 60
+FORMATS = {"CSV": ".csv", "Parquet": ".parquet"}
+CHUNK_ROWS = 50_000
+
+
+def export_csv(query, params, path, chunksize=CHUNK_ROWS):
+    rows = 0
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        for i, chunk in enumerate(db.stream_query(query, params, chunksize)):
+            chunk.to_csv(f, header=(i == 0), index=False)
+            rows += len(chunk)
+    return rows
+
+
+def export_parquet(query, params, path, chunksize=CHUNK_ROWS):
+    import pyarrow.parquet as pq
+
+    rows = 0
+    writer = None
+    try:
+        for batch in db.stream_record_batches(query, params, chunksize):
+            if writer is None:
+                writer = pq.ParquetWriter(path, batch.schema)
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+
+def export_path(name, fmt, directory=EXPORT_DIR, token=None):
+    """File name for an export of `name`; `token` makes it unique, e.g. per UI session and parameters."""
+    slug = re.sub(r"[^A-Za-z0-9]+", "_", name).strip("_").lower()
+    if token:
+        slug = f"{slug}_{token}"
+    return os.path.join(directory, slug + FORMATS[fmt])
+
+
+def remove_export(path):
+    """Deletes an export file that is no longer offered; a missing file is fine."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+def remove_stale_exports(directory=SESSION_EXPORT_DIR, max_age=SESSION_EXPORT_MAX_AGE):
+    """Deletes files in `directory` older than `max_age` seconds. Returns how many."""
+    cutoff = time.time() - max_age
+    removed = 0
+    try:
+        entries = list(os.scandir(directory))
+    except FileNotFoundError:
+        return removed
+    for entry in entries:
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+                removed += 1
+        except FileNotFoundError:
+            pass  # removed by another session meanwhile
+    return removed
+
+
+def export_query(name, query, params=None, fmt="CSV", path=None):
+    """Writes the full result of `query` to a file. Returns (path, row count)."""
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+    path = path or export_path(name, fmt)
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    writer = export_csv if fmt == "CSV" else export_parquet
+    return path, writer(query, params, path)
@@ -7,13 +7,48 @@ def app():
     st.text("Explore the raw data in the NordicX database tables.")
 
     # Get list of tables
-    tables = db.run_query("SELECT name FROM sqlite_master WHERE type='table' AND name NOT LIKE 'sqlite_%';")
-    table_names = tables['name'].tolist()
+    table_names = db.table_names()
 
     selected_table = st.selectbox("Select Table", table_names)
 
     if selected_table:
-        df = db.run_query(f"SELECT * FROM `{selected_table}`")
+        columns = db.table_columns(selected_table)
+
+        col1, col2 = st.columns([3, 1])
+        shown = col1.multiselect("Columns", columns, default=columns)
+        page_size = col2.selectbox("Rows per page", [25, 50, 100, 500], index=1)
+
+        with st.expander("Filter"):
+            col1, col2, col3 = st.columns(3)
+            filter_col = col1.selectbox("Column", ["(none)"] + columns)
+            filter_op = col2.selectbox("Operator", list(db.FILTER_OPS))
+            filter_value = col3.text_input("Value")
+        filters = []
+        if filter_col != "(none)" and filter_value:
+            filters.append((filter_col, filter_op, filter_value))
+
+        # Start again from the first page whenever the view changes.
+        # 'browse_cursors' holds the keyset cursor each visited page started after.
+        view = (selected_table, tuple(filters), page_size)
+        if st.session_state.get('browse_view') != view:
+            st.session_state['browse_view'] = view
+            st.session_state['browse_cursors'] = [None]
+        cursors = st.session_state['browse_cursors']
+
+        df, next_after = db.fetch_page(selected_table, shown or columns, after=cursors[-1],
+                                       page_size=page_size, filters=filters)
+        total, exact = db.count_rows(selected_table, filters)
+
         st.write(f"### Table: {selected_table}")
         st.dataframe(df, use_container_width=True)
-        st.caption(f"{len(df)} rows")
+
+        col1, col2, col3 = st.columns([1, 4, 1])
+        if col1.button("◀ Previous", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+        if col3.button("Next ▶", disabled=next_after is None):
+            cursors.append(next_after)
+            st.rerun()
+        pages = max(1, -(-total // page_size))
+        about = "" if exact else "~"
+        col2.caption(f"Page {len(cursors)} of {about}{pages} · {about}{total} rows")
@@ -0,0 +1,83 @@
+"""Managed secondary indexes.
+
+`INDEXES` is the full set of indexes the app expects. `sync_indexes` creates
+missing ones, rebuilds ones whose definition changed and drops any managed
+(``idx_``-prefixed) index that is no longer declared, so changing this list is
+all it takes to add, alter or retire an index.
+"""
+import re
+
+MANAGED_PREFIX = "idx_"
+
+INDEXES = {
+    # Foreign keys / filters. Extra trailing columns make the report joins covering.
+    "idx_order_customer": "`Order` (CustomerID, TotalAmount, OrderDate)",
+    "idx_order_date": "`Order` (OrderDate, CustomerID)",
+    # Foreign keys only: the sales reports read the summary tables, so these
+    # stay narrow to keep bulk inserts cheap
+    "idx_orderitem_order": "OrderItem (OrderID)",
+    "idx_orderitem_product": "OrderItem (ProductID)",
+    "idx_product_supplier": "Product (SupplierID)",
+    "idx_product_stock": "Product (StockLevel)",
+    "idx_schedule_employee_date": "Schedule (EmployeeID, ScheduleDate)",
+    # Ranking the sales summaries
+    "idx_productsales_units": "ProductSales (UnitsSold)",
+    "idx_customerstats_spent": "CustomerOrderStats (TotalSpent)",
+    "idx_customerrfm_segment": "CustomerRFM (Segment, Monetary)",
+    # Products below their reorder point; queries must use the same expression
+    "idx_product_reorder": "Product (StockLevel - ReorderPoint)",
+}
+
+
+def index_sql(name):
+    return f"CREATE INDEX {name} ON {INDEXES[name]}"
+
+
+def _canonical(sql):
+    return re.sub(r"\s+", " ", sql.replace("IF NOT EXISTS ", "")).strip().lower()
+
+
+def existing_indexes(conn):
+    """Managed index name -> its CREATE INDEX statement."""
+    rows = conn.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND name LIKE ?",
+        (MANAGED_PREFIX + "%",),
+    ).fetchall()
+    return dict(rows)
+
+
+def _diff(conn):
+    existing = existing_indexes(conn)
+    changed = [name for name, sql in existing.items()
+               if name in INDEXES and _canonical(sql) != _canonical(index_sql(name))]
+    created = [name for name in INDEXES if name not in existing or name in changed]
+    dropped = sorted((set(existing) - set(INDEXES)) | set(changed))
+    return created, dropped
+
+
+def sync_indexes(conn):
+    """Reconciles the database with INDEXES. Returns (created, dropped).
+
+    Like migrations.migrate, the difference is re-read after BEGIN IMMEDIATE,
+    so replicas starting together apply each change exactly once.
+    """
+    created, dropped = _diff(conn)
+    if not created and not dropped:
+        return created, dropped
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None  # manage the transaction explicitly
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            created, dropped = _diff(conn)
+            for name in dropped:
+                conn.execute(f"DROP INDEX IF EXISTS {name}")
+            for name in created:
+                conn.execute(index_sql(name))
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.isolation_level = isolation_level
+    return created, dropped
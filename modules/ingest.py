@@ -0,0 +1,241 @@
+"""Bulk order ingestion.
+
+Orders are dicts with CustomerID, OrderDate (a date or a YYYY-MM-DD string)
+and a list of items, each with ProductID, Quantity and optionally Price
+(defaults to the product's list price). They are written in batches, one
+transaction per batch: order and line rows go in with multi-row INSERTs,
+TotalAmount is computed from the items and Product.StockLevel is decremented
+in the same transaction, so a batch is either fully applied or not at all.
+
+The per-row summary and RFM insert triggers are suspended inside each
+batch's transaction with a guard row (summaries.suspend_triggers), which no
+other connection ever sees, and the batch's deltas are applied in bulk
+instead. The schema is never touched, so pooled connections keep their
+prepared statements.
+
+    python -m modules.ingest orders.jsonl --batch-size 5000
+    python -m modules.ingest orders.csv
+"""
+import argparse
+import csv
+import itertools
+import json
+import sqlite3
+import sys
+import time
+from datetime import date, datetime
+
+from modules import db, summaries
+
+# Orders per transaction. Each commit checkpoints the WAL and pays the per-batch
+# setup, so big batches are much faster; 50,000 orders hold the write lock for
+# well under busy_timeout.
+BATCH_SIZE = 50_000
+# Rows per multi-row INSERT: one statement per chunk instead of per row, which
+# runs the AUTOINCREMENT bookkeeping and the guarded insert triggers' setup
+# once per chunk. 2000 rows stay well under SQLite's 32,766 bound values.
+ROWS_PER_INSERT = 2000
+CSV_COLUMNS = ["OrderRef", "CustomerID", "OrderDate", "ProductID", "Quantity", "Price"]
+
+
+class IngestError(Exception):
+    """A batch was rejected; `committed` orders before it were written."""
+
+    def __init__(self, message, committed=0):
+        super().__init__(message)
+        self.committed = committed
+
+
+def _batches(orders, size):
+    iterator = iter(orders)
+    while True:
+        batch = list(itertools.islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _next_id(conn, table, column):
+    row = conn.execute(
+        f"SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = ?), 0),"
+        f" COALESCE((SELECT MAX({column}) FROM `{table}`), 0))", (table,)
+    ).fetchone()
+    return row[0] + 1
+
+
+def _existing(conn, sql, ids):
+    """Runs `sql` (with an IN ({}) placeholder) over `ids` in chunks of 500."""
+    ids = list(ids)
+    for start in range(0, len(ids), 500):
+        chunk = ids[start:start + 500]
+        yield from conn.execute(sql.format(", ".join("?" * len(chunk))), chunk)
+
+
+def _lookup(conn, batch):
+    """The batch's products, as ProductID -> (list price, category), and the
+    set of its customers that exist."""
+    product_ids = {int(item["ProductID"]) for order in batch for item in order["items"]}
+    customer_ids = {int(order["CustomerID"]) for order in batch}
+    products = {product: (price, category) for product, price, category in _existing(
+        conn, "SELECT ProductID, Price, Category FROM Product WHERE ProductID IN ({})", product_ids)}
+    customers = {row[0] for row in _existing(
+        conn, "SELECT CustomerID FROM Customer WHERE CustomerID IN ({})", customer_ids)}
+    return products, customers
+
+
+def _insert_rows(conn, insert, rows):
+    """Inserts `rows` with `insert` ("INSERT INTO t (a, b) VALUES"), ROWS_PER_INSERT rows per statement."""
+    if not rows:
+        return
+    marks = f"({', '.join('?' * len(rows[0]))})"
+    for start in range(0, len(rows), ROWS_PER_INSERT):
+        chunk = rows[start:start + ROWS_PER_INSERT]
+        conn.execute(f"{insert} {', '.join([marks] * len(chunk))}", [value for row in chunk for value in row])
+
+
+def _order_date(value):
+    """ISO date string for an order's OrderDate; raises ValueError for anything else."""
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if not isinstance(value, str):
+        raise ValueError(f"OrderDate must be a date or an ISO date string, got {value!r}")
+    try:
+        # Round-tripped so every stored date is YYYY-MM-DD and compares correctly
+        return date.fromisoformat(value.strip()).isoformat()
+    except ValueError:
+        raise ValueError(f"OrderDate is not an ISO date (YYYY-MM-DD): {value!r}") from None
+
+
+def _write_batch(conn, batch):
+    products, customers = _lookup(conn, batch)
+    order_id = _next_id(conn, "Order", "OrderID")
+    item_id = _next_id(conn, "OrderItem", "OrderItemID")
+    order_rows, item_rows, dates = [], [], {}
+    for order in batch:
+        items = order.get("items")
+        if not items:
+            raise ValueError(f"Order for customer {order.get('CustomerID')} has no items")
+        total = 0.0
+        for item in items:
+            product, quantity = int(item["ProductID"]), int(item["Quantity"])
+            if product not in products:
+                raise ValueError(f"Unknown product {product}")
+            price = item.get("Price")
+            price = float(products[product][0] if price in (None, "") else price)
+            item_rows.append((item_id, order_id, product, quantity, price))
+            total += quantity * price
+            item_id += 1
+        raw_date = order["OrderDate"]
+        # Most orders in a batch share a handful of dates
+        order_date = dates.get(raw_date) if isinstance(raw_date, str) else None
+        if order_date is None:
+            order_date = _order_date(raw_date)
+            if isinstance(raw_date, str):
+                dates[raw_date] = order_date
+        customer = int(order["CustomerID"])
+        # Checked here because ingest_orders() turns off foreign key enforcement
+        if customer not in customers:
+            raise ValueError(f"Unknown customer {customer}")
+        order_rows.append((order_id, customer, order_date, round(total, 2)))
+        order_id += 1
+
+    deltas = summaries.batch_deltas(order_rows, item_rows,
+                                    {product: category for product, (_, category) in products.items()})
+    summaries.suspend_triggers(conn)
+    _insert_rows(conn, "INSERT INTO `Order` (OrderID, CustomerID, OrderDate, TotalAmount) VALUES", order_rows)
+    _insert_rows(conn, "INSERT INTO OrderItem (OrderItemID, OrderID, ProductID, Quantity, Price) VALUES",
+                 item_rows)
+    # CHECK (StockLevel >= 0) rejects the whole batch if any product runs out
+    conn.executemany("UPDATE Product SET StockLevel = StockLevel - ? WHERE ProductID = ?",
+                     [(units, product) for product, units, _ in deltas["products"]])
+    summaries.apply_deltas(conn, deltas)
+    summaries.resume_triggers(conn)
+    return len(item_rows)
+
+
+def ingest_orders(orders, batch_size=BATCH_SIZE, conn=None):
+    """Writes an iterable of orders in batched transactions.
+
+    Returns {"orders", "items", "batches", "seconds"}. Raises IngestError on
+    the first rejected batch; earlier batches stay committed.
+    """
+    own = conn is None
+    conn = db.get_connection() if own else conn
+    # Customers and products are checked in _write_batch() and the IDs are
+    # ours, so SQLite's per-row foreign key lookups would only repeat that work
+    foreign_keys = conn.execute("PRAGMA foreign_keys").fetchone()[0]
+    conn.execute("PRAGMA foreign_keys = OFF")
+    stats = {"orders": 0, "items": 0, "batches": 0, "seconds": 0.0}
+    started = time.perf_counter()
+    try:
+        for batch in _batches(orders, batch_size):
+            try:
+                with db.write_transaction(conn):
+                    items = _write_batch(conn, batch)
+            except (sqlite3.Error, ValueError, KeyError, TypeError) as e:
+                raise IngestError(f"Batch {stats['batches'] + 1} rejected: {e}", stats["orders"]) from e
+            stats["orders"] += len(batch)
+            stats["items"] += items
+            stats["batches"] += 1
+    finally:
+        conn.execute(f"PRAGMA foreign_keys = {foreign_keys}")
+        if own:
+            conn.close()
+        stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+def read_orders_jsonl(path):
+    """Yields one order per JSON line."""
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def read_orders_csv(path):
+    """Yields orders from a CSV with one line item per row.
+
+    Columns are CSV_COLUMNS; rows of the same order share an OrderRef and
+    must be consecutive. Price may be left empty to use the list price.
+    """
+    with open(path, newline="", encoding="utf-8") as f:
+        for _, rows in itertools.groupby(csv.DictReader(f), key=lambda row: row["OrderRef"]):
+            rows = list(rows)
+            yield {
+                "CustomerID": rows[0]["CustomerID"],
+                "OrderDate": rows[0]["OrderDate"],
+                "items": [{"ProductID": r["ProductID"], "Quantity": r["Quantity"], "Price": r.get("Price")}
+                          for r in rows],
+            }
+
+
+def ingest_file(path, batch_size=BATCH_SIZE, conn=None):
+    reader = read_orders_csv if path.lower().endswith(".csv") else read_orders_jsonl
+    return ingest_orders(reader(path), batch_size=batch_size, conn=conn)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-load orders from a CSV or JSONL file.")
+    parser.add_argument("path")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--db", help="database file (default: db.DB_FILE)")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        db.DB_FILE = args.db
+    try:
+        stats = ingest_file(args.path, batch_size=args.batch_size)
+    except IngestError as e:
+        print(f"{e} ({e.committed} orders committed before it)")
+        return 1
+    rate = stats["items"] / stats["seconds"] if stats["seconds"] else 0
+    print(f"Loaded {stats['orders']} orders / {stats['items']} items in {stats['batches']} batches "
+          f"({stats['seconds']:.2f}s, {rate:,.0f} items/sec)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
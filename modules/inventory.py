@@ -0,0 +1,191 @@
+"""Sales velocity, reorder points and batch restocking.
+
+A product's velocity is its average units sold per day over the
+VELOCITY_DAYS ending at the latest order date. Its reorder point is the
+stock that covers LEAD_TIME_DAYS + SAFETY_DAYS at that rate, and a
+suggested order tops the stock up to the reorder point plus COVER_DAYS
+more. Reorder points live on Product, so idx_product_reorder
+(StockLevel - ReorderPoint) finds the products below theirs without a scan.
+
+Daily units per product are kept in ProductDailySales. update() adds only
+the OrderItem rows past the watermark stored in InventoryState, recounts the
+products the triggers put in InventoryDirty (deleted or edited lines), and
+recomputes the velocity of the products that changed, or of every product
+when the latest order date moved and the window with it.
+
+    python -m modules.inventory          # count new lines, refresh reorder points
+    python -m modules.inventory --full   # recount everything
+"""
+import argparse
+import math
+import sys
+import time
+from datetime import date, timedelta
+
+from modules import db
+
+VELOCITY_DAYS = 28
+LEAD_TIME_DAYS = 7
+SAFETY_DAYS = 3
+COVER_DAYS = 14
+
+# NOT INDEXED keeps the planner on the rowid range instead of walking
+# idx_orderitem_product in GROUP BY order over the whole table
+ADD_NEW_LINES = """
+INSERT INTO ProductDailySales (ProductID, SaleDate, UnitsSold)
+SELECT oi.ProductID, o.OrderDate, SUM(oi.Quantity)
+FROM OrderItem oi NOT INDEXED
+JOIN `Order` o ON o.OrderID = oi.OrderID
+WHERE oi.OrderItemID > ?
+GROUP BY oi.ProductID, o.OrderDate
+ON CONFLICT (ProductID, SaleDate) DO UPDATE SET UnitsSold = UnitsSold + excluded.UnitsSold
+"""
+RECOUNT_PRODUCT = """
+INSERT INTO ProductDailySales (ProductID, SaleDate, UnitsSold)
+SELECT oi.ProductID, o.OrderDate, SUM(oi.Quantity)
+FROM OrderItem oi
+JOIN `Order` o ON o.OrderID = oi.OrderID
+WHERE oi.ProductID = ?
+GROUP BY oi.ProductID, o.OrderDate
+"""
+WINDOW_UNITS = """
+SELECT p.ProductID, COALESCE(SUM(s.UnitsSold), 0)
+FROM Product p
+LEFT JOIN ProductDailySales s
+    ON s.ProductID = p.ProductID AND s.SaleDate BETWEEN ? AND ?
+{where}
+GROUP BY p.ProductID
+"""
+
+
+def _state(conn):
+    return dict(conn.execute("SELECT Key, Value FROM InventoryState").fetchall())
+
+
+def _window_units(conn, start, end, products=None):
+    """ProductID -> units sold in [start, end], for all or the given products."""
+    if products is None:
+        return dict(conn.execute(WINDOW_UNITS.format(where=""), (start, end)).fetchall())
+    units, ids = {}, sorted(products)
+    for i in range(0, len(ids), 500):
+        chunk = ids[i:i + 500]
+        where = f"WHERE p.ProductID IN ({', '.join('?' * len(chunk))})"
+        units.update(conn.execute(WINDOW_UNITS.format(where=where), [start, end] + chunk).fetchall())
+    return units
+
+
+def reorder_levels(units_per_day):
+    """(reorder point, reorder quantity) for a sales rate."""
+    return (math.ceil(units_per_day * (LEAD_TIME_DAYS + SAFETY_DAYS)),
+            math.ceil(units_per_day * COVER_DAYS))
+
+
+def _refresh(conn, full, as_of):
+    state = _state(conn)
+    watermark = 0 if full else int(state.get("watermark", 0))
+    top = conn.execute("SELECT COALESCE(MAX(OrderItemID), 0) FROM OrderItem").fetchone()[0]
+    if full:
+        conn.execute("DELETE FROM ProductDailySales")
+        conn.execute("DELETE FROM InventoryDirty")
+
+    changed = {row[0] for row in conn.execute(
+        "SELECT ProductID FROM OrderItem WHERE OrderItemID > ?", (watermark,))}
+    conn.execute(ADD_NEW_LINES, (watermark,))
+    # Recounted after the new lines, so it replaces whatever they added
+    dirty = {row[0] for row in conn.execute("SELECT ProductID FROM InventoryDirty")}
+    if dirty:
+        conn.executemany("DELETE FROM ProductDailySales WHERE ProductID = ?", [(p,) for p in dirty])
+        conn.executemany(RECOUNT_PRODUCT, [(p,) for p in dirty])
+        conn.execute("DELETE FROM InventoryDirty")
+
+    if isinstance(as_of, date):
+        as_of = as_of.isoformat()
+    as_of = as_of or conn.execute("SELECT MAX(OrderDate) FROM `Order`").fetchone()[0] or date.today().isoformat()
+    start = (date.fromisoformat(as_of) - timedelta(days=VELOCITY_DAYS - 1)).isoformat()
+    window_moved = full or state.get("as_of") != as_of
+    units = _window_units(conn, start, as_of, None if window_moved else changed | dirty)
+
+    rows = []
+    for product, sold in units.items():
+        rate = sold / VELOCITY_DAYS
+        rows.append((product, rate) + reorder_levels(rate))
+    conn.executemany("INSERT OR REPLACE INTO ProductVelocity (ProductID, UnitsPerDay, ReorderQty) VALUES (?, ?, ?)",
+                     [(product, rate, qty) for product, rate, _, qty in rows])
+    conn.executemany("UPDATE Product SET ReorderPoint = ? WHERE ProductID = ? AND ReorderPoint != ?",
+                     [(point, product, point) for product, _, point, _ in rows])
+    conn.executemany("INSERT OR REPLACE INTO InventoryState (Key, Value) VALUES (?, ?)",
+                     [("watermark", top), ("as_of", as_of)])
+    return {"mode": "full" if full else "incremental", "lines": top - watermark,
+            "products": len(rows), "as_of": as_of}
+
+
+def update(conn=None, full=False, as_of=None):
+    """Brings velocities and reorder points up to date in one transaction.
+
+    `as_of` (ISO date) ends the velocity window; it defaults to the latest
+    order date. Returns {"mode", "lines", "products", "as_of", "seconds"}.
+    """
+    started = time.perf_counter()
+    with db.write_transaction(conn) as conn:
+        stats = _refresh(conn, full, as_of)
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+def restock(quantities, conn=None):
+    """Adds stock to many products in one transaction and one UPDATE.
+
+    `quantities` maps ProductID -> units received, or is an iterable of
+    (ProductID, units) pairs; repeated products add up. Raises ValueError and
+    changes nothing if a quantity isn't a positive integer or a product
+    doesn't exist. Returns {"products", "units", "seconds"}.
+    """
+    items = quantities.items() if hasattr(quantities, "items") else quantities
+    totals = {}
+    for product, units in items:
+        try:
+            whole = not isinstance(units, bool) and int(units) == units > 0
+        except (TypeError, ValueError, OverflowError):  # None, "abc", NaN, inf
+            whole = False
+        if not whole:
+            raise ValueError(f"Restock quantity for product {product} must be a positive integer, got {units!r}")
+        totals[int(product)] = totals.get(int(product), 0) + int(units)
+
+    started = time.perf_counter()
+    with db.write_transaction(conn) as conn:
+        conn.execute("CREATE TEMP TABLE IF NOT EXISTS Restock (ProductID INTEGER PRIMARY KEY, Units INT NOT NULL)")
+        conn.execute("DELETE FROM temp.Restock")
+        conn.executemany("INSERT INTO temp.Restock (ProductID, Units) VALUES (?, ?)", totals.items())
+        unknown = [row[0] for row in conn.execute(
+            "SELECT r.ProductID FROM temp.Restock r LEFT JOIN Product p ON p.ProductID = r.ProductID"
+            " WHERE p.ProductID IS NULL LIMIT 5")]
+        if unknown:
+            raise ValueError(f"Unknown product(s): {', '.join(map(str, unknown))}")
+        # IN (...) drives the update from the temp table by primary key;
+        # UPDATE ... FROM temp.Restock scans Product instead
+        conn.execute("""
+            UPDATE Product
+            SET StockLevel = StockLevel + (SELECT r.Units FROM temp.Restock r WHERE r.ProductID = Product.ProductID)
+            WHERE ProductID IN (SELECT ProductID FROM temp.Restock)
+        """)
+        conn.execute("DELETE FROM temp.Restock")
+    return {"products": len(totals), "units": sum(totals.values()), "seconds": time.perf_counter() - started}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Update sales velocities and reorder points.")
+    parser.add_argument("--db", help="database file (default: db.DB_FILE)")
+    parser.add_argument("--full", action="store_true", help="recount all order lines")
+    parser.add_argument("--as-of", help="last day of the velocity window (default: latest order date)")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        db.DB_FILE = args.db
+    stats = update(full=args.full, as_of=args.as_of)
+    print(f"{stats['mode'].capitalize()} inventory update: {stats['lines']} new order lines, "
+          f"{stats['products']} reorder points as of {stats['as_of']} ({stats['seconds']:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
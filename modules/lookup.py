@@ -0,0 +1,75 @@
+"""Cached name -> ID search for the report dropdowns.
+
+Each lookup table is loaded once into a list sorted by case-folded name.
+Prefix matches come from a binary search; substring matches fill up the
+rest of the top N. An index is rebuilt when the table's counter in
+TableVersion (bumped by triggers on insert, delete and name/ID changes)
+differs from the one it was built at.
+"""
+import bisect
+import threading
+
+from modules import db, queries
+
+# table -> query returning (ID, name) for every row
+LOOKUPS = {
+    "Customer": queries.CUSTOMERS,
+    "Employee": queries.EMPLOYEES,
+}
+DEFAULT_LIMIT = 20
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+class NameIndex:
+    """(name, ID) pairs sorted by case-folded name."""
+
+    def __init__(self, rows, version):
+        rows = sorted(((name or "").casefold(), name or "", id_) for id_, name in rows)
+        self.keys = [key for key, _, _ in rows]
+        self.entries = [(id_, name) for _, name, id_ in rows]
+        self.version = version
+
+    def search(self, text, limit=DEFAULT_LIMIT):
+        """Top `limit` (ID, name) pairs: names starting with `text` first, then
+        names containing it, each in alphabetical order."""
+        text = text.strip().casefold()
+        start = bisect.bisect_left(self.keys, text)
+        end = bisect.bisect_left(self.keys, text + "\uffff", start)
+        matches = self.entries[start:min(end, start + limit)]
+        if len(matches) < limit and text:
+            for i, key in enumerate(self.keys):
+                if text in key and not start <= i < end:
+                    matches.append(self.entries[i])
+                    if len(matches) == limit:
+                        break
+        return matches
+
+
+def table_version(table):
+    df = db.run_query("SELECT Version FROM TableVersion WHERE TableName = ?", (table,))
+    return int(df["Version"][0]) if not df.empty else None
+
+
+def get_index(table):
+    """Returns the current NameIndex of a lookup table, rebuilding it if stale."""
+    if table not in LOOKUPS:
+        raise ValueError(f"No lookup for table: {table}")
+    version = table_version(table)
+    with _lock:
+        index = _indexes.get(table)
+        if index is None or index.version != version:
+            rows = db.run_query(LOOKUPS[table], cache=False)
+            index = NameIndex(zip(rows.iloc[:, 0].tolist(), rows.iloc[:, 1].tolist()), version)
+            _indexes[table] = index
+        return index
+
+
+def search(table, text="", limit=DEFAULT_LIMIT):
+    return get_index(table).search(text, limit)
+
+
+def clear():
+    with _lock:
+        _indexes.clear()
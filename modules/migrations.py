@@ -0,0 +1,697 @@
+import sqlite3
+
+# Ordered, append-only list of schema migrations. Each entry is
+# (version, description, step) where step is either an SQL script or a
+# callable taking the connection. Never edit a released migration; add a new one.
+
+SCHEMA_SQL = """
+-- Tables
+CREATE TABLE IF NOT EXISTS Customer (
+    CustomerID INTEGER PRIMARY KEY AUTOINCREMENT,
+    Name VARCHAR(100) NOT NULL,
+    Email VARCHAR(50) UNIQUE NOT NULL,
+    Phone VARCHAR(30),
+    Address TEXT
+);
+
+CREATE TABLE IF NOT EXISTS Supplier (
+    SupplierID INTEGER PRIMARY KEY AUTOINCREMENT,
+    Name VARCHAR(100) NOT NULL,
+    ContactInfo VARCHAR(150),
+    Address TEXT
+);
+
+CREATE TABLE IF NOT EXISTS Product (
+    ProductID INTEGER PRIMARY KEY AUTOINCREMENT,
+    SupplierID INT NOT NULL,
+    Name VARCHAR(100) NOT NULL,
+    Description TEXT,
+    Price DECIMAL(10, 2) NOT NULL CHECK (Price >= 0),
+    StockLevel INT NOT NULL DEFAULT 0 CHECK (StockLevel >= 0),
+    Category VARCHAR(50),
+    FOREIGN KEY (SupplierID) REFERENCES Supplier(SupplierID)
+        ON DELETE RESTRICT ON UPDATE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS `Order` (
+    OrderID INTEGER PRIMARY KEY AUTOINCREMENT,
+    CustomerID INT NOT NULL,
+    OrderDate DATE NOT NULL,
+    TotalAmount DECIMAL(10, 2) NOT NULL CHECK (TotalAmount >= 0),
+    FOREIGN KEY (CustomerID) REFERENCES Customer(CustomerID)
+        ON DELETE RESTRICT ON UPDATE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS OrderItem (
+    OrderItemID INTEGER PRIMARY KEY AUTOINCREMENT,
+    OrderID INT NOT NULL,
+    ProductID INT NOT NULL,
+    Quantity INT NOT NULL CHECK (Quantity > 0),
+    Price DECIMAL(10, 2) NOT NULL CHECK (Price >= 0),
+    FOREIGN KEY (OrderID) REFERENCES `Order`(OrderID)
+        ON DELETE CASCADE ON UPDATE CASCADE,
+    FOREIGN KEY (ProductID) REFERENCES Product(ProductID)
+        ON DELETE RESTRICT ON UPDATE CASCADE
+);
+
+CREATE TABLE IF NOT EXISTS Employee (
+    EmployeeID INTEGER PRIMARY KEY AUTOINCREMENT,
+    Name VARCHAR(100) NOT NULL,
+    Position VARCHAR(50),
+    Email VARCHAR(50) UNIQUE NOT NULL,
+    Phone VARCHAR(30)
+);
+
+CREATE TABLE IF NOT EXISTS Schedule (
+    ScheduleID INTEGER PRIMARY KEY AUTOINCREMENT,
+    EmployeeID INT NOT NULL,
+    ScheduleDate DATE NOT NULL,
+    ShiftDetails VARCHAR(100),
+    FOREIGN KEY (EmployeeID) REFERENCES Employee(EmployeeID)
+        ON DELETE CASCADE ON UPDATE CASCADE
+);
+
+-- View for Customer Purchase History (Query 9 from scenario)
+CREATE VIEW IF NOT EXISTS CustomerPurchaseHistory AS
+SELECT c.CustomerID, c.Name AS CustomerName, o.OrderID, o.OrderDate,
+       o.TotalAmount
+FROM Customer c
+JOIN `Order` o ON c.CustomerID = o.CustomerID;
+"""
+
+SEED_SQL = """
+-- Customers
+INSERT INTO Customer (Name, Email, Phone, Address) VALUES
+('Vahid Niamadpour', 'vahid.niamadpour@gmail.com', '+47 123456789', 'Oslo, Norway'),
+('Gebremariam Assres', 'gebremariam.assres@yahoo.com', '+47 2134658', 'Oslo, Norway'),
+('John Smith', 'john.smith@hotmail.com', '+46 731234567', 'Gothenburg, Sweden'),
+('Ole Olesen', 'ole.olesen@mail.dk', '+47 531208755', 'Moss, Norway'),
+('Ingrid Olsen', 'ingrid.olsen@outlook.com', '+47 98877665', 'Oslo, Norway'),
+('Erik Svensson', 'erik.svensson@gmail.com', '+46 722334455', 'Malmö, Sweden'),
+('Kari Nilsen', 'kari.nilsen@online.no', '+47 94455667', 'Bergen, Norway'),
+('Anna Karlsson', 'anna.karlsson@icloud.com', '+46 733221100', 'Uppsala, Sweden'),
+('Jonas Berg', 'jonas.berg@mail.se', '+46 744556677', 'Västerås, Sweden'),
+('Freja Mortensen', 'freja.mortensen@mail.dk', '+45 82233445', 'Odense, Denmark');
+
+-- Suppliers
+INSERT INTO Supplier (Name, ContactInfo, Address) VALUES
+('Kristiania AB', 'contact@kristiania.no', 'Oslo, Norway'),
+('EcoTextiles Nordic', 'sales@ecotextiles.no', 'Trondheim, Norway'),
+('GreenLiving Supplies', 'info@greenliving.dk', 'Aalborg, Denmark'),
+('PureCeramics Oy', 'support@pureceramics.fi', 'Helsinki, Finland'),
+('ScandiHome Essentials', 'orders@scandihome.se', 'Lund, Sweden'),
+('NordicCraft Supplies', 'hello@nordiccraft.no', 'Bergen, Norway'),
+('FjordHome Products', 'support@fjordhome.no', 'Stavanger, Norway'),
+('Arctic Essentials AS', 'contact@arcticessentials.no', 'Tromsø, Norway'),
+('OsloDesign Partners', 'info@oslopartners.no', 'Oslo, Norway'),
+('VikingEco Materials', 'sales@vikingeco.no', 'Kristiansand, Norway');
+
+-- Products
+INSERT INTO Product (SupplierID, Name, Description, Price, StockLevel, Category) VALUES
+(1, 'Oak Wooden Chair', 'Sustainably sourced oak chair', 149.99, 25, 'Furniture'),
+(2, 'Organic Cotton Blanket', 'Soft organic cotton throw blanket', 89.99, 40, 'Textiles'),
+(3, 'Reusable Glass Jars', 'Set of 3 reusable storage jars', 39.99, 50, 'Kitchen'),
+(4, 'Ceramic Dinner Plate', 'Handcrafted ceramic dinner plate', 24.99, 80, 'Tableware'),
+(5, 'Natural Scented Candle', 'Soy wax candle with pine scent', 34.99, 70, 'Lifestyle'),
+(6, 'Handmade Birch Shelf', 'Minimalist birch wall shelf', 129.99, 20, 'Furniture'),
+(7, 'Fjord Wool Rug', 'Thick wool rug inspired by Norwegian fjords', 199.99, 15, 'Textiles'),
+(8, 'Arctic Steel Thermos', 'Insulated thermos for cold climates', 49.99, 60, 'Outdoors'),
+(9, 'Oslo Desk Organizer', 'Modern wooden desk organizer', 59.99, 30, 'Office'),
+(10, 'VikingEco Storage Crate', 'Recycled wood storage crate', 44.99, 40, 'Storage');
+
+-- Orders
+INSERT INTO `Order` (CustomerID, OrderDate, TotalAmount) VALUES
+(1, '2025-01-10', 189.98),
+(2, '2025-01-12', 299.99),
+(3, '2025-01-15', 59.98),
+(4, '2025-01-18', 149.99),
+(5, '2025-01-20', 89.99),
+(6, '2025-01-22', 74.98),
+(7, '2025-01-25', 39.99),
+(8, '2025-01-27', 119.98),
+(9, '2025-01-28', 34.99),
+(10, '2025-01-30', 44.99);
+
+-- Order Items
+INSERT INTO OrderItem (OrderID, ProductID, Quantity, Price) VALUES
+(1, 3, 2, 89.99), (2, 2, 1, 299.99), (3, 4, 2, 29.99),
+(4, 1, 1, 149.99), (5, 3, 1, 89.99), (6, 8, 2, 19.99),
+(7, 5, 1, 39.99), (8, 7, 2, 24.99), (9, 9, 1, 34.99),
+(10, 10, 1, 44.99), (1, 6, 1, 19.99), (2, 7, 1, 24.99),
+(3, 5, 1, 39.99), (4, 8, 1, 19.99), (5, 9, 1, 34.99);
+
+-- Employees
+INSERT INTO Employee (Name, Position, Email, Phone) VALUES
+('Nils Eriksen', 'Store Manager', 'nils.eriksen@nordicx.com', '+47 701111111'),
+('Maria Holm', 'Sales Associate', 'maria.holm@nordicx.com', '+47 702222222'),
+('Oskar Nilsson', 'Inventory Coordinator', 'oskar.nilsson@nordicx.com', '+46 703333333'),
+('Liv Sørensen', 'Customer Support', 'liv.sorensen@nordicx.com', '+45 81112222'),
+('Anders Bjorn', 'Warehouse Staff', 'anders.bjorn@nordicx.com', '+47 95554433'),
+('Elin Karlstad', 'Sales Associate', 'elin.karlstad@nordicx.com', '+46 704444444'),
+('Thomas Lund', 'Logistics Manager', 'thomas.lund@nordicx.com', '+45 83334444'),
+('Sara Nyberg', 'Marketing Assistant', 'sara.nyberg@nordicx.com', '+46 705555555'),
+('Henrik Olsen', 'Store Assistant', 'henrik.olsen@nordicx.com', '+47 92223344'),
+('Ida Pettersson', 'HR Coordinator', 'ida.pettersson@nordicx.com', '+46 706666666');
+
+-- Schedules
+INSERT INTO Schedule (EmployeeID, ScheduleDate, ShiftDetails) VALUES
+(1, '2025-02-01', 'Morning Shift'), (2, '2025-02-01', 'Afternoon Shift'),
+(3, '2025-02-01', 'Full Day'), (4, '2025-02-02', 'Morning Shift'),
+(5, '2025-02-02', 'Afternoon Shift'), (6, '2025-02-03', 'Morning Shift'),
+(7, '2025-02-03', 'Full Day'), (8, '2025-02-04', 'Afternoon Shift'),
+(9, '2025-02-04', 'Morning Shift'), (10, '2025-02-05', 'Full Day');
+"""
+
+
+def seed_sample_data(conn):
+    # Databases created before migrations existed already hold the sample rows
+    if conn.execute("SELECT 1 FROM Customer LIMIT 1").fetchone():
+        return
+    run_script(conn, SEED_SQL)
+
+# Sales summaries for the aggregate reports (Query 7, 10.1, 10.2, 10.3).
+# NULL categories are stored as '' because NULLs never collide in a primary key.
+SUMMARY_TABLES_SQL = """
+CREATE TABLE IF NOT EXISTS SalesDailyCategory (
+    SaleDate DATE NOT NULL,
+    Category VARCHAR(50) NOT NULL,
+    TotalSales DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    UnitsSold INT NOT NULL DEFAULT 0,
+    PRIMARY KEY (SaleDate, Category)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS ProductSales (
+    ProductID INTEGER PRIMARY KEY,
+    UnitsSold INT NOT NULL DEFAULT 0,
+    Revenue DECIMAL(12, 2) NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS CustomerOrderStats (
+    CustomerID INTEGER PRIMARY KEY,
+    OrderCount INT NOT NULL DEFAULT 0,
+    TotalSpent DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    FirstOrder DATE,
+    LastOrder DATE
+);
+"""
+
+# Full recompute of every summary; used to backfill and by summaries.rebuild()
+SUMMARY_BACKFILL_SQL = """
+DELETE FROM SalesDailyCategory;
+DELETE FROM ProductSales;
+DELETE FROM CustomerOrderStats;
+
+INSERT INTO SalesDailyCategory (SaleDate, Category, TotalSales, UnitsSold)
+SELECT o.OrderDate, COALESCE(p.Category, ''), SUM(oi.Quantity * oi.Price), SUM(oi.Quantity)
+FROM `Order` o
+JOIN OrderItem oi ON o.OrderID = oi.OrderID
+JOIN Product p ON oi.ProductID = p.ProductID
+GROUP BY o.OrderDate, COALESCE(p.Category, '');
+
+INSERT INTO ProductSales (ProductID, UnitsSold, Revenue)
+SELECT ProductID, SUM(Quantity), SUM(Quantity * Price)
+FROM OrderItem
+GROUP BY ProductID;
+
+INSERT INTO CustomerOrderStats (CustomerID, OrderCount, TotalSpent, FirstOrder, LastOrder)
+SELECT CustomerID, COUNT(*), SUM(TotalAmount), MIN(OrderDate), MAX(OrderDate)
+FROM `Order`
+GROUP BY CustomerID;
+"""
+
+# Triggers keeping the summaries current. A cascaded OrderItem delete runs
+# after its Order row is gone, so the Order BEFORE DELETE trigger takes the
+# order's lines out of the daily buckets and the item trigger skips them.
+SUMMARY_TRIGGERS_SQL = """
+CREATE TRIGGER IF NOT EXISTS trg_orderitem_insert_summary AFTER INSERT ON OrderItem
+BEGIN
+    INSERT INTO ProductSales (ProductID, UnitsSold, Revenue)
+    VALUES (NEW.ProductID, NEW.Quantity, NEW.Quantity * NEW.Price)
+    ON CONFLICT (ProductID) DO UPDATE SET
+        UnitsSold = UnitsSold + excluded.UnitsSold,
+        Revenue = Revenue + excluded.Revenue;
+    INSERT INTO SalesDailyCategory (SaleDate, Category, TotalSales, UnitsSold)
+    SELECT o.OrderDate, COALESCE(p.Category, ''), NEW.Quantity * NEW.Price, NEW.Quantity
+    FROM `Order` o, Product p
+    WHERE o.OrderID = NEW.OrderID AND p.ProductID = NEW.ProductID
+    ON CONFLICT (SaleDate, Category) DO UPDATE SET
+        TotalSales = TotalSales + excluded.TotalSales,
+        UnitsSold = UnitsSold + excluded.UnitsSold;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_orderitem_delete_summary AFTER DELETE ON OrderItem
+BEGIN
+    UPDATE ProductSales SET
+        UnitsSold = UnitsSold - OLD.Quantity,
+        Revenue = Revenue - OLD.Quantity * OLD.Price
+    WHERE ProductID = OLD.ProductID;
+    DELETE FROM ProductSales WHERE ProductID = OLD.ProductID AND UnitsSold <= 0;
+    UPDATE SalesDailyCategory SET
+        TotalSales = TotalSales - OLD.Quantity * OLD.Price,
+        UnitsSold = UnitsSold - OLD.Quantity
+    WHERE SaleDate = (SELECT OrderDate FROM `Order` WHERE OrderID = OLD.OrderID)
+      AND Category = (SELECT COALESCE(Category, '') FROM Product WHERE ProductID = OLD.ProductID);
+    DELETE FROM SalesDailyCategory
+    WHERE SaleDate = (SELECT OrderDate FROM `Order` WHERE OrderID = OLD.OrderID)
+      AND Category = (SELECT COALESCE(Category, '') FROM Product WHERE ProductID = OLD.ProductID)
+      AND UnitsSold <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_orderitem_update_summary
+AFTER UPDATE OF OrderID, ProductID, Quantity, Price ON OrderItem
+BEGIN
+    UPDATE ProductSales SET
+        UnitsSold = UnitsSold - OLD.Quantity,
+        Revenue = Revenue - OLD.Quantity * OLD.Price
+    WHERE ProductID = OLD.ProductID;
+    UPDATE SalesDailyCategory SET
+        TotalSales = TotalSales - OLD.Quantity * OLD.Price,
+        UnitsSold = UnitsSold - OLD.Quantity
+    WHERE SaleDate = (SELECT OrderDate FROM `Order` WHERE OrderID = OLD.OrderID)
+      AND Category = (SELECT COALESCE(Category, '') FROM Product WHERE ProductID = OLD.ProductID);
+    INSERT INTO ProductSales (ProductID, UnitsSold, Revenue)
+    VALUES (NEW.ProductID, NEW.Quantity, NEW.Quantity * NEW.Price)
+    ON CONFLICT (ProductID) DO UPDATE SET
+        UnitsSold = UnitsSold + excluded.UnitsSold,
+        Revenue = Revenue + excluded.Revenue;
+    INSERT INTO SalesDailyCategory (SaleDate, Category, TotalSales, UnitsSold)
+    SELECT o.OrderDate, COALESCE(p.Category, ''), NEW.Quantity * NEW.Price, NEW.Quantity
+    FROM `Order` o, Product p
+    WHERE o.OrderID = NEW.OrderID AND p.ProductID = NEW.ProductID
+    ON CONFLICT (SaleDate, Category) DO UPDATE SET
+        TotalSales = TotalSales + excluded.TotalSales,
+        UnitsSold = UnitsSold + excluded.UnitsSold;
+    DELETE FROM ProductSales WHERE ProductID = OLD.ProductID AND UnitsSold <= 0;
+    DELETE FROM SalesDailyCategory WHERE UnitsSold <= 0
+      AND SaleDate = (SELECT OrderDate FROM `Order` WHERE OrderID = OLD.OrderID);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_order_insert_summary AFTER INSERT ON `Order`
+BEGIN
+    INSERT INTO CustomerOrderStats (CustomerID, OrderCount, TotalSpent, FirstOrder, LastOrder)
+    VALUES (NEW.CustomerID, 1, NEW.TotalAmount, NEW.OrderDate, NEW.OrderDate)
+    ON CONFLICT (CustomerID) DO UPDATE SET
+        OrderCount = OrderCount + 1,
+        TotalSpent = TotalSpent + excluded.TotalSpent,
+        FirstOrder = MIN(COALESCE(FirstOrder, excluded.FirstOrder), excluded.FirstOrder),
+        LastOrder = MAX(COALESCE(LastOrder, excluded.LastOrder), excluded.LastOrder);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_order_before_delete_summary BEFORE DELETE ON `Order`
+BEGIN
+    UPDATE SalesDailyCategory SET
+        TotalSales = TotalSales - (
+            SELECT SUM(oi.Quantity * oi.Price) FROM OrderItem oi
+            JOIN Product p ON oi.ProductID = p.ProductID
+            WHERE oi.OrderID = OLD.OrderID AND COALESCE(p.Category, '') = SalesDailyCategory.Category),
+        UnitsSold = UnitsSold - (
+            SELECT SUM(oi.Quantity) FROM OrderItem oi
+            JOIN Product p ON oi.ProductID = p.ProductID
+            WHERE oi.OrderID = OLD.OrderID AND COALESCE(p.Category, '') = SalesDailyCategory.Category)
+    WHERE SaleDate = OLD.OrderDate
+      AND Category IN (
+            SELECT COALESCE(p.Category, '') FROM OrderItem oi
+            JOIN Product p ON oi.ProductID = p.ProductID
+            WHERE oi.OrderID = OLD.OrderID);
+    DELETE FROM SalesDailyCategory WHERE SaleDate = OLD.OrderDate AND UnitsSold <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_order_delete_summary AFTER DELETE ON `Order`
+BEGIN
+    UPDATE CustomerOrderStats SET
+        OrderCount = OrderCount - 1,
+        TotalSpent = TotalSpent - OLD.TotalAmount,
+        FirstOrder = (SELECT MIN(OrderDate) FROM `Order` WHERE CustomerID = OLD.CustomerID),
+        LastOrder = (SELECT MAX(OrderDate) FROM `Order` WHERE CustomerID = OLD.CustomerID)
+    WHERE CustomerID = OLD.CustomerID;
+    DELETE FROM CustomerOrderStats WHERE CustomerID = OLD.CustomerID AND OrderCount <= 0;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_order_update_summary
+AFTER UPDATE OF CustomerID, OrderDate, TotalAmount ON `Order`
+BEGIN
+    UPDATE CustomerOrderStats SET
+        OrderCount = OrderCount - 1,
+        TotalSpent = TotalSpent - OLD.TotalAmount,
+        FirstOrder = (SELECT MIN(OrderDate) FROM `Order` WHERE CustomerID = OLD.CustomerID),
+        LastOrder = (SELECT MAX(OrderDate) FROM `Order` WHERE CustomerID = OLD.CustomerID)
+    WHERE CustomerID = OLD.CustomerID;
+    DELETE FROM CustomerOrderStats WHERE CustomerID = OLD.CustomerID AND OrderCount <= 0;
+    INSERT INTO CustomerOrderStats (CustomerID, OrderCount, TotalSpent, FirstOrder, LastOrder)
+    VALUES (NEW.CustomerID, 1, NEW.TotalAmount, NEW.OrderDate, NEW.OrderDate)
+    ON CONFLICT (CustomerID) DO UPDATE SET
+        OrderCount = OrderCount + 1,
+        TotalSpent = TotalSpent + excluded.TotalSpent,
+        FirstOrder = MIN(COALESCE(FirstOrder, excluded.FirstOrder), excluded.FirstOrder),
+        LastOrder = MAX(COALESCE(LastOrder, excluded.LastOrder), excluded.LastOrder);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_order_date_summary
+AFTER UPDATE OF OrderDate ON `Order` WHEN OLD.OrderDate IS NOT NEW.OrderDate
+BEGIN
+    UPDATE SalesDailyCategory SET
+        TotalSales = TotalSales - (
+            SELECT SUM(oi.Quantity * oi.Price) FROM OrderItem oi
+            JOIN Product p ON oi.ProductID = p.ProductID
+            WHERE oi.OrderID = NEW.OrderID AND COALESCE(p.Category, '') = SalesDailyCategory.Category),
+        UnitsSold = UnitsSold - (
+            SELECT SUM(oi.Quantity) FROM OrderItem oi
+            JOIN Product p ON oi.ProductID = p.ProductID
+            WHERE oi.OrderID = NEW.OrderID AND COALESCE(p.Category, '') = SalesDailyCategory.Category)
+    WHERE SaleDate = OLD.OrderDate
+      AND Category IN (
+            SELECT COALESCE(p.Category, '') FROM OrderItem oi
+            JOIN Product p ON oi.ProductID = p.ProductID
+            WHERE oi.OrderID = NEW.OrderID);
+    DELETE FROM SalesDailyCategory WHERE SaleDate = OLD.OrderDate AND UnitsSold <= 0;
+    INSERT INTO SalesDailyCategory (SaleDate, Category, TotalSales, UnitsSold)
+    SELECT NEW.OrderDate, COALESCE(p.Category, ''), SUM(oi.Quantity * oi.Price), SUM(oi.Quantity)
+    FROM OrderItem oi
+    JOIN Product p ON oi.ProductID = p.ProductID
+    WHERE oi.OrderID = NEW.OrderID
+    GROUP BY COALESCE(p.Category, '')
+    ON CONFLICT (SaleDate, Category) DO UPDATE SET
+        TotalSales = TotalSales + excluded.TotalSales,
+        UnitsSold = UnitsSold + excluded.UnitsSold;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_product_category_summary
+AFTER UPDATE OF Category ON Product WHEN OLD.Category IS NOT NEW.Category
+BEGIN
+    UPDATE SalesDailyCategory SET
+        TotalSales = TotalSales - (
+            SELECT SUM(oi.Quantity * oi.Price) FROM OrderItem oi
+            JOIN `Order` o ON oi.OrderID = o.OrderID
+            WHERE oi.ProductID = NEW.ProductID AND o.OrderDate = SalesDailyCategory.SaleDate),
+        UnitsSold = UnitsSold - (
+            SELECT SUM(oi.Quantity) FROM OrderItem oi
+            JOIN `Order` o ON oi.OrderID = o.OrderID
+            WHERE oi.ProductID = NEW.ProductID AND o.OrderDate = SalesDailyCategory.SaleDate)
+    WHERE Category = COALESCE(OLD.Category, '')
+      AND SaleDate IN (
+            SELECT o.OrderDate FROM OrderItem oi
+            JOIN `Order` o ON oi.OrderID = o.OrderID
+            WHERE oi.ProductID = NEW.ProductID);
+    DELETE FROM SalesDailyCategory WHERE Category = COALESCE(OLD.Category, '') AND UnitsSold <= 0;
+    INSERT INTO SalesDailyCategory (SaleDate, Category, TotalSales, UnitsSold)
+    SELECT o.OrderDate, COALESCE(NEW.Category, ''), SUM(oi.Quantity * oi.Price), SUM(oi.Quantity)
+    FROM OrderItem oi
+    JOIN `Order` o ON oi.OrderID = o.OrderID
+    WHERE oi.ProductID = NEW.ProductID
+    GROUP BY o.OrderDate
+    ON CONFLICT (SaleDate, Category) DO UPDATE SET
+        TotalSales = TotalSales + excluded.TotalSales,
+        UnitsSold = UnitsSold + excluded.UnitsSold;
+END;
+"""
+
+
+def create_sales_summaries(conn):
+    run_script(conn, SUMMARY_TABLES_SQL)
+    run_script(conn, SUMMARY_BACKFILL_SQL)
+    run_script(conn, SUMMARY_TRIGGERS_SQL)
+
+
+# RFM scores are computed in Python (modules/rfm.py); these triggers only
+# remember which customers' orders changed since the last run.
+RFM_SQL = """
+CREATE TABLE IF NOT EXISTS CustomerRFM (
+    CustomerID INTEGER PRIMARY KEY REFERENCES Customer(CustomerID)
+        ON DELETE CASCADE ON UPDATE CASCADE,
+    LastOrder TEXT NOT NULL,
+    Frequency INTEGER NOT NULL,
+    Monetary REAL NOT NULL,
+    R INTEGER NOT NULL,
+    F INTEGER NOT NULL,
+    M INTEGER NOT NULL,
+    Segment TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS RFMBreakpoints (
+    Metric TEXT NOT NULL,
+    Position INTEGER NOT NULL,
+    Bound REAL NOT NULL,
+    PRIMARY KEY (Metric, Position)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS RFMDirty (
+    CustomerID INTEGER PRIMARY KEY
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_order_insert_rfm AFTER INSERT ON `Order`
+BEGIN
+    INSERT OR IGNORE INTO RFMDirty (CustomerID) VALUES (NEW.CustomerID);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_order_delete_rfm AFTER DELETE ON `Order`
+BEGIN
+    INSERT OR IGNORE INTO RFMDirty (CustomerID) VALUES (OLD.CustomerID);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_order_update_rfm
+AFTER UPDATE OF CustomerID, OrderDate, TotalAmount ON `Order`
+BEGIN
+    INSERT OR IGNORE INTO RFMDirty (CustomerID) VALUES (OLD.CustomerID);
+    INSERT OR IGNORE INTO RFMDirty (CustomerID) VALUES (NEW.CustomerID);
+END;
+"""
+
+
+# Per-table change counters, so in-process caches of a table (lookup.py) can
+# tell whether it changed without comparing the rows.
+TABLE_VERSION_SQL = """
+CREATE TABLE IF NOT EXISTS TableVersion (
+    TableName TEXT PRIMARY KEY,
+    Version INTEGER NOT NULL DEFAULT 0
+) WITHOUT ROWID;
+
+INSERT OR IGNORE INTO TableVersion (TableName) VALUES ('Customer'), ('Employee');
+
+CREATE TRIGGER IF NOT EXISTS trg_customer_insert_version AFTER INSERT ON Customer
+BEGIN
+    UPDATE TableVersion SET Version = Version + 1 WHERE TableName = 'Customer';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_customer_update_version AFTER UPDATE OF CustomerID, Name ON Customer
+BEGIN
+    UPDATE TableVersion SET Version = Version + 1 WHERE TableName = 'Customer';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_customer_delete_version AFTER DELETE ON Customer
+BEGIN
+    UPDATE TableVersion SET Version = Version + 1 WHERE TableName = 'Customer';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_employee_insert_version AFTER INSERT ON Employee
+BEGIN
+    UPDATE TableVersion SET Version = Version + 1 WHERE TableName = 'Employee';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_employee_update_version AFTER UPDATE OF EmployeeID, Name ON Employee
+BEGIN
+    UPDATE TableVersion SET Version = Version + 1 WHERE TableName = 'Employee';
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_employee_delete_version AFTER DELETE ON Employee
+BEGIN
+    UPDATE TableVersion SET Version = Version + 1 WHERE TableName = 'Employee';
+END;
+"""
+
+
+# Reorder points and sales velocity (modules/inventory.py). ProductDailySales
+# is filled from the OrderItem rows past the 'watermark' in InventoryState;
+# the triggers only remember products whose already-counted lines changed.
+INVENTORY_SQL = """
+ALTER TABLE Product ADD COLUMN ReorderPoint INT NOT NULL DEFAULT 0 CHECK (ReorderPoint >= 0);
+
+CREATE TABLE IF NOT EXISTS ProductDailySales (
+    ProductID INTEGER NOT NULL,
+    SaleDate DATE NOT NULL,
+    UnitsSold INT NOT NULL,
+    PRIMARY KEY (ProductID, SaleDate)
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS ProductVelocity (
+    ProductID INTEGER PRIMARY KEY REFERENCES Product(ProductID)
+        ON DELETE CASCADE ON UPDATE CASCADE,
+    UnitsPerDay REAL NOT NULL,
+    ReorderQty INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS InventoryState (
+    Key TEXT PRIMARY KEY,
+    Value NOT NULL
+) WITHOUT ROWID;
+
+CREATE TABLE IF NOT EXISTS InventoryDirty (
+    ProductID INTEGER PRIMARY KEY
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_orderitem_delete_inventory AFTER DELETE ON OrderItem
+BEGIN
+    INSERT OR IGNORE INTO InventoryDirty (ProductID) VALUES (OLD.ProductID);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_orderitem_update_inventory
+AFTER UPDATE OF OrderID, ProductID, Quantity ON OrderItem
+BEGIN
+    INSERT OR IGNORE INTO InventoryDirty (ProductID) VALUES (OLD.ProductID);
+    INSERT OR IGNORE INTO InventoryDirty (ProductID) VALUES (NEW.ProductID);
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_order_date_inventory
+AFTER UPDATE OF OrderDate ON `Order` WHEN OLD.OrderDate IS NOT NEW.OrderDate
+BEGIN
+    INSERT OR IGNORE INTO InventoryDirty (ProductID)
+    SELECT ProductID FROM OrderItem WHERE OrderID = NEW.OrderID;
+END;
+"""
+
+# Bulk ingest (modules/ingest.py) applies a whole batch's summary and RFM
+# changes itself. It inserts the SummaryGuard row inside the batch's
+# transaction and deletes it before committing, and the per-row insert
+# triggers skip their work while it exists. Unlike dropping the triggers, this
+# leaves the schema alone, so no connection's prepared statements go stale.
+SUMMARY_GUARD_SQL = """
+CREATE TABLE IF NOT EXISTS SummaryGuard (
+    Suspended INTEGER PRIMARY KEY CHECK (Suspended = 1)
+);
+"""
+
+
+# Migration 7 replaces the Order/OrderItem insert triggers of migrations 3
+# and 4 with these guarded versions
+GUARDED_SUMMARY_TRIGGERS_SQL = """
+CREATE TRIGGER IF NOT EXISTS trg_orderitem_insert_summary AFTER INSERT ON OrderItem
+WHEN NOT EXISTS (SELECT 1 FROM SummaryGuard)
+BEGIN
+    INSERT INTO ProductSales (ProductID, UnitsSold, Revenue)
+    VALUES (NEW.ProductID, NEW.Quantity, NEW.Quantity * NEW.Price)
+    ON CONFLICT (ProductID) DO UPDATE SET
+        UnitsSold = UnitsSold + excluded.UnitsSold,
+        Revenue = Revenue + excluded.Revenue;
+    INSERT INTO SalesDailyCategory (SaleDate, Category, TotalSales, UnitsSold)
+    SELECT o.OrderDate, COALESCE(p.Category, ''), NEW.Quantity * NEW.Price, NEW.Quantity
+    FROM `Order` o, Product p
+    WHERE o.OrderID = NEW.OrderID AND p.ProductID = NEW.ProductID
+    ON CONFLICT (SaleDate, Category) DO UPDATE SET
+        TotalSales = TotalSales + excluded.TotalSales,
+        UnitsSold = UnitsSold + excluded.UnitsSold;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_order_insert_summary AFTER INSERT ON `Order`
+WHEN NOT EXISTS (SELECT 1 FROM SummaryGuard)
+BEGIN
+    INSERT INTO CustomerOrderStats (CustomerID, OrderCount, TotalSpent, FirstOrder, LastOrder)
+    VALUES (NEW.CustomerID, 1, NEW.TotalAmount, NEW.OrderDate, NEW.OrderDate)
+    ON CONFLICT (CustomerID) DO UPDATE SET
+        OrderCount = OrderCount + 1,
+        TotalSpent = TotalSpent + excluded.TotalSpent,
+        FirstOrder = MIN(COALESCE(FirstOrder, excluded.FirstOrder), excluded.FirstOrder),
+        LastOrder = MAX(COALESCE(LastOrder, excluded.LastOrder), excluded.LastOrder);
+END;
+"""
+
+GUARDED_RFM_TRIGGER_SQL = """
+CREATE TRIGGER IF NOT EXISTS trg_order_insert_rfm AFTER INSERT ON `Order`
+WHEN NOT EXISTS (SELECT 1 FROM SummaryGuard)
+BEGIN
+    INSERT OR IGNORE INTO RFMDirty (CustomerID) VALUES (NEW.CustomerID);
+END;
+"""
+
+
+def guard_insert_triggers(conn):
+    """Recreates the Order/OrderItem insert triggers with the SummaryGuard check."""
+    run_script(conn, SUMMARY_GUARD_SQL)
+    for name in ("trg_orderitem_insert_summary", "trg_order_insert_summary", "trg_order_insert_rfm"):
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+    run_script(conn, GUARDED_SUMMARY_TRIGGERS_SQL)
+    run_script(conn, GUARDED_RFM_TRIGGER_SQL)
+
+
+MIGRATIONS = [
+    (1, "initial schema", SCHEMA_SQL),
+    (2, "sample data", seed_sample_data),
+    (3, "sales summary tables", create_sales_summaries),
+    (4, "customer RFM scores", RFM_SQL),
+    (5, "table version counters", TABLE_VERSION_SQL),
+    (6, "inventory reorder points", INVENTORY_SQL),
+    (7, "summary trigger guard", guard_insert_triggers),
+]
+
+
+def split_statements(script):
+    """Splits an SQL script into complete statements."""
+    statements, buffer = [], ""
+    for line in script.splitlines(keepends=True):
+        buffer += line
+        if sqlite3.complete_statement(buffer):
+            statements.append(buffer.strip())
+            buffer = ""
+    if buffer.strip():
+        statements.append(buffer.strip())
+    return statements
+
+
+def run_script(conn, script):
+    # Unlike executescript(), this does not COMMIT, so it stays inside the
+    # migration's transaction.
+    for statement in split_statements(script):
+        conn.execute(statement)
+
+
+def current_version(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS schema_version (
+            version INTEGER PRIMARY KEY,
+            description TEXT NOT NULL,
+            applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    """)
+    row = conn.execute("SELECT MAX(version) FROM schema_version").fetchone()
+    return row[0] or 0
+
+
+def pending(conn):
+    version = current_version(conn)
+    return [m for m in MIGRATIONS if m[0] > version]
+
+
+def migrate(conn):
+    """Applies missing migrations, each in its own transaction.
+
+    BEGIN IMMEDIATE takes the write lock before the version is re-read, so
+    concurrent processes apply every migration exactly once and readers only
+    ever see the state before or after a whole migration.
+    Returns the list of applied versions.
+    """
+    isolation_level = conn.isolation_level
+    conn.isolation_level = None  # manage transactions explicitly
+    applied = []
+    try:
+        if not pending(conn):
+            return applied
+        for version, description, step in MIGRATIONS:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                if version <= current_version(conn):
+                    conn.execute("ROLLBACK")
+                    continue
+                if callable(step):
+                    step(conn)
+                else:
+                    run_script(conn, step)
+                conn.execute(
+                    "INSERT INTO schema_version (version, description) VALUES (?, ?)",
+                    (version, description),
+                )
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            applied.append(version)
+    finally:
+        conn.isolation_level = isolation_level
+    return applied
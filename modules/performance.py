@@ -0,0 +1,68 @@
+import streamlit as st
+import pandas as pd
+from modules import db, plancheck, querylog, registry
+
+def report_names():
+    """Query fingerprint -> report name, for the queries the reports page runs."""
+    return {querylog.fingerprint(db.normalize_sql(sql)): name
+            for name, (sql, _) in registry.QUERIES.items()}
+
+def latency_table(df):
+    """p50/p95/p99 wall time and cache hit rate per query."""
+    grouped = df.groupby("Query")
+    stats = pd.DataFrame({
+        "Calls": grouped.size(),
+        "p50 ms": grouped["ms"].quantile(0.50),
+        "p95 ms": grouped["ms"].quantile(0.95),
+        "p99 ms": grouped["ms"].quantile(0.99),
+        "Max ms": grouped["ms"].max(),
+        "Cache hit %": grouped["cache"].apply(lambda c: 100 * (c == "hit").mean()),
+        "Avg rows": grouped["rows"].mean(),
+    })
+    return stats.round(2).sort_values("p95 ms", ascending=False)
+
+def app():
+    st.title("⏱️ Query Performance")
+    st.text("Timings of recent database queries, recorded in this app process.")
+
+    records = querylog.records()
+    if not records:
+        st.info("No queries recorded yet. Open a report or the Overview page first.")
+        return
+
+    df = pd.DataFrame(records)
+    names = report_names()
+    df["Query"] = df["fingerprint"].map(lambda f: names.get(f, f[:80]))
+
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Queries recorded", len(df))
+    col2.metric("Cache hit rate", f"{100 * (df['cache'] == 'hit').mean():.0f}%")
+    col3.metric("p95 latency", f"{df['ms'].quantile(0.95):.1f} ms")
+
+    st.subheader("Latency per report")
+    only_reports = st.checkbox("Report queries only", value=True)
+    shown = df[df["fingerprint"].isin(names)] if only_reports else df
+    if shown.empty:
+        st.caption("No report queries recorded yet.")
+    else:
+        st.dataframe(latency_table(shown), use_container_width=True)
+
+    st.subheader("Slowest recent queries")
+    count = st.slider("Show", 5, 50, 10)
+    slowest = df[df["cache"] != "hit"].nlargest(count, "ms")
+    for _, row in slowest.iterrows():
+        with st.expander(f"{row['ms']:.1f} ms · {row['rows']} rows · {row['Query']}"):
+            st.code(row["sql"], language="sql")
+            st.caption(f"Params {row['params_shape']} · cache {row['cache']}")
+            try:
+                with db.get_pool().connection() as conn:
+                    plan = plancheck.explain(conn, row["sql"], row["params"])
+                st.code("\n".join(plan), language="text")
+            except Exception as e:
+                st.caption(f"No plan available: {e}")
+
+    col1, col2 = st.columns(2)
+    col1.download_button("Download log (JSONL)", querylog.to_jsonl(), file_name="query_log.jsonl")
+    if col2.button("Clear log"):
+        querylog.clear()
+        st.rerun()
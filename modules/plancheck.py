@@ -0,0 +1,116 @@
+"""EXPLAIN QUERY PLAN checker for the report queries.
+
+Fails when a report query does a full scan of a large table, which is what
+happens when one of the managed indexes goes missing or a query change stops
+the planner from using it. Run from the project root:
+
+    python -m modules.plancheck            # checks a fresh, empty schema
+    python -m modules.plancheck --db nordicx.db
+"""
+import argparse
+import os
+import re
+import sqlite3
+import sys
+import tempfile
+
+from modules import registry
+
+# Tables that grow with the business; a plain SCAN of one of these is a failure
+LARGE_TABLES = {"Customer", "Order", "OrderItem", "Product", "Schedule",
+                "ProductSales", "CustomerOrderStats", "CustomerRFM", "ProductDailySales"}
+
+# Full scans that are inherent to the query (it reports on every row)
+ALLOWED_SCANS = {
+    "Query 9: Customer list": {"Customer"},
+    "Query 10.1: High-Value Customers": {"CustomerOrderStats"},
+    "Query 10.1: Average Order Value": {"CustomerOrderStats"},
+    "Query 10.3: Customer Segmentation": {"Customer"},
+    "Query 10.3: RFM Segments": {"CustomerRFM"},
+    "Executive Dashboard": {"Customer"},
+}
+
+_TABLE_REF = re.compile(
+    r"\b(?:FROM|JOIN)\s+`?(\w+)`?"
+    r"(?:\s+(?:AS\s+)?(?!(?:ON|WHERE|JOIN|LEFT|INNER|CROSS|GROUP|ORDER|LIMIT)\b)(\w+))?",
+    re.IGNORECASE,
+)
+_SCAN = re.compile(r"^SCAN (\w+)(.*)$")
+
+
+def explain(conn, sql, params=None):
+    """Returns the EXPLAIN QUERY PLAN detail lines for a query."""
+    rows = conn.execute("EXPLAIN QUERY PLAN " + sql, params or ()).fetchall()
+    return [row[3] for row in rows]
+
+
+def alias_map(conn, sql):
+    """Maps table aliases in the query (and in any views) to table names."""
+    sources = [sql] + [v for (v,) in conn.execute(
+        "SELECT sql FROM sqlite_master WHERE type = 'view'")]
+    aliases = {}
+    for source in sources:
+        for table, alias in _TABLE_REF.findall(source):
+            aliases[table] = table
+            if alias:
+                aliases[alias] = table
+    return aliases
+
+
+def full_scans(conn, sql, params=None):
+    """Returns the tables the plan reads with a full (non-covering) scan."""
+    aliases = alias_map(conn, sql)
+    scanned = set()
+    for detail in explain(conn, sql, params):
+        match = _SCAN.match(detail)
+        if match and "USING COVERING INDEX" not in match.group(2):
+            scanned.add(aliases.get(match.group(1), match.group(1)))
+    return scanned
+
+
+def check(conn, report_queries=None):
+    """Returns {query name: offending tables} for every regressed query."""
+    report_queries = registry.samples() if report_queries is None else report_queries
+    failures = {}
+    for name, (sql, params) in report_queries.items():
+        bad = (full_scans(conn, sql, params) & LARGE_TABLES) - ALLOWED_SCANS.get(name, set())
+        if bad:
+            failures[name] = sorted(bad)
+    return failures
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check report query plans for full scans.")
+    parser.add_argument("--db", help="database to check (default: a fresh schema)")
+    parser.add_argument("-v", "--verbose", action="store_true", help="print every plan")
+    args = parser.parse_args(argv)
+
+    from modules import db
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.db:
+            conn = sqlite3.connect(args.db)
+        else:
+            db.DB_FILE = os.path.join(tmp, "plancheck.db")
+            db.init_db()
+            conn = sqlite3.connect(db.DB_FILE)
+        try:
+            if args.verbose:
+                for name, (sql, params) in registry.samples().items():
+                    print(name)
+                    for detail in explain(conn, sql, params):
+                        print(f"    {detail}")
+            failures = check(conn)
+        finally:
+            conn.close()
+
+    for name, tables in failures.items():
+        print(f"FAIL {name}: full scan of {', '.join(tables)}")
+    if failures:
+        return 1
+    print(f"OK: {len(registry.QUERIES)} report queries use indexes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
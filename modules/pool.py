@@ -0,0 +1,115 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+# Applied to every new connection. journal_mode=WAL is persistent on the file,
+# the rest are per-connection settings.
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -16000,  # negative = KiB, so ~16 MB page cache
+    "mmap_size": 268435456,  # 256 MB
+    "foreign_keys": "ON",
+    "busy_timeout": 5000,
+}
+
+
+class PoolTimeout(Exception):
+    """Raised when no pooled connection becomes free in time."""
+
+
+def apply_pragmas(conn, pragmas):
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value};")
+
+
+class ConnectionPool:
+    """Bounded pool of SQLite connections shared across threads.
+
+    Connections are created lazily up to `size` and handed out one thread at a
+    time, so Streamlit's script threads can reuse them without reconnecting.
+    Each connection keeps up to `cached_statements` prepared statements, so a
+    query text that was run before is not parsed and planned again.
+    """
+
+    def __init__(self, path, size=8, pragmas=None, uri=False, timeout=30.0, cached_statements=128):
+        self.path = path
+        self.size = size
+        self.pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+        self.uri = uri
+        self.timeout = timeout
+        self.cached_statements = cached_statements
+        self._idle = queue.LifoQueue()
+        self._slots = threading.BoundedSemaphore(size)
+        self._lock = threading.Lock()
+        self._all = []
+        self._closed = False
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, uri=self.uri, check_same_thread=False,
+                               cached_statements=self.cached_statements)
+        apply_pragmas(conn, self.pragmas)
+        with self._lock:
+            self._all.append(conn)
+        return conn
+
+    def acquire(self, timeout=None):
+        if self._closed:
+            raise RuntimeError("Connection pool is closed")
+        timeout = self.timeout if timeout is None else timeout
+        if not self._slots.acquire(timeout=timeout):
+            raise PoolTimeout(f"No connection available after {timeout}s")
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def release(self, conn):
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error:
+            # Broken connection, drop it instead of handing it out again
+            self._discard(conn)
+        else:
+            if self._closed:
+                self._discard(conn)
+            else:
+                self._idle.put(conn)
+        finally:
+            self._slots.release()
+
+    def _discard(self, conn):
+        with self._lock:
+            if conn in self._all:
+                self._all.remove(conn)
+        conn.close()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Closes idle connections; busy ones are closed when released."""
+        self._closed = True
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(conn)
+
+    def stats(self):
+        with self._lock:
+            opened = len(self._all)
+        return {"size": self.size, "open": opened, "idle": self._idle.qsize()}
@@ -0,0 +1,192 @@
+"""SQL behind the reports page, shared with the query-plan checker.
+
+The aggregate reports (Query 7, 10.1, 10.2, 10.3) read the trigger-maintained
+summary tables created in migrations.py instead of scanning Order/OrderItem.
+"""
+
+CUSTOMERS_BY_PURCHASE_DATE = """
+SELECT DISTINCT c.CustomerID, c.Name, c.Email, o.OrderDate
+FROM Customer c
+JOIN `Order` o ON c.CustomerID = o.CustomerID
+WHERE o.OrderDate BETWEEN ? AND ?
+ORDER BY o.OrderDate;
+"""
+
+LOW_STOCK_PRODUCTS = """
+SELECT p.ProductID, p.Name, p.Category, p.StockLevel, p.Price,
+       s.Name as SupplierName
+FROM Product p
+INNER JOIN Supplier s ON p.SupplierID = s.SupplierID
+WHERE p.StockLevel < ?
+ORDER BY p.StockLevel ASC;
+"""
+
+EMPLOYEES = "SELECT EmployeeID, Name FROM Employee"
+
+EMPLOYEE_SCHEDULE = """
+SELECT e.EmployeeID, e.Name as EmployeeName, e.Position,
+       s.ScheduleDate, s.ShiftDetails
+FROM Employee e
+INNER JOIN Schedule s ON e.EmployeeID = s.EmployeeID
+WHERE e.EmployeeID = ?
+  AND s.ScheduleDate BETWEEN ? AND ?
+ORDER BY s.ScheduleDate;
+"""
+
+SALES_BY_CATEGORY = """
+SELECT NULLIF(Category, '') AS Category, SUM(TotalSales) AS TotalSales
+FROM SalesDailyCategory
+WHERE SaleDate BETWEEN ? AND ?
+GROUP BY Category
+ORDER BY TotalSales DESC;
+"""
+
+DAILY_SALES = """
+SELECT SaleDate, NULLIF(Category, '') AS Category, TotalSales, UnitsSold
+FROM SalesDailyCategory
+WHERE SaleDate BETWEEN ? AND ?
+ORDER BY SaleDate;
+"""
+
+SUPPLIERS_AND_PRODUCTS = """
+SELECT s.SupplierID, s.Name AS SupplierName, s.ContactInfo, s.Address,
+       p.Name AS ProductName, p.Category
+FROM Supplier s
+LEFT JOIN Product p ON s.SupplierID = p.SupplierID
+ORDER BY s.Name, p.Name;
+"""
+
+CUSTOMERS = "SELECT CustomerID, Name FROM Customer"
+
+# Note: The View is created in migrations.py
+CUSTOMER_PURCHASE_HISTORY = """
+SELECT * FROM CustomerPurchaseHistory
+WHERE CustomerID = ?
+ORDER BY OrderDate;
+"""
+
+HIGH_VALUE_CUSTOMERS = """
+SELECT c.CustomerID, c.Name, s.TotalSpent
+FROM CustomerOrderStats s
+JOIN Customer c ON c.CustomerID = s.CustomerID
+WHERE s.TotalSpent > (SELECT SUM(TotalSpent) * 1.0 / SUM(OrderCount) FROM CustomerOrderStats)
+ORDER BY s.TotalSpent DESC;
+"""
+
+AVERAGE_ORDER_VALUE = "SELECT SUM(TotalSpent) * 1.0 / SUM(OrderCount) as Avg FROM CustomerOrderStats"
+
+TOP_SELLING_PRODUCTS = """
+SELECT p.ProductID, p.Name, s.UnitsSold AS TotalUnitsSold
+FROM ProductSales s
+JOIN Product p ON p.ProductID = s.ProductID
+WHERE s.UnitsSold > 0
+ORDER BY s.UnitsSold DESC
+LIMIT 3;
+"""
+
+CUSTOMER_SEGMENTATION = """
+SELECT c.CustomerID, c.Name AS CustomerName, c.Email,
+       COALESCE(s.OrderCount, 0) AS TotalOrders,
+       COALESCE(s.TotalSpent, 0) AS AllTimeValue,
+       ROUND(COALESCE(s.TotalSpent * 1.0 / s.OrderCount, 0), 2) AS AverageOrderValue,
+       s.FirstOrder AS FirstPurchase,
+       s.LastOrder AS LastPurchase,
+       CASE
+           WHEN s.OrderCount >= 3 THEN 'VIP Customer'
+           WHEN s.OrderCount = 2 THEN 'Regular Customer'
+           WHEN s.OrderCount = 1 THEN 'New Customer'
+           ELSE 'No Orders'
+       END AS CustomerSegment
+FROM Customer c
+LEFT JOIN CustomerOrderStats s ON c.CustomerID = s.CustomerID
+ORDER BY AllTimeValue DESC;
+"""
+
+# RFM scores are maintained by modules/rfm.py
+RFM_SEGMENTS = """
+SELECT Segment, COUNT(*) AS Customers,
+       ROUND(AVG(R), 2) AS AvgR, ROUND(AVG(F), 2) AS AvgF, ROUND(AVG(M), 2) AS AvgM,
+       ROUND(SUM(Monetary), 2) AS Revenue
+FROM CustomerRFM
+GROUP BY Segment
+ORDER BY Revenue DESC;
+"""
+
+RFM_PENDING = "SELECT COUNT(*) AS Customers FROM RFMDirty"
+
+RFM_SEGMENT_CUSTOMERS = """
+SELECT r.CustomerID, c.Name, c.Email, r.LastOrder, r.Frequency, r.Monetary,
+       r.R || r.F || r.M AS RFM
+FROM CustomerRFM r
+JOIN Customer c ON c.CustomerID = r.CustomerID
+WHERE r.Segment = ?
+ORDER BY r.Monetary DESC
+LIMIT ?;
+"""
+
+# Reorder points and velocities are maintained by modules/inventory.py. The
+# WHERE expression matches idx_product_reorder, so only products below their
+# reorder point are read.
+REORDER_SUGGESTIONS = """
+SELECT s.SupplierID, s.Name AS SupplierName, p.ProductID, p.Name, p.Category,
+       p.StockLevel, p.ReorderPoint, ROUND(COALESCE(v.UnitsPerDay, 0), 2) AS UnitsPerDay,
+       p.ReorderPoint - p.StockLevel + COALESCE(v.ReorderQty, 0) AS SuggestedQty
+FROM Product p
+JOIN Supplier s ON s.SupplierID = p.SupplierID
+LEFT JOIN ProductVelocity v ON v.ProductID = p.ProductID
+WHERE p.StockLevel - p.ReorderPoint < 0
+ORDER BY s.Name, p.StockLevel - p.ReorderPoint;
+"""
+
+INVENTORY_PENDING = """
+SELECT (SELECT COUNT(*) FROM OrderItem
+        WHERE OrderItemID > COALESCE((SELECT Value FROM InventoryState WHERE Key = 'watermark'), 0)
+       ) AS NewLines,
+       (SELECT COUNT(*) FROM InventoryDirty) AS ChangedProducts;
+"""
+
+# Executive dashboard: every KPI in one statement, as (Kpi, Label, Value) rows.
+# The customers CTE is one pass over Customer and CustomerOrderStats; the
+# threshold is the average order value as a window over that same pass.
+# Params: date range, top products, top customers, low-stock threshold.
+DASHBOARD_KPIS = """
+WITH customers AS MATERIALIZED (
+    SELECT c.Name, COALESCE(s.OrderCount, 0) AS OrderCount, COALESCE(s.TotalSpent, 0) AS TotalSpent,
+           SUM(s.TotalSpent) OVER () * 1.0 / SUM(s.OrderCount) OVER () AS Threshold
+    FROM Customer c
+    LEFT JOIN CustomerOrderStats s ON c.CustomerID = s.CustomerID
+),
+high_value AS (
+    SELECT Name, TotalSpent, ROW_NUMBER() OVER (ORDER BY TotalSpent DESC) AS Rank
+    FROM customers
+    WHERE TotalSpent > Threshold
+)
+SELECT 'Sales by category' AS Kpi, NULLIF(Category, '') AS Label, SUM(TotalSales) AS Value
+FROM SalesDailyCategory
+WHERE SaleDate BETWEEN ? AND ?
+GROUP BY Category
+UNION ALL
+SELECT 'Top product', p.Name, t.UnitsSold
+FROM (SELECT ProductID, UnitsSold FROM ProductSales WHERE UnitsSold > 0
+      ORDER BY UnitsSold DESC LIMIT ?) t
+JOIN Product p ON p.ProductID = t.ProductID
+UNION ALL
+SELECT 'High-value customer', Name, TotalSpent FROM high_value WHERE Rank <= ?
+UNION ALL
+SELECT 'High-value customers', NULL, COUNT(*) FROM high_value
+UNION ALL
+SELECT 'Average order value', NULL, MAX(Threshold) FROM customers
+UNION ALL
+SELECT 'Segment',
+       CASE
+           WHEN OrderCount >= 3 THEN 'VIP Customer'
+           WHEN OrderCount = 2 THEN 'Regular Customer'
+           WHEN OrderCount = 1 THEN 'New Customer'
+           ELSE 'No Orders'
+       END AS Segment,
+       COUNT(*)
+FROM customers
+GROUP BY Segment
+UNION ALL
+SELECT 'Low-stock products', NULL, COUNT(*) FROM Product WHERE StockLevel < ?;
+"""
@@ -0,0 +1,75 @@
+"""In-process log of query timings.
+
+db.run_query records every call here: the SQL fingerprint (literals replaced
+by ?), the shape of its parameters, wall time, rows returned and whether the
+result came from the query cache. The last `CAPACITY` records are kept in a
+ring buffer; set `LOG_PATH` (or NORDICX_QUERY_LOG) to also append each record
+to a JSONL file.
+"""
+import functools
+import json
+import os
+import re
+import threading
+import time
+from collections import deque
+
+CAPACITY = 5000
+LOG_PATH = os.environ.get("NORDICX_QUERY_LOG")
+
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+
+_records = deque(maxlen=CAPACITY)
+_lock = threading.Lock()
+
+
+@functools.lru_cache(maxsize=1024)
+def fingerprint(sql):
+    """Replaces string and number literals in normalized SQL with ?."""
+    return _LITERALS.sub("?", sql)
+
+
+def params_shape(params):
+    """Describes parameters by type only, e.g. "(str, int)"."""
+    if params is None:
+        return "()"
+    if isinstance(params, dict):
+        return "{" + ", ".join(f"{k}: {type(v).__name__}" for k, v in sorted(params.items())) + "}"
+    if isinstance(params, (list, tuple)):
+        return "(" + ", ".join(type(v).__name__ for v in params) + ("," if len(params) == 1 else "") + ")"
+    return f"({type(params).__name__},)"
+
+
+def record(sql, params, seconds, rows, cache):
+    """Adds one query execution; `cache` is "hit", "miss" or "off"."""
+    entry = {
+        "ts": time.time(),
+        "fingerprint": fingerprint(sql),
+        "params_shape": params_shape(params),
+        "ms": round(seconds * 1000, 3),
+        "rows": rows,
+        "cache": cache,
+    }
+    with _lock:
+        # Params stay in memory only (the slow-query panel explains with them)
+        _records.append(dict(entry, sql=sql, params=params))
+        if LOG_PATH:
+            with open(LOG_PATH, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry) + "\n")
+
+
+def records():
+    """Snapshot of the buffer, oldest first."""
+    with _lock:
+        return list(_records)
+
+
+def clear():
+    with _lock:
+        _records.clear()
+
+
+def to_jsonl():
+    """The buffer as JSONL, without parameter values."""
+    return "".join(json.dumps({k: v for k, v in r.items() if k not in ("sql", "params")}) + "\n"
+                   for r in records())
@@ -0,0 +1,126 @@
+"""Named report queries with typed parameters.
+
+Every query the app runs with parameters is declared here once: its SQL (from
+queries.py) and its parameters as (name, type, sample value). bind() checks
+and normalizes the arguments, e.g. dates become ISO strings so they compare
+correctly with the TEXT dates in the database and give stable cache keys.
+Because each name always maps to the same SQL string, the per-connection
+statement cache (db.STATEMENT_CACHE_SIZE) prepares it only once.
+
+    sql, params = registry.bind("Query 5: Low Stock Products", threshold=20)
+    df = registry.run("Query 5: Low Stock Products", 20)
+"""
+from datetime import date, datetime
+
+from modules import db, queries
+
+
+def _date(value):
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, str):
+        return date.fromisoformat(value).isoformat()
+    raise TypeError(f"expected a date, got {type(value).__name__}")
+
+
+def _int(value):
+    if isinstance(value, bool) or isinstance(value, float) and not value.is_integer():
+        raise TypeError(f"expected an integer, got {value!r}")
+    return int(value)
+
+
+def _id(value):
+    value = _int(value)
+    if value <= 0:
+        raise ValueError(f"IDs are positive, got {value}")
+    return value
+
+
+def _count(value):
+    value = _int(value)
+    if value < 0:
+        raise ValueError(f"expected a non-negative number, got {value}")
+    return value
+
+
+def _text(value):
+    if not isinstance(value, str):
+        raise TypeError(f"expected text, got {type(value).__name__}")
+    return value
+
+
+PARAM_TYPES = {"date": _date, "int": _int, "id": _id, "count": _count, "text": _text}
+
+# name -> (SQL, [(parameter, type, sample value), ...])
+QUERIES = {
+    "Query 4: Customers by Purchase Date": (queries.CUSTOMERS_BY_PURCHASE_DATE, [
+        ("start", "date", "2025-01-01"), ("end", "date", "2025-01-31")]),
+    "Query 5: Low Stock Products": (queries.LOW_STOCK_PRODUCTS, [("threshold", "int", 50)]),
+    "Query 6: Employee list": (queries.EMPLOYEES, []),
+    "Query 6: Employee Work Schedule": (queries.EMPLOYEE_SCHEDULE, [
+        ("employee", "id", 1), ("start", "date", "2025-02-01"), ("end", "date", "2025-02-05")]),
+    "Query 7: Total Sales by Category": (queries.SALES_BY_CATEGORY, [
+        ("start", "date", "2025-01-01"), ("end", "date", "2025-12-31")]),
+    "Query 7: Daily Sales Trend": (queries.DAILY_SALES, [
+        ("start", "date", "2025-01-01"), ("end", "date", "2025-12-31")]),
+    "Query 8: Suppliers & Products": (queries.SUPPLIERS_AND_PRODUCTS, []),
+    "Query 9: Customer list": (queries.CUSTOMERS, []),
+    "Query 9: Customer Purchase History": (queries.CUSTOMER_PURCHASE_HISTORY, [("customer", "id", 1)]),
+    "Query 10.1: High-Value Customers": (queries.HIGH_VALUE_CUSTOMERS, []),
+    "Query 10.1: Average Order Value": (queries.AVERAGE_ORDER_VALUE, []),
+    "Query 10.2: Top Selling Products": (queries.TOP_SELLING_PRODUCTS, []),
+    "Query 10.3: Customer Segmentation": (queries.CUSTOMER_SEGMENTATION, []),
+    "Query 10.3: RFM Segments": (queries.RFM_SEGMENTS, []),
+    "Query 10.3: RFM Segment Customers": (queries.RFM_SEGMENT_CUSTOMERS, [
+        ("segment", "text", "Champions"), ("limit", "count", 100)]),
+    "Query 10.3: RFM Pending": (queries.RFM_PENDING, []),
+    "Query 11: Reorder Suggestions": (queries.REORDER_SUGGESTIONS, []),
+    "Query 11: Inventory Pending": (queries.INVENTORY_PENDING, []),
+    "Executive Dashboard": (queries.DASHBOARD_KPIS, [
+        ("start", "date", "2025-01-01"), ("end", "date", "2025-12-31"),
+        ("top_products", "count", 5), ("top_customers", "count", 10), ("low_stock", "int", 50)]),
+}
+
+
+def bind(name, *args, **kwargs):
+    """Returns (SQL, normalized parameter tuple) for a named query.
+
+    Arguments are matched to the declared parameters like a function call.
+    An unknown query raises KeyError, missing, extra or unknown arguments
+    raise TypeError and values that don't fit the parameter type ValueError.
+    """
+    if name not in QUERIES:
+        raise KeyError(f"Unknown query: {name}")
+    sql, declared = QUERIES[name]
+    if len(args) > len(declared):
+        raise TypeError(f"{name} takes {len(declared)} parameter(s), got {len(args)}")
+    values = dict(zip([param for param, _, _ in declared], args))
+    for param, value in kwargs.items():
+        if param in values or param not in {p for p, _, _ in declared}:
+            raise TypeError(f"{name}: unexpected or repeated parameter '{param}'")
+        values[param] = value
+    bound = []
+    for param, kind, _ in declared:
+        if param not in values:
+            raise TypeError(f"{name}: missing parameter '{param}'")
+        try:
+            bound.append(PARAM_TYPES[kind](values[param]))
+        except (TypeError, ValueError) as e:
+            raise ValueError(f"{name}: bad {kind} for '{param}': {e}") from None
+    return sql, tuple(bound) or None
+
+
+def run(name, *args, **kwargs):
+    return db.run_query(*bind(name, *args, **kwargs))
+
+
+def submit(name, *args, **kwargs):
+    return db.submit_query(*bind(name, *args, **kwargs))
+
+
+def samples():
+    """name -> (SQL, sample parameters) for every query, for plan checks and benchmarks."""
+    return {name: bind(name, *[sample for _, _, sample in declared])
+            for name, (_, declared) in QUERIES.items()}
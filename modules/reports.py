@@ -1,9 +1,59 @@
+import os
+import time
+import uuid
 import streamlit as st
-import plotly.express as px
-from modules import db
+from modules import db, lookup, registry
 from datetime import date
 
+def submit(name, *args):
+    """Starts a registered report query in the background (see registry.bind)."""
+    handle = registry.submit(name, *args)
+    st.session_state.setdefault('report_queries', []).append(handle)
+    return handle
+
+def result(handle, slot=None):
+    """Waits for a submitted query, showing progress in `slot` meanwhile."""
+    slot = slot or st.empty()
+    started = time.perf_counter()
+    # Updating the page while waiting lets Streamlit stop this run as soon as
+    # the user switches report; the next run then cancels the stale query.
+    while not handle.wait(0.2):
+        slot.caption(f"Running query… {time.perf_counter() - started:.1f}s")
+    slot.empty()
+    return handle.result()
+
+def export_controls(name, query_name, *args):
+    """Streams the report's full result to a file and offers it for download."""
+    from modules import export
+    query, params = registry.bind(query_name, *args)
+    with st.expander("Export full result"):
+        fmt = st.radio("Format", list(export.FORMATS), horizontal=True, key=f"export_format_{name}")
+        # A prepared file belongs to this session and these parameters only:
+        # its name is unique, and it is dropped as soon as the parameters
+        # change. Files left by ended sessions expire (remove_stale_exports).
+        state_key, request = f"export_file_{name}", (query, params, fmt)
+        prepared = st.session_state.get(state_key)
+        if prepared and (prepared[0] != request or not os.path.exists(prepared[1])):
+            export.remove_export(prepared[1])
+            del st.session_state[state_key]
+            prepared = None
+        if st.button("Prepare export", key=f"export_run_{name}"):
+            if prepared:
+                export.remove_export(prepared[1])
+            export.remove_stale_exports()
+            path = export.export_path(name, fmt, export.SESSION_EXPORT_DIR, token=uuid.uuid4().hex[:12])
+            path, rows = export.export_query(name, query, params, fmt, path)
+            prepared = st.session_state[state_key] = (request, path, rows)
+        if prepared:
+            _, path, rows = prepared
+            st.caption(f"{rows} rows written to {path}")
+            with open(path, "rb") as f:
+                st.download_button("Download", f, file_name=os.path.basename(path), key=f"export_dl_{name}")
+
 def app():
+    # Queries still running from the previous run belong to a report that is no longer shown
+    db.cancel_queries(st.session_state.pop('report_queries', []))
+
     st.title("📊 Reports & Analysis")
 
     st.markdown("Select a report to view specific insights from the NordicX database.")
@@ -12,8 +62,10 @@ def app():
         "Select a report...",
         "Customers by Purchase Date",
         "Low Stock Products",
+        "Reorder Suggestions",
         "Employee Work Schedule",
         "Total Sales by Category",
+        "Daily Sales Trend",
         "Suppliers & Products",
         "Customer Purchase History",
         "High-Value Customers",
@@ -23,6 +75,12 @@ def app():
 
     st.divider()
 
+    if report_type == "Select a report...":
+        return
+    # Plotting and pandas-based helpers are slow to import, so only once a report is shown
+    import plotly.express as px
+    from modules import charts
+
     if report_type == "Customers by Purchase Date":
         st.subheader("Query 4: Customers by Purchase Date Range")
         
@@ -31,60 +89,102 @@ def app():
         end_date = col2.date_input("End Date", date(2025, 1, 31))
 
         if st.button("Run Query"):
-            query = """
-            SELECT DISTINCT c.CustomerID, c.Name, c.Email, o.OrderDate
-            FROM Customer c
-            JOIN `Order` o ON c.CustomerID = o.CustomerID
-            WHERE o.OrderDate BETWEEN ? AND ?
-            ORDER BY o.OrderDate;
-            """
-            df = db.run_query(query, (start_date, end_date))
+            df = result(submit("Query 4: Customers by Purchase Date", start_date, end_date))
             st.dataframe(df, use_container_width=True)
 
+        export_controls(report_type, "Query 4: Customers by Purchase Date", start_date, end_date)
+
     elif report_type == "Low Stock Products":
         st.subheader("Query 5: Low Stock Products")
         threshold = st.slider("Stock Threshold", 0, 100, 50)
         
-        query = """
-        SELECT p.ProductID, p.Name, p.Category, p.StockLevel, p.Price,
-               s.Name as SupplierName
-        FROM Product p
-        INNER JOIN Supplier s ON p.SupplierID = s.SupplierID
-        WHERE p.StockLevel < ?
-        ORDER BY p.StockLevel ASC;
-        """
-        df = db.run_query(query, (threshold,))
+        query = "Query 5: Low Stock Products"
+        df = result(submit(query, threshold))
         
         st.dataframe(df, use_container_width=True)
+        export_controls(report_type, query, threshold)
         
         if not df.empty:
-            fig = px.bar(df, x='Name', y='StockLevel', color='Category', title=f"Products with Stock < {threshold}")
+            lowest, hidden = charts.downsample_bars(df, 'StockLevel', ascending=True)
+            fig = px.bar(lowest, x='Name', y='StockLevel', color='Category', title=f"Products with Stock < {threshold}")
             st.plotly_chart(fig, use_container_width=True)
+            if hidden:
+                st.caption(f"Chart shows the {len(lowest)} lowest of {len(df)} products.")
+
+    elif report_type == "Reorder Suggestions":
+        st.subheader("Query 11: Reorder Suggestions by Supplier")
+
+        query = "Query 11: Reorder Suggestions"
+        suggestions_query, pending_query = submit(query), submit("Query 11: Inventory Pending")
+        pending = result(pending_query).iloc[0]
+        col1, col2 = st.columns([3, 1])
+        if pending['NewLines'] or pending['ChangedProducts']:
+            col1.caption(f"{int(pending['NewLines'])} new and {int(pending['ChangedProducts'])} changed "
+                         "product(s)' order lines since reorder points were last updated.")
+        if col2.button("Update reorder points"):
+            from modules import inventory
+            stats = inventory.update()
+            st.toast(f"{stats['products']} reorder points updated ({stats['mode']}, {stats['seconds']:.2f}s)")
+            st.rerun()
+
+        df = result(suggestions_query)
+        if df.empty:
+            st.info("No product is below its reorder point.")
+        else:
+            by_supplier = (df.groupby(['SupplierID', 'SupplierName'], sort=False)
+                           .agg(Products=('ProductID', 'size'), SuggestedUnits=('SuggestedQty', 'sum'))
+                           .reset_index())
+            col1, col2 = st.columns([1, 2])
+            col1.dataframe(by_supplier.drop(columns='SupplierID'), use_container_width=True, hide_index=True)
+            top, hidden = charts.downsample_bars(by_supplier, 'SuggestedUnits')
+            fig = px.bar(top, x='SupplierName', y='SuggestedUnits', title="Suggested units per supplier")
+            col2.plotly_chart(fig, use_container_width=True)
+            if hidden:
+                col2.caption(f"Chart shows the {len(top)} largest of {len(by_supplier)} suppliers.")
+
+            names = dict(zip(by_supplier['SupplierID'].tolist(), by_supplier['SupplierName']))
+            supplier = st.selectbox("Supplier", list(names), format_func=names.get)
+            lines = df[df['SupplierID'] == supplier].drop(columns=['SupplierID', 'SupplierName'])
+            st.dataframe(lines, use_container_width=True, hide_index=True)
+            if st.button(f"Restock {len(lines)} product(s) with the suggested quantities"):
+                from modules import inventory
+                stats = inventory.restock(zip(lines['ProductID'].tolist(), lines['SuggestedQty'].tolist()))
+                st.toast(f"{stats['units']} units added to {stats['products']} products ({stats['seconds']:.2f}s)")
+                st.rerun()
+        export_controls(report_type, query)
 
     elif report_type == "Employee Work Schedule":
         st.subheader("Query 6: Employee Work Schedule")
         
-        # Get employees for dropdown
-        employees = db.run_query("SELECT EmployeeID, Name FROM Employee")
-        emp_options = {row['Name']: row['EmployeeID'] for _, row in employees.iterrows()}
-        selected_emp = st.selectbox("Select Employee", list(emp_options.keys()))
+        # Start the schedule for the last selection before the widgets render
+        defaults = (date(2025, 2, 1), date(2025, 2, 5))
+        query = "Query 6: Employee Work Schedule"
+        schedule_query = None
+        if st.session_state.get('schedule_employee') is not None:
+            schedule_query = submit(query,
+                                    st.session_state['schedule_employee'],
+                                    st.session_state.get('schedule_start', defaults[0]),
+                                    st.session_state.get('schedule_end', defaults[1]))
+
+        search = st.text_input("Search employee", key='schedule_employee_search')
+        emp_options = dict(lookup.search("Employee", search))
+        selected_emp = st.selectbox("Select Employee", list(emp_options),
+                                    format_func=lambda id_: f"{emp_options[id_]} (#{id_})",
+                                    key='schedule_employee')
         
         col1, col2 = st.columns(2)
-        start_date = col1.date_input("Start Date", date(2025, 2, 1))
-        end_date = col2.date_input("End Date", date(2025, 2, 5))
-
-        if selected_emp:
-            query = """
-            SELECT e.EmployeeID, e.Name as EmployeeName, e.Position,
-                   s.ScheduleDate, s.ShiftDetails
-            FROM Employee e
-            INNER JOIN Schedule s ON e.EmployeeID = s.EmployeeID
-            WHERE e.EmployeeID = ?
-              AND s.ScheduleDate BETWEEN ? AND ?
-            ORDER BY s.ScheduleDate;
-            """
-            df = db.run_query(query, (emp_options[selected_emp], start_date, end_date))
+        start_date = col1.date_input("Start Date", defaults[0], key='schedule_start')
+        end_date = col2.date_input("End Date", defaults[1], key='schedule_end')
+
+        if selected_emp is not None:
+            args = (selected_emp, start_date, end_date)
+            if schedule_query is None or schedule_query.params != registry.bind(query, *args)[1]:
+                if schedule_query is not None:
+                    schedule_query.cancel()
+                schedule_query = submit(query, *args)
+            df = result(schedule_query)
             st.dataframe(df, use_container_width=True)
+            export_controls(report_type, query, *args)
 
     elif report_type == "Total Sales by Category":
         st.subheader("Query 7: Total Sales by Product Category")
@@ -93,115 +193,136 @@ def app():
         start_date = col1.date_input("Start Date", date(2025, 1, 1))
         end_date = col2.date_input("End Date", date(2025, 12, 31))
 
-        query = """
-        SELECT p.Category, SUM(oi.Quantity * oi.Price) AS TotalSales
-        FROM `Order` o
-        JOIN OrderItem oi ON o.OrderID = oi.OrderID
-        JOIN Product p ON oi.ProductID = p.ProductID
-        WHERE o.OrderDate BETWEEN ? AND ?
-        GROUP BY p.Category
-        ORDER BY TotalSales DESC;
-        """
-        df = db.run_query(query, (start_date, end_date))
+        query = "Query 7: Total Sales by Category"
+        df = result(submit(query, start_date, end_date))
         
         col1, col2 = st.columns([1, 2])
         col1.dataframe(df, use_container_width=True)
         
         if not df.empty:
-            fig = px.pie(df, values='TotalSales', names='Category', title="Sales Distribution")
+            fig = px.pie(charts.top_k(df, 'Category', 'TotalSales'), values='TotalSales', names='Category',
+                         title="Sales Distribution")
             col2.plotly_chart(fig, use_container_width=True)
+        export_controls(report_type, query, start_date, end_date)
+
+    elif report_type == "Daily Sales Trend":
+        st.subheader("Query 7: Daily Sales Trend")
+
+        col1, col2, col3 = st.columns(3)
+        start_date = col1.date_input("Start Date", date(2025, 1, 1))
+        end_date = col2.date_input("End Date", date(2025, 12, 31))
+        split = col3.checkbox("Split by category")
+
+        query = "Query 7: Daily Sales Trend"
+        df = result(submit(query, start_date, end_date))
+
+        if df.empty:
+            st.info("No sales in this period.")
+        else:
+            by = 'Category' if split else None
+            source = charts.limit_series(df, 'Category', 'TotalSales') if split else df
+            series, bucket = charts.bucket_dates(source, 'SaleDate', ['TotalSales', 'UnitsSold'], by=by)
+            fig = px.line(series, x='SaleDate', y='TotalSales', color=by, markers=len(series) < 60,
+                          title=f"{bucket} Sales")
+            st.plotly_chart(fig, use_container_width=True)
+            st.caption(f"{len(series)} {bucket.lower()} points plotted from {len(df)} rows.")
+            st.dataframe(series, use_container_width=True, hide_index=True)
+        export_controls(report_type, query, start_date, end_date)
 
     elif report_type == "Suppliers & Products":
         st.subheader("Query 8: Suppliers and Their Products")
-        query = """
-        SELECT s.SupplierID, s.Name AS SupplierName, s.ContactInfo, s.Address,
-               p.Name AS ProductName, p.Category
-        FROM Supplier s
-        LEFT JOIN Product p ON s.SupplierID = p.SupplierID
-        ORDER BY s.Name, p.Name;
-        """
-        df = db.run_query(query)
+        query = "Query 8: Suppliers & Products"
+        df = result(submit(query))
         st.dataframe(df, use_container_width=True)
+        export_controls(report_type, query)
 
     elif report_type == "Customer Purchase History":
         st.subheader("Query 9: Customer Purchase History View")
         
-        # Get customers
-        customers = db.run_query("SELECT CustomerID, Name FROM Customer")
-        cust_options = {row['Name']: row['CustomerID'] for _, row in customers.iterrows()}
-        selected_cust = st.selectbox("Select Customer", list(cust_options.keys()))
-
-        if selected_cust:
-            # Note: The View is created in db.py
-            query = """
-            SELECT * FROM CustomerPurchaseHistory
-            WHERE CustomerID = ?
-            ORDER BY OrderDate;
-            """
-            df = db.run_query(query, (cust_options[selected_cust],))
+        # Start the history for the last selection before the widgets render
+        query = "Query 9: Customer Purchase History"
+        history_query = None
+        if st.session_state.get('history_customer') is not None:
+            history_query = submit(query, st.session_state['history_customer'])
+
+        search = st.text_input("Search customer", key='history_customer_search')
+        cust_options = dict(lookup.search("Customer", search))
+        selected_cust = st.selectbox("Select Customer", list(cust_options),
+                                     format_func=lambda id_: f"{cust_options[id_]} (#{id_})",
+                                     key='history_customer')
+
+        if selected_cust is not None:
+            if history_query is None or history_query.params != registry.bind(query, selected_cust)[1]:
+                if history_query is not None:
+                    history_query.cancel()
+                history_query = submit(query, selected_cust)
+            df = result(history_query)
             st.dataframe(df, use_container_width=True)
+            export_controls(report_type, query, selected_cust)
 
     elif report_type == "High-Value Customers":
         st.subheader("Query 10.1: High-Value Customers (Above Average Spend)")
         
-        query = """
-        SELECT c.CustomerID, c.Name, SUM(o.TotalAmount) AS TotalSpent
-        FROM Customer c
-        JOIN `Order` o ON c.CustomerID = o.CustomerID
-        GROUP BY c.CustomerID, c.Name
-        HAVING SUM(o.TotalAmount) > (SELECT AVG(TotalAmount) FROM `Order`)
-        ORDER BY TotalSpent DESC;
-        """
-        df = db.run_query(query)
+        query = "Query 10.1: High-Value Customers"
+        customers_query, average_query = submit(query), submit("Query 10.1: Average Order Value")
+        df = result(customers_query)
         st.dataframe(df, use_container_width=True)
         
-        avg_spend = db.run_query("SELECT AVG(TotalAmount) as Avg FROM `Order`")['Avg'][0]
+        avg_spend = result(average_query)['Avg'][0]
         st.metric("Average Order Value threshold", f"${avg_spend:.2f}")
+        export_controls(report_type, query)
 
     elif report_type == "Top Selling Products":
         st.subheader("Query 10.2: Top 3 Best-Selling Products")
         
-        query = """
-        SELECT p.ProductID, p.Name, SUM(oi.Quantity) AS TotalUnitsSold
-        FROM Product p
-        JOIN OrderItem oi ON p.ProductID = oi.ProductID
-        GROUP BY p.ProductID, p.Name
-        ORDER BY TotalUnitsSold DESC
-        LIMIT 3;
-        """
-        df = db.run_query(query)
+        query = "Query 10.2: Top Selling Products"
+        df = result(submit(query))
         st.dataframe(df, use_container_width=True)
         
         if not df.empty:
             fig = px.bar(df, x='Name', y='TotalUnitsSold', title="Top 3 Products by Volume")
             st.plotly_chart(fig, use_container_width=True)
+        export_controls(report_type, query)
 
     elif report_type == "Customer Segmentation":
         st.subheader("Query 10.3: Customer Segmentation Analysis")
         
-        query = """
-        SELECT c.CustomerID, c.Name AS CustomerName, c.Email,
-               COUNT(o.OrderID) AS TotalOrders,
-               COALESCE(SUM(o.TotalAmount), 0) AS AllTimeValue,
-               ROUND(COALESCE(AVG(o.TotalAmount), 0), 2) AS AverageOrderValue,
-               MIN(o.OrderDate) AS FirstPurchase,
-               MAX(o.OrderDate) AS LastPurchase,
-               CASE
-                   WHEN COUNT(o.OrderID) >= 3 THEN 'VIP Customer'
-                   WHEN COUNT(o.OrderID) = 2 THEN 'Regular Customer'
-                   WHEN COUNT(o.OrderID) = 1 THEN 'New Customer'
-                   ELSE 'No Orders'
-               END AS CustomerSegment
-        FROM Customer c
-        LEFT JOIN `Order` o ON c.CustomerID = o.CustomerID
-        GROUP BY c.CustomerID, c.Name, c.Email
-        ORDER BY AllTimeValue DESC;
-        """
-        df = db.run_query(query)
-        st.dataframe(df, use_container_width=True)
-        
-        if not df.empty:
-            segment_counts = df['CustomerSegment'].value_counts().reset_index()
-            segment_counts.columns = ['Segment', 'Count']
-            fig = px.pie(segment_counts, values='Count', names='Segment', title="Customer Segments")
-            st.plotly_chart(fig, use_container_width=True)
+        query = "Query 10.3: Customer Segmentation"
+        segmentation_query = submit(query)
+        rfm_query, pending_query = submit("Query 10.3: RFM Segments"), submit("Query 10.3: RFM Pending")
+
+        by_orders, by_rfm = st.tabs(["By order count", "RFM"])
+        with by_orders:
+            df = result(segmentation_query)
+            st.dataframe(df, use_container_width=True)
+
+            if not df.empty:
+                segment_counts = df['CustomerSegment'].value_counts().reset_index()
+                segment_counts.columns = ['Segment', 'Count']
+                fig = px.pie(segment_counts, values='Count', names='Segment', title="Customer Segments")
+                st.plotly_chart(fig, use_container_width=True)
+            export_controls(report_type, query)
+
+        with by_rfm:
+            segments = result(rfm_query)
+            pending = int(result(pending_query)['Customers'][0])
+            col1, col2 = st.columns([3, 1])
+            if segments.empty:
+                col1.info("RFM scores have not been computed yet.")
+            elif pending:
+                col1.caption(f"Orders of {pending} customer(s) changed since the last scoring.")
+            if col2.button("Update RFM scores", disabled=not segments.empty and not pending):
+                from modules import rfm
+                stats = rfm.update()
+                st.toast(f"{stats['scored']} customers scored ({stats['mode']}, {stats['seconds']:.2f}s)")
+                st.rerun()
+
+            if not segments.empty:
+                st.dataframe(segments, use_container_width=True, hide_index=True)
+                fig = px.bar(segments, x='Segment', y='Customers', color='AvgM',
+                             title="Customers per RFM segment (colour: average monetary score)")
+                st.plotly_chart(fig, use_container_width=True)
+
+                segment = st.selectbox("Customers in segment", segments['Segment'].tolist())
+                members = result(submit("Query 10.3: RFM Segment Customers", segment, 100))
+                st.dataframe(members, use_container_width=True, hide_index=True)
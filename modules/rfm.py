@@ -0,0 +1,157 @@
+"""RFM (recency, frequency, monetary) customer scoring.
+
+Every customer with orders gets a 1-5 score per metric from quintile
+breakpoints: R from the date of the last order (later scores higher), F from
+the number of orders and M from the total spent. The input is a three-column
+extract of CustomerOrderStats, scored in one vectorized NumPy pass, and the
+result is stored in CustomerRFM.
+
+Triggers on Order record the customers whose orders changed in RFMDirty, so
+update() only rescores those, against the stored breakpoints. A full run
+recomputes the breakpoints and rescores everyone; it happens on the first run,
+with --full, or when more than FULL_REFRESH_FRACTION of the customers changed.
+
+    python -m modules.rfm          # rescore changed customers
+    python -m modules.rfm --full   # new breakpoints, rescore everyone
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from modules import db
+
+QUANTILES = [0.2, 0.4, 0.6, 0.8]
+FULL_REFRESH_FRACTION = 0.2
+
+# Checked in order; customers matching none are "Need Attention"
+SEGMENTS = [
+    ("Champions", lambda r, f: (r >= 4) & (f >= 4)),
+    ("At Risk", lambda r, f: (r <= 2) & (f >= 3)),
+    ("Loyal Customers", lambda r, f: f >= 4),
+    ("New Customers", lambda r, f: (r >= 4) & (f <= 1)),
+    ("Potential Loyalists", lambda r, f: r >= 4),
+    ("Hibernating", lambda r, f: r <= 2),
+]
+DEFAULT_SEGMENT = "Need Attention"
+
+FULL_EXTRACT = "SELECT CustomerID, LastOrder, OrderCount, TotalSpent FROM CustomerOrderStats"
+DIRTY_EXTRACT = """
+SELECT d.CustomerID, s.LastOrder, s.OrderCount, s.TotalSpent
+FROM RFMDirty d
+LEFT JOIN CustomerOrderStats s ON s.CustomerID = d.CustomerID
+"""
+
+
+def extract(conn, sql):
+    """Reads the extract into compact columns; `days` is LastOrder as a day number."""
+    df = pd.read_sql_query(sql, conn)
+    df = df.astype({"CustomerID": "int64"})
+    df["days"] = pd.to_datetime(df["LastOrder"]).to_numpy().astype("datetime64[D]").astype("int64")
+    return df
+
+
+def compute_breakpoints(df):
+    """Metric -> the quintile boundaries of that metric over all customers."""
+    return {
+        "R": np.quantile(df["days"].to_numpy(), QUANTILES),
+        "F": np.quantile(df["OrderCount"].to_numpy(), QUANTILES),
+        "M": np.quantile(df["TotalSpent"].to_numpy(), QUANTILES),
+    }
+
+
+def score(df, breakpoints):
+    """Adds R, F, M (1-5) and Segment columns."""
+    df = df.copy()
+    # Values equal to a boundary fall in the lower quintile
+    for metric, column in (("R", "days"), ("F", "OrderCount"), ("M", "TotalSpent")):
+        df[metric] = 1 + np.searchsorted(breakpoints[metric], df[column].to_numpy(), side="left")
+    r, f = df["R"].to_numpy(), df["F"].to_numpy()
+    df["Segment"] = np.select([matches(r, f) for _, matches in SEGMENTS],
+                              [name for name, _ in SEGMENTS], DEFAULT_SEGMENT)
+    return df
+
+
+def load_breakpoints(conn):
+    rows = conn.execute("SELECT Metric, Bound FROM RFMBreakpoints ORDER BY Metric, Position").fetchall()
+    breakpoints = {}
+    for metric, bound in rows:
+        breakpoints.setdefault(metric, []).append(bound)
+    return {metric: np.array(bounds) for metric, bounds in breakpoints.items()}
+
+
+def save_breakpoints(conn, breakpoints):
+    conn.execute("DELETE FROM RFMBreakpoints")
+    conn.executemany("INSERT INTO RFMBreakpoints (Metric, Position, Bound) VALUES (?, ?, ?)",
+                     [(metric, i, float(bound)) for metric, bounds in breakpoints.items()
+                      for i, bound in enumerate(bounds)])
+
+
+def _write_scores(conn, df):
+    columns = ["CustomerID", "LastOrder", "OrderCount", "TotalSpent", "R", "F", "M", "Segment"]
+    conn.executemany("""
+        INSERT OR REPLACE INTO CustomerRFM
+            (CustomerID, LastOrder, Frequency, Monetary, R, F, M, Segment)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    """, zip(*(df[column].tolist() for column in columns)))
+
+
+def dirty_count(conn):
+    return conn.execute("SELECT COUNT(*) FROM RFMDirty").fetchone()[0]
+
+
+def _refresh(conn, full):
+    breakpoints = None if full else load_breakpoints(conn)
+    scored = conn.execute("SELECT COUNT(*) FROM CustomerRFM").fetchone()[0]
+    if breakpoints and dirty_count(conn) <= FULL_REFRESH_FRACTION * scored:
+        changed = extract(conn, DIRTY_EXTRACT)
+        gone = changed[changed["OrderCount"].isna() | (changed["OrderCount"] <= 0)]
+        changed = changed.drop(gone.index).astype({"OrderCount": "int64"})
+        conn.executemany("DELETE FROM CustomerRFM WHERE CustomerID = ?",
+                         [(customer,) for customer in gone["CustomerID"].tolist()])
+        _write_scores(conn, score(changed, breakpoints))
+        conn.execute("DELETE FROM RFMDirty")
+        return {"mode": "incremental", "scored": len(changed), "removed": len(gone)}
+
+    customers = extract(conn, FULL_EXTRACT)
+    conn.execute("DELETE FROM CustomerRFM")
+    conn.execute("DELETE FROM RFMDirty")
+    if customers.empty:
+        conn.execute("DELETE FROM RFMBreakpoints")
+        return {"mode": "full", "scored": 0, "removed": scored}
+    breakpoints = compute_breakpoints(customers)
+    save_breakpoints(conn, breakpoints)
+    _write_scores(conn, score(customers, breakpoints))
+    return {"mode": "full", "scored": len(customers), "removed": max(0, scored - len(customers))}
+
+
+def update(conn=None, full=False):
+    """Brings CustomerRFM up to date in one transaction.
+
+    Returns {"mode", "scored", "removed", "seconds"}.
+    """
+    started = time.perf_counter()
+    with db.write_transaction(conn) as conn:
+        stats = _refresh(conn, full)
+    stats["seconds"] = time.perf_counter() - started
+    return stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Update the RFM customer scores.")
+    parser.add_argument("--db", help="database file (default: db.DB_FILE)")
+    parser.add_argument("--full", action="store_true", help="recompute breakpoints and rescore everyone")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        db.DB_FILE = args.db
+    stats = update(full=args.full)
+    print(f"{stats['mode'].capitalize()} RFM update: {stats['scored']} customers scored, "
+          f"{stats['removed']} removed ({stats['seconds']:.2f}s)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
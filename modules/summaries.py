@@ -0,0 +1,209 @@
+"""Consistency checks and maintenance for the trigger-maintained sales summaries.
+
+    python -m modules.summaries            # compare summaries to a full recompute
+    python -m modules.summaries --rebuild  # recompute them from scratch
+"""
+import argparse
+import re
+import sys
+
+from modules import db, migrations
+
+TOLERANCE = 0.01  # money columns are REAL, allow float rounding drift
+
+# summary table -> (full recompute, key columns, value columns)
+CHECKS = {
+    "SalesDailyCategory": ("""
+        SELECT o.OrderDate AS SaleDate, COALESCE(p.Category, '') AS Category,
+               SUM(oi.Quantity * oi.Price) AS TotalSales, SUM(oi.Quantity) AS UnitsSold
+        FROM `Order` o
+        JOIN OrderItem oi ON o.OrderID = oi.OrderID
+        JOIN Product p ON oi.ProductID = p.ProductID
+        GROUP BY o.OrderDate, COALESCE(p.Category, '')
+        """, ("SaleDate", "Category"), ("TotalSales", "UnitsSold")),
+    "ProductSales": ("""
+        SELECT ProductID, SUM(Quantity) AS UnitsSold, SUM(Quantity * Price) AS Revenue
+        FROM OrderItem
+        GROUP BY ProductID
+        """, ("ProductID",), ("UnitsSold", "Revenue")),
+    "CustomerOrderStats": ("""
+        SELECT CustomerID, COUNT(*) AS OrderCount, SUM(TotalAmount) AS TotalSpent,
+               MIN(OrderDate) AS FirstOrder, MAX(OrderDate) AS LastOrder
+        FROM `Order`
+        GROUP BY CustomerID
+        """, ("CustomerID",), ("OrderCount", "TotalSpent", "FirstOrder", "LastOrder")),
+}
+
+_TRIGGER_NAME = re.compile(r"CREATE TRIGGER IF NOT EXISTS (\w+)")
+
+
+def _mismatch_sql(table, expected, keys, values):
+    on = " AND ".join(f"e.{k} = a.{k}" for k in keys)
+    differs = " OR ".join(
+        f"(typeof(e.{v}) = 'text' AND e.{v} IS NOT a.{v})"
+        f" OR (typeof(e.{v}) != 'text' AND ABS(COALESCE(e.{v}, 0) - COALESCE(a.{v}, 0)) > {TOLERANCE})"
+        for v in values)
+    key_list = ", ".join(f"e.{k}" for k in keys)
+    actual_keys = ", ".join(f"a.{k}" for k in keys)
+    return f"""
+        WITH e AS ({expected})
+        SELECT {key_list}, 'wrong' AS problem FROM e LEFT JOIN {table} a ON {on}
+        WHERE a.{keys[0]} IS NULL OR {differs}
+        UNION ALL
+        SELECT {actual_keys}, 'extra' FROM {table} a LEFT JOIN e ON {on}
+        WHERE e.{keys[0]} IS NULL
+    """
+
+
+def check_consistency(conn, limit=20):
+    """Compares each summary with a full recompute.
+
+    Returns {table: [mismatching rows]} for tables that disagree; an empty dict
+    means the summaries are consistent.
+    """
+    problems = {}
+    for table, (expected, keys, values) in CHECKS.items():
+        rows = conn.execute(_mismatch_sql(table, expected, keys, values) + f" LIMIT {limit}").fetchall()
+        if rows:
+            problems[table] = rows
+    return problems
+
+
+def trigger_names():
+    return _TRIGGER_NAME.findall(migrations.SUMMARY_TRIGGERS_SQL)
+
+
+def drop_triggers(conn):
+    """Drops the summary triggers, e.g. for a bulk load followed by rebuild().
+
+    This changes the schema; to skip them for one transaction, use suspend_triggers().
+    """
+    for name in trigger_names():
+        conn.execute(f"DROP TRIGGER IF EXISTS {name}")
+
+
+def create_triggers(conn):
+    # The guarded insert triggers of migration 7 first; IF NOT EXISTS then
+    # skips migration 3's unguarded ones of the same name
+    migrations.run_script(conn, migrations.GUARDED_SUMMARY_TRIGGERS_SQL)
+    migrations.run_script(conn, migrations.SUMMARY_TRIGGERS_SQL)
+
+
+def suspend_triggers(conn):
+    """Makes the Order/OrderItem insert triggers skip their work until resume_triggers().
+
+    Call it inside a transaction and resume before committing: the guard row
+    is then never visible to other connections.
+    """
+    conn.execute("INSERT INTO SummaryGuard (Suspended) VALUES (1)")
+
+
+def resume_triggers(conn):
+    conn.execute("DELETE FROM SummaryGuard")
+
+
+def batch_deltas(order_rows, item_rows, categories):
+    """Aggregates a batch of new orders into summary deltas, without touching the database.
+
+    order_rows are (OrderID, CustomerID, OrderDate, TotalAmount), item_rows
+    (OrderItemID, OrderID, ProductID, Quantity, Price) and categories maps
+    ProductID -> Category. Returns the rows apply_deltas() upserts.
+    """
+    dates = {order_id: order_date for order_id, _, order_date, _ in order_rows}
+    products, daily = {}, {}  # [units, revenue] and [sales, units]
+    for _, order_id, product, quantity, price in item_rows:
+        amount = quantity * price
+        totals = products.get(product)
+        if totals is None:
+            products[product] = [quantity, amount]
+        else:
+            totals[0] += quantity
+            totals[1] += amount
+        key = (dates[order_id], categories.get(product) or "")
+        totals = daily.get(key)
+        if totals is None:
+            daily[key] = [amount, quantity]
+        else:
+            totals[0] += amount
+            totals[1] += quantity
+    customers = {}
+    for _, customer, order_date, total in order_rows:
+        stats = customers.get(customer)
+        if stats is None:
+            customers[customer] = [1, total, order_date, order_date]
+        else:
+            stats[0] += 1
+            stats[1] += total
+            stats[2] = min(stats[2], order_date)
+            stats[3] = max(stats[3], order_date)
+    return {
+        "products": [(product, *totals) for product, totals in products.items()],
+        "daily": [key + tuple(totals) for key, totals in daily.items()],
+        "customers": [(customer, *stats) for customer, stats in customers.items()],
+    }
+
+
+def apply_deltas(conn, deltas):
+    """Bulk counterpart of the insert triggers: applies batch_deltas() output.
+
+    One upsert per summary row instead of one per line item; the customers
+    are also marked for the next RFM update, like the RFM insert trigger does.
+    """
+    conn.executemany("""
+        INSERT INTO ProductSales (ProductID, UnitsSold, Revenue) VALUES (?, ?, ?)
+        ON CONFLICT (ProductID) DO UPDATE SET
+            UnitsSold = UnitsSold + excluded.UnitsSold,
+            Revenue = Revenue + excluded.Revenue
+    """, deltas["products"])
+    conn.executemany("""
+        INSERT INTO SalesDailyCategory (SaleDate, Category, TotalSales, UnitsSold) VALUES (?, ?, ?, ?)
+        ON CONFLICT (SaleDate, Category) DO UPDATE SET
+            TotalSales = TotalSales + excluded.TotalSales,
+            UnitsSold = UnitsSold + excluded.UnitsSold
+    """, deltas["daily"])
+    conn.executemany("""
+        INSERT INTO CustomerOrderStats (CustomerID, OrderCount, TotalSpent, FirstOrder, LastOrder)
+        VALUES (?, ?, ?, ?, ?)
+        ON CONFLICT (CustomerID) DO UPDATE SET
+            OrderCount = OrderCount + excluded.OrderCount,
+            TotalSpent = TotalSpent + excluded.TotalSpent,
+            FirstOrder = MIN(COALESCE(FirstOrder, excluded.FirstOrder), excluded.FirstOrder),
+            LastOrder = MAX(COALESCE(LastOrder, excluded.LastOrder), excluded.LastOrder)
+    """, deltas["customers"])
+    conn.executemany("INSERT OR IGNORE INTO RFMDirty (CustomerID) VALUES (?)",
+                     [(row[0],) for row in deltas["customers"]])
+
+
+def rebuild(conn):
+    """Recomputes every summary from the base tables in the current transaction."""
+    migrations.run_script(conn, migrations.SUMMARY_BACKFILL_SQL)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Check or rebuild the sales summary tables.")
+    parser.add_argument("--db", help="database file (default: db.DB_FILE)")
+    parser.add_argument("--rebuild", action="store_true", help="recompute summaries from scratch")
+    args = parser.parse_args(argv)
+
+    if args.db:
+        db.DB_FILE = args.db
+    conn = db.get_connection()
+    try:
+        if args.rebuild:
+            with conn:
+                rebuild(conn)
+            print("Summaries rebuilt.")
+        problems = check_consistency(conn)
+    finally:
+        conn.close()
+
+    for table, rows in problems.items():
+        print(f"MISMATCH {table}: {len(rows)} row(s), e.g. {rows[:3]}")
+    if problems:
+        return 1
+    print(f"OK: {', '.join(CHECKS)} match a full recompute")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
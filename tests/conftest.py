@@ -0,0 +1,15 @@
+import pytest
+
+from modules import db
+
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    """A connection to a fresh database in a temp directory, set up by db.init_db()."""
+    monkeypatch.setattr(db, "DB_FILE", str(tmp_path / "nordicx.db"))
+    db.reset_pool()
+    db.init_db()
+    conn = db.get_connection()
+    yield conn
+    conn.close()
+    db.reset_pool()
@@ -0,0 +1,81 @@
+"""Read paths in modules/db.py: snapshots, paging and the query cache."""
+import glob
+import os
+
+import pytest
+
+from modules import db
+
+
+def test_snapshot_outlives_refresh_while_read(conn, monkeypatch):
+    monkeypatch.setattr(db, "READ_MODE", "snapshot")
+    with db.reader_connection() as reader:
+        old = db.get_snapshot()
+        db._refresh_snapshot()
+        assert db.get_snapshot() is not old
+        assert reader.execute("SELECT COUNT(*) FROM Customer").fetchone()[0] > 0
+        assert os.path.exists(old.path)
+    assert not os.path.exists(old.path)
+    db.reset_pool()
+    assert glob.glob(db.DB_FILE + ".snapshot-*") == []
+
+
+def all_pages(table, **kwargs):
+    rows, after = [], None
+    while True:
+        df, after = db.fetch_page(table, after=after, **kwargs)
+        rows.extend(df.itertuples(index=False, name=None))
+        if after is None:
+            return rows
+
+
+@pytest.mark.parametrize("columns", [None, ["TotalSales"]])
+def test_fetch_page_visits_composite_key_rows_once(conn, columns):
+    # Several categories per date, so pages split inside a SaleDate
+    with conn:
+        conn.executemany("INSERT INTO SalesDailyCategory (SaleDate, Category, TotalSales, UnitsSold)"
+                         " VALUES (?, ?, ?, 1) ON CONFLICT DO NOTHING",
+                         [(f"2024-01-{day:02d}", category, day * 10 + i)
+                          for day in range(1, 6) for i, category in enumerate("ABCD")])
+    expected = conn.execute(f"SELECT {', '.join(columns or db.table_columns('SalesDailyCategory'))}"
+                            " FROM SalesDailyCategory ORDER BY SaleDate, Category").fetchall()
+    assert all_pages("SalesDailyCategory", columns=columns, page_size=3) == expected
+
+
+@pytest.mark.parametrize("mode", ["direct", "wal-ro"])
+def test_cached_result_is_dropped_after_a_write(conn, monkeypatch, mode):
+    monkeypatch.setattr(db, "READ_MODE", mode)
+    query = "SELECT COUNT(*) AS n FROM Customer"
+    before = int(db.run_query(query)["n"][0])
+    assert int(db.run_query(query)["n"][0]) == before  # served from the cache
+    with conn:
+        conn.execute("INSERT INTO Customer (Name, Email, Phone) VALUES ('Test', 'test@example.com', '1')")
+    assert int(db.run_query(query)["n"][0]) == before + 1
+
+
+def test_snapshot_files_are_unique_per_process_and_generation(conn):
+    first, second = db.ReadSnapshot(1), db.ReadSnapshot(1)
+    try:
+        assert first.path != second.path
+        assert f".snapshot-{os.getpid()}-1-" in os.path.basename(first.path)
+    finally:
+        first.close()
+        second.close()
+    assert not os.path.exists(first.path) and not os.path.exists(second.path)
+
+
+def test_count_rows_estimates_only_large_unfiltered_tables(conn, monkeypatch):
+    customers = conn.execute("SELECT COUNT(*) FROM Customer").fetchone()[0]
+    assert db.count_rows("Customer") == (customers, True)
+    monkeypatch.setattr(db, "ESTIMATE_ROWS_ABOVE", 0)
+    estimate, exact = db.count_rows("Customer")
+    assert not exact and estimate >= customers
+    filtered = conn.execute("SELECT COUNT(*) FROM Customer WHERE CustomerID > 1").fetchone()[0]
+    assert db.count_rows("Customer", [("CustomerID", ">", 1)]) == (filtered, True)
+    # WITHOUT ROWID: exact until ANALYZE provides sqlite_stat1
+    with conn:
+        conn.execute("INSERT INTO SalesDailyCategory VALUES ('2024-01-01', 'A', 1, 1) ON CONFLICT DO NOTHING")
+    assert db.count_rows("SalesDailyCategory")[1]
+    with conn:
+        conn.execute("ANALYZE")
+    assert not db.count_rows("SalesDailyCategory")[1]
@@ -0,0 +1,16 @@
+"""Cleanup of files prepared by the Reports page's export panel."""
+import os
+import time
+
+from modules import export
+
+
+def test_remove_stale_exports(tmp_path):
+    old, recent = tmp_path / "old.csv", tmp_path / "recent.csv"
+    old.write_text("a\n")
+    recent.write_text("a\n")
+    hour_ago = time.time() - 3600
+    os.utime(old, (hour_ago, hour_ago))
+    assert export.remove_stale_exports(str(tmp_path), max_age=600) == 1
+    assert not old.exists() and recent.exists()
+    assert export.remove_stale_exports(str(tmp_path / "missing")) == 0
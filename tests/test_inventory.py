@@ -0,0 +1,33 @@
+"""Batch restock validation: bad input changes nothing."""
+import pytest
+
+from modules import inventory
+
+
+def stock(conn):
+    return conn.execute("SELECT ProductID, StockLevel FROM Product ORDER BY ProductID").fetchall()
+
+
+@pytest.mark.parametrize("units", [None, "abc", float("nan"), float("inf"), 0, -2, 1.5, True])
+def test_restock_rejects_bad_quantities(conn, units):
+    product = conn.execute("SELECT MIN(ProductID) FROM Product").fetchone()[0]
+    before = stock(conn)
+    with pytest.raises(ValueError):
+        inventory.restock({product: 5, product + 1: units}, conn=conn)
+    assert stock(conn) == before
+
+
+def test_restock_rejects_unknown_product(conn):
+    product = conn.execute("SELECT MIN(ProductID) FROM Product").fetchone()[0]
+    before = stock(conn)
+    with pytest.raises(ValueError, match="Unknown product"):
+        inventory.restock({product: 5, 10 ** 9: 1}, conn=conn)
+    assert stock(conn) == before
+    assert not conn.in_transaction
+
+
+def test_restock_adds_up_repeated_products(conn):
+    product = conn.execute("SELECT MIN(ProductID) FROM Product").fetchone()[0]
+    level = dict(stock(conn))[product]
+    assert inventory.restock([(product, 2), (product, 3)], conn=conn)["units"] == 5
+    assert dict(stock(conn))[product] == level + 5
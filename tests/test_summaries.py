@@ -0,0 +1,94 @@
+"""The trigger-maintained summaries must match a full recompute after every kind of write."""
+import pytest
+
+from modules import ingest, summaries
+
+
+def first(conn, sql, params=()):
+    return conn.execute(sql, params).fetchone()[0]
+
+
+def add_order(conn, order_date="2025-06-15", lines=((2, 9.5), (1, 120.0))):
+    customer = first(conn, "SELECT MIN(CustomerID) FROM Customer")
+    products = [row[0] for row in conn.execute("SELECT ProductID FROM Product ORDER BY ProductID")]
+    with conn:
+        order = conn.execute("INSERT INTO `Order` (CustomerID, OrderDate, TotalAmount) VALUES (?, ?, ?)",
+                             (customer, order_date, sum(q * p for q, p in lines))).lastrowid
+        for (quantity, price), product in zip(lines, products):
+            conn.execute("INSERT INTO OrderItem (OrderID, ProductID, Quantity, Price) VALUES (?, ?, ?, ?)",
+                         (order, product, quantity, price))
+    return order
+
+
+def test_new_database_is_consistent(conn):
+    assert summaries.check_consistency(conn) == {}
+
+
+def test_insert(conn):
+    add_order(conn)
+    assert summaries.check_consistency(conn) == {}
+
+
+def test_update_line(conn):
+    order = add_order(conn)
+    with conn:
+        conn.execute("UPDATE OrderItem SET Quantity = Quantity + 3, Price = Price * 2 WHERE OrderID = ?", (order,))
+    assert summaries.check_consistency(conn) == {}
+
+
+def test_delete_line_and_order(conn):
+    order = add_order(conn)
+    other = add_order(conn, "2025-06-16")
+    with conn:
+        conn.execute("DELETE FROM OrderItem WHERE OrderItemID = (SELECT MIN(OrderItemID) FROM OrderItem"
+                     " WHERE OrderID = ?)", (order,))
+    assert summaries.check_consistency(conn) == {}
+    with conn:
+        conn.execute("DELETE FROM `Order` WHERE OrderID = ?", (other,))  # cascades to its lines
+    assert summaries.check_consistency(conn) == {}
+
+
+def test_order_date_change(conn):
+    order = add_order(conn, "2025-06-15")
+    with conn:
+        conn.execute("UPDATE `Order` SET OrderDate = '2025-07-01' WHERE OrderID = ?", (order,))
+    assert summaries.check_consistency(conn) == {}
+
+
+def test_category_change(conn):
+    add_order(conn)
+    product = first(conn, "SELECT MIN(ProductID) FROM Product")
+    with conn:
+        conn.execute("UPDATE Product SET Category = 'Reclassified' WHERE ProductID = ?", (product,))
+    assert summaries.check_consistency(conn) == {}
+
+
+def test_ingest_batch(conn):
+    customers = [row[0] for row in conn.execute("SELECT CustomerID FROM Customer")]
+    products = [row[0] for row in conn.execute("SELECT ProductID FROM Product")]
+    with conn:
+        conn.execute("UPDATE Product SET StockLevel = 1000")
+    orders = [{"CustomerID": customers[i % len(customers)], "OrderDate": f"2025-08-{i % 28 + 1:02d}",
+               "items": [{"ProductID": products[(i + j) % len(products)], "Quantity": j + 1} for j in range(3)]}
+              for i in range(50)]
+    stats = ingest.ingest_orders(orders, batch_size=20, conn=conn)
+    assert (stats["orders"], stats["batches"]) == (50, 3)
+    assert summaries.check_consistency(conn) == {}
+    assert first(conn, "SELECT COUNT(*) FROM SummaryGuard") == 0
+
+
+def test_rejected_ingest_batch_leaves_summaries_alone(conn):
+    product = first(conn, "SELECT MIN(ProductID) FROM Product")
+    orders = [{"CustomerID": first(conn, "SELECT MIN(CustomerID) FROM Customer"), "OrderDate": "2025-08-01",
+               "items": [{"ProductID": product, "Quantity": 1}]},
+              {"CustomerID": -1, "OrderDate": "2025-08-01", "items": [{"ProductID": product, "Quantity": 1}]}]
+    with pytest.raises(ingest.IngestError):
+        ingest.ingest_orders(orders, conn=conn)
+    assert summaries.check_consistency(conn) == {}
+
+
+def test_recreated_triggers_keep_the_guard(conn):
+    with conn:
+        summaries.drop_triggers(conn)
+        summaries.create_triggers(conn)
+    test_ingest_batch(conn)